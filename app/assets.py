@@ -0,0 +1,223 @@
+"""Pre-encoded, pre-compressed HTML pages served from memory.
+
+Every page is read once, on first use, and each compressed representation
+(gzip, and brotli when the optional ``brotli`` package is installed) is made
+the first time a client asks for it; each has a strong ETag. Later requests
+only pick a representation from ``Accept-Encoding`` and compare validators;
+no disk reads or re-encoding. Keeping this off the startup path makes cold
+starts faster; set ``ASSETS_PRELOAD=1`` to load and compress every page at
+startup instead.
+
+Given a ``bundle`` function (``app.bundles.bundle_pages``), the registry
+moves the pages' inline styles and scripts into separate files first and
+serves those too, via ``file_response``.
+
+Set ``ASSETS_DEV_RELOAD=1`` to rebuild a page whenever its file changes.
+"""
+import gzip
+import hashlib
+import os
+from dataclasses import dataclass, field
+from email.utils import formatdate
+from pathlib import Path
+
+from fastapi.responses import Response
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+ASSETS_DEV_RELOAD = os.environ.get("ASSETS_DEV_RELOAD") == "1"
+ASSETS_PRELOAD = os.environ.get("ASSETS_PRELOAD") == "1"
+
+APP_DIR = Path(__file__).resolve().parent
+PAGES_DIR = APP_DIR / "pages"
+FRONTEND_DIR = APP_DIR.parent / "frontend"
+
+HTML = "text/html; charset=utf-8"
+
+# Content-Encoding -> (compress, ETag suffix), in order of preference.
+COMPRESSORS = {"gzip": (lambda body: gzip.compress(body, compresslevel=9, mtime=0), "-gz")}
+if brotli is not None:
+    COMPRESSORS = {"br": (lambda body: brotli.compress(body, quality=11), "-br"), **COMPRESSORS}
+
+
+@dataclass
+class Asset:
+    path: Path
+    media_type: str
+    mtime: float
+    digest: str
+    # Content-Encoding ("identity", "gzip", "br") -> (body, etag), made on first use
+    variants: dict = field(default_factory=dict)
+
+    @property
+    def encodings(self):
+        return ("identity", *COMPRESSORS)
+
+    def variant(self, coding):
+        variant = self.variants.get(coding)
+        if variant is None:
+            compress, suffix = COMPRESSORS[coding]
+            variant = self.variants[coding] = (compress(self.variants["identity"][0]), f'"{self.digest}{suffix}"')
+        return variant
+
+
+def etag_matches(if_none_match, etag):
+    """Weak comparison of an ``If-None-Match`` header against ``etag``."""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in candidates or etag.removeprefix("W/") in candidates
+
+
+def _accepted_encodings(accept_encoding):
+    accepted = {}
+    for part in (accept_encoding or "").split(","):
+        coding, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if coding:
+            accepted[coding.strip().lower()] = q
+    return accepted
+
+
+def choose_encoding(accept_encoding, available):
+    """Pick the best of ``available`` (preference order) the client accepts."""
+    accepted = _accepted_encodings(accept_encoding)
+    for coding in available:
+        if coding == "identity":
+            continue
+        if accepted.get(coding, accepted.get("*", 0)) > 0:
+            return coding
+    return "identity"
+
+
+def make_asset(path, body, media_type=HTML, mtime=0.0, compress=False):
+    digest = hashlib.sha256(body).hexdigest()[:32]
+    asset = Asset(Path(path), media_type, mtime, digest, {"identity": (body, f'"{digest}"')})
+    if compress:
+        for coding in COMPRESSORS:
+            asset.variant(coding)
+    return asset
+
+
+def build_asset(path, media_type=HTML, compress=False, rewrite=None, body=None):
+    if body is None:
+        body = Path(path).read_bytes()
+    if rewrite is not None:
+        body = rewrite(body)
+    return make_asset(path, body, media_type, os.stat(path).st_mtime, compress)
+
+
+class AssetRegistry:
+    def __init__(self, dev_reload=ASSETS_DEV_RELOAD, rewrite=None, bundle=None):
+        self.dev_reload = dev_reload
+        # Applied to each page body when it is built, e.g. to link hashed URLs.
+        self.rewrite = rewrite
+        # Takes all pages (name -> HTML) at once and returns them rewritten
+        # plus the files split out of them; see app/bundles.py.
+        self.bundle = bundle
+        self._sources = {}
+        self._assets = {}
+        # Files split out of the pages, by hashed name.
+        self._files = {}
+        self._bundled = None
+        self._bundled_mtimes = None
+
+    def register(self, name, path, media_type=HTML):
+        self._sources[name] = (Path(path), media_type)
+
+    @property
+    def names(self):
+        return list(self._sources)
+
+    def build(self):
+        """Load and compress every registered asset now (``ASSETS_PRELOAD``)."""
+        for name in self._sources:
+            self._assets[name] = self._build(name, compress=True)
+        for file in self._files.values():
+            for coding in COMPRESSORS:
+                file.variant(coding)
+
+    def get(self, name):
+        asset = self._assets.get(name)
+        if asset is None or (self.dev_reload and _changed(asset)):
+            asset = self._assets[name] = self._build(name)
+        return asset
+
+    def file(self, name):
+        """A file split out of the pages, or None."""
+        if self.bundle is not None and self._bundled is None:
+            self._bundle_pages()
+        return self._files.get(name)
+
+    def _build(self, name, compress=False):
+        path, media_type = self._sources[name]
+        body = self._bundle_pages()[name] if self.bundle is not None and media_type == HTML else None
+        return build_asset(path, media_type, compress, self.rewrite, body)
+
+    def _bundle_pages(self):
+        pages = {name: path for name, (path, media_type) in self._sources.items() if media_type == HTML}
+        mtimes = {name: _mtime(path) for name, path in pages.items()} if self.dev_reload else None
+        if self._bundled is None or mtimes != self._bundled_mtimes:
+            self._bundled, files = self.bundle({name: path.read_bytes() for name, path in pages.items()})
+            mtime = max(_mtime(path) for path in pages.values())
+            for file in files:
+                # Old names stay servable: pages built earlier may link them.
+                self._files.setdefault(file.hashed_name, make_asset(file.name, file.body, file.media_type, mtime))
+            self._bundled_mtimes = mtimes
+        return self._bundled
+
+    def response(self, name, request):
+        return asset_response(self.get(name), request)
+
+    def file_response(self, name, request):
+        """Response for a file split out of the pages, or None if there is none by that name."""
+        asset = self.file(name)
+        return None if asset is None else asset_response(asset, request)
+
+
+def asset_response(asset, request):
+    coding = choose_encoding(request.headers.get("accept-encoding"), asset.encodings)
+    body, etag = asset.variant(coding)
+    headers = {
+        "ETag": etag,
+        "Last-Modified": formatdate(asset.mtime, usegmt=True),
+        "Vary": "Accept-Encoding",
+    }
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    if coding != "identity":
+        headers["Content-Encoding"] = coding
+    return Response(body, media_type=asset.media_type, headers=headers)
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime
+    except FileNotFoundError:
+        return 0.0
+
+
+def _changed(asset):
+    try:
+        return os.stat(asset.path).st_mtime != asset.mtime
+    except FileNotFoundError:
+        return False
+
+
+def default_registry(rewrite=None, bundle=None):
+    registry = AssetRegistry(rewrite=rewrite, bundle=bundle)
+    for name in ("home", "demo", "cicd-demo"):
+        registry.register(name, PAGES_DIR / f"{name}.html")
+    registry.register("frontend", FRONTEND_DIR / "index.html")
+    registry.register("cicd-live", FRONTEND_DIR / "cicd-live.html")
+    registry.register("manual-vs-automated", FRONTEND_DIR / "manual-vs-automated.html")
+    return registry
@@ -0,0 +1,148 @@
+"""Helpers for ``POST /echo/batch``.
+
+Two wire formats are supported, and the response uses the same one:
+
+* NDJSON (``application/x-ndjson``), one message per line -> one result per
+  line, written while the request body is still being read;
+* a JSON array of ``{"message": ...}`` objects -> JSON array of results. The
+  array is parsed incrementally: batches up to ``BATCH_STREAM_THRESHOLD``
+  items are validated as a whole (422 on any bad item), larger ones are
+  echoed as they are parsed, with bad items reported inline.
+
+Either way memory stays bounded by the chunk and threshold sizes, not by the
+size of the batch.
+"""
+import codecs
+import json
+import os
+
+from pydantic import ValidationError
+from starlette.requests import ClientDisconnect
+from starlette.responses import StreamingResponse
+
+from .responses import dumps
+
+NDJSON = "application/x-ndjson"
+BATCH_STREAM_THRESHOLD = int(os.environ.get("BATCH_STREAM_THRESHOLD", "1000"))
+
+_decoder = json.JSONDecoder()
+
+
+class DuplexStreamingResponse(StreamingResponse):
+    """A streaming response whose body is produced from the request body.
+
+    ``StreamingResponse`` watches ``receive`` for a disconnect while it
+    streams, which steals the request body chunks the generator is waiting
+    for. Here the generator is the only reader of ``receive`` (through
+    ``request.stream()``, which raises ``ClientDisconnect`` itself), so only
+    the streaming half is run.
+    """
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await self.stream_response(send)
+        except OSError:
+            raise ClientDisconnect() from None
+
+
+def echo_result(message):
+    return {"you_said": message, "length": len(message)}
+
+
+def _errors(e):
+    return e.errors(include_url=False, include_context=False)
+
+
+async def iter_lines(chunks):
+    """Split an async stream of byte chunks into lines."""
+    pending = b""
+    async for chunk in chunks:
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            yield line
+    if pending:
+        yield pending
+
+
+async def echo_ndjson(chunks, model):
+    """Echo each NDJSON line in order; invalid lines produce an error line."""
+    number = 0
+    async for line in iter_lines(chunks):
+        number += 1
+        if not line.strip():
+            continue
+        try:
+            result = echo_result(model.model_validate_json(line).message)
+        except ValidationError as e:
+            result = {"error": _errors(e), "line": number}
+        yield dumps(result) + b"\n"
+
+
+async def iter_json_array(chunks):
+    """Yield the elements of a JSON array as its bytes arrive.
+
+    Raises ``ValueError`` if the body is not a JSON array.
+    """
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    pos = 0
+    started = False
+    done = False
+    chunks = aiter(chunks)
+    while True:
+        # Skip whitespace and separators; find the next element, if complete.
+        while pos < len(buffer) and (buffer[pos].isspace() or (started and buffer[pos] == ",")):
+            pos += 1
+        if pos < len(buffer):
+            if not started:
+                if buffer[pos] != "[":
+                    raise ValueError("expected a JSON array")
+                started = True
+                pos += 1
+                continue
+            if buffer[pos] == "]":
+                return
+            try:
+                value, end = _decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if done:
+                    raise ValueError("malformed JSON array") from None
+            else:
+                # A value running to the end of the buffer may be cut short.
+                if end < len(buffer) or done:
+                    yield value
+                    buffer, pos = buffer[end:], 0
+                    continue
+        if done:
+            raise ValueError("unterminated JSON array")
+        try:
+            buffer = buffer[pos:] + utf8.decode(await anext(chunks))
+        except StopAsyncIteration:
+            buffer = buffer[pos:] + utf8.decode(b"", final=True)
+            done = True
+        pos = 0
+
+
+async def stream_json_array(head, rest, model):
+    """Echo ``head`` (already parsed) and then ``rest`` as one JSON array.
+
+    Errors after the first byte is sent can no longer change the status, so
+    invalid items become ``{"error": ..., "index": n}`` entries and a
+    malformed body ends the array with one such entry.
+    """
+    def result(item, index):
+        try:
+            return echo_result(model.model_validate(item).message)
+        except ValidationError as e:
+            return {"error": _errors(e), "index": index}
+
+    yield b"[" + b",".join(dumps(result(item, i)) for i, item in enumerate(head))
+    index = len(head)
+    try:
+        async for item in rest:
+            yield b"," + dumps(result(item, index))
+            index += 1
+    except ValueError as e:
+        yield b"," + dumps({"error": str(e), "index": index})
+    yield b"]"
@@ -0,0 +1,76 @@
+"""Build metadata: the git commit, build time and dependency versions.
+
+The Docker build runs ``python -m app.buildinfo`` once dependencies are
+installed, with the commit passed in as the ``GIT_SHA`` build argument (the
+build context has no ``.git``), and writes the result to ``BUILD_INFO_FILE``.
+At runtime ``load()`` just reads that file. Without one (a plain checkout,
+or tests) the same fields are filled in on the spot: ``GIT_SHA`` from the
+environment or ``"unknown"``, and the build time from ``app.version``.
+"""
+import json
+import os
+import platform
+import sys
+from datetime import UTC, datetime
+from importlib import metadata
+from pathlib import Path
+
+from .version import __build__
+
+BUILD_INFO_FILE = Path(os.environ.get("BUILD_INFO_FILE", Path(__file__).with_name("build_info.json")))
+
+DEPENDENCIES = ("fastapi", "starlette", "pydantic", "pydantic-core", "uvicorn", "orjson")
+
+
+def _version(distribution):
+    try:
+        return metadata.version(distribution)
+    except metadata.PackageNotFoundError:
+        return None
+
+
+def collect(git_sha=None, built_at=None):
+    """Build metadata for the current environment."""
+    if built_at is None:
+        built_at = datetime(*map(int, __build__.split(".")), tzinfo=UTC)
+    return {
+        "git_sha": git_sha or os.environ.get("GIT_SHA") or "unknown",
+        "built_at": built_at.isoformat(timespec="seconds").replace("+00:00", "Z"),
+        "python": platform.python_version(),
+        "dependencies": {name: _version(name) for name in DEPENDENCIES},
+    }
+
+
+def load(path=BUILD_INFO_FILE):
+    """The metadata written at build time, or ``collect()`` without it."""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return collect()
+
+
+def built_at_timestamp(info):
+    return datetime.fromisoformat(info["built_at"]).timestamp()
+
+
+def main(argv=None):
+    import argparse  # build time only
+
+    parser = argparse.ArgumentParser(description="Write build metadata for /version.")
+    parser.add_argument("--git-sha", default=os.environ.get("GIT_SHA"))
+    parser.add_argument("--output", type=Path, default=BUILD_INFO_FILE)
+    args = parser.parse_args(argv)
+
+    # SOURCE_DATE_EPOCH keeps rebuilds of the same commit reproducible.
+    epoch = os.environ.get("SOURCE_DATE_EPOCH")
+    built_at = datetime.fromtimestamp(int(epoch), UTC) if epoch else datetime.now(UTC)
+    info = collect(args.git_sha, built_at)
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(info, indent=2) + "\n")
+    print(f"wrote {args.output}: {info['git_sha']} built {info['built_at']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,310 @@
+"""Inline ``<style>`` and ``<script>`` blocks of the pages, moved into files.
+
+The pages carry their own CSS and JS inline, so every view re-sends them.
+``bundle_pages`` runs once over all pages (when the asset registry first
+builds them) and replaces those blocks with links to minified files named
+by content hash, served from ``/assets`` as immutable, so a browser fetches
+each one once per change:
+
+* ``common.<hash>.css`` - rules several pages repeat word for word, when
+  there are at least ``BUNDLE_SHARED_MIN_SIZE`` bytes of them;
+* ``<page>.<hash>.css`` - the rest of that page's rules, in page order;
+* ``<page>.<hash>.js`` - its scripts, one file per inline block (identical
+  blocks on several pages share a file).
+
+Moving a rule into ``common.css`` puts it ahead of the page's own rules and
+onto pages that did not have it, so a repeated rule is only shared when
+neither can change how a page renders: on each page that has it, no rule
+it used to follow may now follow it if the two could fight (same
+specificity, overlapping properties; shorthands match by name prefix), and
+on each page without it, one of the classes or ids in every selector must
+be absent from that page's markup and scripts. CSS with at-rules is only
+minified, not shared.
+
+Scripts are minified conservatively: indentation, blank lines and
+whole-line ``//`` comments go, newlines stay (automatic semicolon insertion
+depends on them) and template literals are left untouched. Regex literals
+containing quotes or backticks are not understood.
+
+``python -m benchmarks.bench_page_weight`` reports bytes per first and
+repeat view of each page with and without this.
+"""
+import hashlib
+import os
+import re
+from collections import Counter
+from dataclasses import dataclass
+
+from .static import hashed_name
+
+BUNDLE_PREFIX = "/assets"
+# Below this, common.css would cost its request more than it saves.
+SHARED_MIN_SIZE = int(os.environ.get("BUNDLE_SHARED_MIN_SIZE", "1024"))
+CSS = "text/css; charset=utf-8"
+JS = "text/javascript; charset=utf-8"
+
+STYLE_BLOCK = re.compile(rb"<style>(.*?)</style>", re.DOTALL)
+SCRIPT_BLOCK = re.compile(rb"<script>(.*?)</script>", re.DOTALL)
+
+_COMMENT = re.compile(r"/\*.*?\*/", re.DOTALL)
+_RULE = re.compile(r"\s*([^{}@]+)\{([^{}]*)\}")
+_STRING = re.compile(r"""('(?:\\.|[^'\\])*'|"(?:\\.|[^"\\])*")""")
+_SIMPLE_SELECTOR = re.compile(
+    r"(#[\w-]+)"                                       # id
+    r"|(::?(?:before|after|first-line|first-letter)\b"  # pseudo-element (legacy single colon too)
+    r"|::[\w-]+(?:\([^)]*\))?)"
+    r"|(\.[\w-]+|\[[^\]]*\]|:[\w-]+(?:\([^)]*\))?)"     # class, attribute, pseudo-class
+    r"|((?<![\w-])[a-zA-Z][\w-]*)"                      # type
+)
+_NAME = re.compile(r"[#.]([\w-]+)")
+_TOKEN = re.compile(r"[\w-]+")
+
+
+def _squash(text):
+    """Collapse whitespace, and drop it around ``,`` and inside parentheses, outside strings."""
+    parts = _STRING.split(text)
+    for i in range(0, len(parts), 2):
+        part = re.sub(r"\s*,\s*", ",", " ".join(parts[i].split()))
+        parts[i] = part.replace("( ", "(").replace(" )", ")")
+    return "".join(parts).strip()
+
+
+def _split_declarations(block):
+    """``block`` split on ``;``, except inside strings and parentheses."""
+    declarations, depth, quote, start = [], 0, None, 0
+    for i, ch in enumerate(block):
+        if quote:
+            quote = None if ch == quote and block[i - 1] != "\\" else quote
+        elif ch in "'\"":
+            quote = ch
+        elif ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        elif ch == ";" and depth == 0:
+            declarations.append(block[start:i])
+            start = i + 1
+    return [*declarations, block[start:]]
+
+
+@dataclass(frozen=True)
+class Rule:
+    selector: str
+    declarations: tuple  # ((property, value), ...)
+
+    @property
+    def text(self):
+        return f"{self.selector}{{{';'.join(f'{name}:{value}' for name, value in self.declarations)}}}"
+
+    @property
+    def properties(self):
+        return {name for name, _ in self.declarations}
+
+    @property
+    def specificities(self):
+        return {specificity(part) for part in self.selector.split(",")}
+
+    def conflicts(self, other):
+        """Whether source order between the two rules can matter."""
+        return bool(self.specificities & other.specificities) and any(
+            a == b or a.startswith(b + "-") or b.startswith(a + "-")
+            for a in self.properties for b in other.properties
+        )
+
+    def inert_on(self, tokens):
+        """Whether no element of a page using ``tokens`` can match the selector."""
+        return all(
+            any(not _mentioned(name, tokens) for name in _NAME.findall(part))
+            for part in self.selector.split(",")
+        )
+
+
+def _mentioned(name, tokens):
+    # "status-" also covers names built at runtime, like "status-" + state.
+    return name in tokens or any(token.endswith("-") and name.startswith(token) for token in tokens)
+
+
+def specificity(selector):
+    """``(ids, classes, types)`` of one selector, ignoring ``:is()``-style arguments."""
+    counts = [0, 0, 0]
+    for match in _SIMPLE_SELECTOR.finditer(selector):
+        ident, _, klass, _ = match.groups()
+        counts[0 if ident else 1 if klass else 2] += 1
+    return tuple(counts)
+
+
+def parse_css(css):
+    """``css`` as a list of minified ``Rule``s, or None if it has at-rules or does not parse."""
+    css = _COMMENT.sub("", css)
+    rules, end = [], 0
+    for match in _RULE.finditer(css):
+        if css[end:match.start()].strip():
+            return None
+        end = match.end()
+        declarations = []
+        for declaration in _split_declarations(match.group(2)):
+            name, colon, value = declaration.partition(":")
+            if colon:
+                declarations.append((name.strip().lower(), _squash(value)))
+        selector = re.sub(r"\s*([>+~])\s*", r"\1", _squash(match.group(1)))
+        rules.append(Rule(selector, tuple(declarations)))
+    if css[end:].strip():
+        return None
+    return rules
+
+
+def minify_css(css):
+    """``css`` minified; stylesheets ``parse_css`` does not handle only lose comments and whitespace."""
+    rules = parse_css(css)
+    if rules is None:
+        return " ".join(_COMMENT.sub("", css).split())
+    return "".join(rule.text for rule in rules)
+
+
+def minify_js(js):
+    lines = []
+    # Innermost construct open at the current position: "code", "tpl" (a
+    # template literal), "expr" (a ${...} in one), "{" (a brace inside
+    # that) or "comment" (/* ... */).
+    stack = ["code"]
+    for line in js.splitlines():
+        if stack[-1] == "tpl":
+            lines.append(line)
+        elif (stripped := line.strip()) and not stripped.startswith("//"):
+            lines.append(stripped)
+        _scan(line, stack)
+    return "\n".join(lines)
+
+
+def _scan(line, stack):
+    i = 0
+    while i < len(line):
+        ch, top = line[i], stack[-1]
+        if top == "comment":
+            if line.startswith("*/", i):
+                stack.pop()
+                i += 1
+        elif top == "tpl":
+            if ch == "\\":
+                i += 1
+            elif ch == "`":
+                stack.pop()
+            elif line.startswith("${", i):
+                stack.append("expr")
+                i += 1
+        elif ch in "'\"":
+            i += 1
+            while i < len(line) and line[i] != ch:
+                i += 2 if line[i] == "\\" else 1
+        elif ch == "`":
+            stack.append("tpl")
+        elif line.startswith("//", i):
+            return
+        elif line.startswith("/*", i):
+            stack.append("comment")
+            i += 1
+        elif ch == "{" and top in ("expr", "{"):
+            stack.append("{")
+        elif ch == "}" and top in ("expr", "{"):
+            stack.pop()
+        i += 1
+
+
+@dataclass(frozen=True)
+class BundleFile:
+    name: str
+    body: bytes
+    media_type: str
+
+    @property
+    def hashed_name(self):
+        return hashed_name(self.name, hashlib.sha256(self.body).hexdigest())
+
+
+def share_rules(styles, tokens, min_size=SHARED_MIN_SIZE):
+    """Split page rules into ``(shared, own)``: rules for ``common.css`` and per-page rest.
+
+    ``styles`` maps page name -> its ``Rule``s, ``tokens`` page name -> the
+    identifiers its markup and scripts use. Nothing is shared if the shared
+    rules come to less than ``min_size`` bytes.
+    """
+    counts = Counter(rule for rules in styles.values() for rule in set(rules))
+    shared = [rule for rule in dict.fromkeys(r for rules in styles.values() for r in rules) if counts[rule] > 1]
+    changed = True
+    while changed:
+        changed = False
+        for rule in list(shared):
+            if not _can_share(rule, shared, styles, tokens):
+                shared.remove(rule)
+                changed = True
+    if sum(len(rule.text) for rule in shared) < min_size:
+        shared = []
+    position = {rule: i for i, rule in enumerate(shared)}
+    own = {name: [rule for rule in rules if rule not in position] for name, rules in styles.items()}
+    return shared, own
+
+
+def _can_share(rule, shared, styles, tokens):
+    for name, rules in styles.items():
+        if rule not in rules:
+            if not rule.inert_on(tokens[name]):
+                return False
+            continue
+        for earlier in rules[:rules.index(rule)]:
+            # Rules that will still come first (shared ones placed earlier) are fine.
+            if earlier in shared and shared.index(earlier) < shared.index(rule):
+                continue
+            if earlier.conflicts(rule):
+                return False
+    return True
+
+
+def bundle_pages(pages, prefix=BUNDLE_PREFIX, shared_min_size=SHARED_MIN_SIZE):
+    """Move the inline styles and scripts of ``pages`` (name -> HTML) into files.
+
+    Returns the rewritten pages and the ``BundleFile``s they link to.
+    """
+    styles, unparsed, tokens = {}, {}, {}
+    for name, html in pages.items():
+        blocks = [match.group(1).decode() for match in STYLE_BLOCK.finditer(html)]
+        if blocks:
+            rules = parse_css("\n".join(blocks))
+            if rules is None:
+                unparsed[name] = minify_css("\n".join(blocks))
+            else:
+                styles[name] = rules
+        tokens[name] = set(_TOKEN.findall(STYLE_BLOCK.sub(b"", html).decode()))
+    shared, own = share_rules(styles, tokens, shared_min_size)
+
+    files = {}
+
+    def link(name, body, media_type):
+        file = BundleFile(name, body.encode(), media_type)
+        file = files.setdefault(file.body, file)  # identical bodies share one file
+        return f"{prefix}/{file.hashed_name}"
+
+    common = "".join(rule.text for rule in shared)
+    bundled = {}
+    for name, html in pages.items():
+        hrefs = []
+        if common and set(styles.get(name, ())) & set(shared):
+            hrefs.append(link("common.css", common, CSS))
+        css = unparsed.get(name) or "".join(rule.text for rule in own.get(name, ()))
+        if css:
+            hrefs.append(link(f"{name}.css", css, CSS))
+        tags = "".join(f'<link rel="stylesheet" href="{href}">' for href in hrefs).encode()
+        # The links go where the first <style> was; any others just go.
+        html = STYLE_BLOCK.sub(lambda _: b"", STYLE_BLOCK.sub(lambda _, tags=tags: tags, html, count=1))
+
+        scripts = []
+
+        def script(match, name=name, scripts=scripts):
+            js = minify_js(match.group(1).decode())
+            if not js:
+                return match.group(0)
+            scripts.append(js)
+            suffix = f"-{len(scripts)}" if len(scripts) > 1 else ""
+            return f'<script src="{link(f"{name}{suffix}.js", js, JS)}"></script>'.encode()
+
+        bundled[name] = SCRIPT_BLOCK.sub(script, html)
+    return bundled, list(files.values())
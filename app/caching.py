@@ -0,0 +1,159 @@
+"""HTTP caching: per-route Cache-Control plus conditional GET handling.
+
+Routes opt in with the ``cache_control`` decorator::
+
+    @app.get("/version")
+    @cache_control(max_age=3600, last_modified=BUILD_TIME)
+    def version(): ...
+
+``CachingMiddleware`` then, for GET/HEAD requests to such routes:
+
+* sets ``Cache-Control`` (and ``Last-Modified`` when the route declares one),
+* computes a strong ``ETag`` from the body when the handler did not set one,
+* turns the response into ``304 Not Modified`` when ``If-None-Match`` (or,
+  failing that, ``If-Modified-Since``) shows the client already has it.
+"""
+import hashlib
+from dataclasses import dataclass
+from email.utils import formatdate, parsedate_to_datetime
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from .assets import etag_matches
+
+# Bodies larger than this are streamed through without a computed ETag.
+MAX_BUFFER = 1024 * 1024
+
+# Headers a 304 response may carry (RFC 9110 section 15.4.5).
+NOT_MODIFIED_HEADERS = {b"cache-control", b"content-location", b"date", b"etag", b"expires", b"last-modified", b"vary"}
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    max_age: int = 0
+    no_store: bool = False
+    public: bool = True
+    immutable: bool = False
+    # Unix timestamp the resource last changed, if known up front.
+    last_modified: float = None
+
+    @property
+    def header(self):
+        if self.no_store:
+            return "no-store"
+        if self.max_age <= 0:
+            return "no-cache"
+        value = f"{'public' if self.public else 'private'}, max-age={self.max_age}"
+        return value + ", immutable" if self.immutable else value
+
+
+def cache_control(**kwargs):
+    """Attach a ``CachePolicy`` to a route endpoint."""
+    policy = CachePolicy(**kwargs)
+
+    def decorator(endpoint):
+        endpoint.cache_policy = policy
+        return endpoint
+
+    return decorator
+
+
+def http_date(timestamp):
+    return formatdate(timestamp, usegmt=True)
+
+
+def is_not_modified(request_headers, etag, last_modified):
+    """Evaluate conditional request headers against response validators."""
+    if_none_match = request_headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag is not None and etag_matches(if_none_match, etag)
+    if_modified_since = request_headers.get("if-modified-since")
+    if if_modified_since and last_modified:
+        try:
+            return parsedate_to_datetime(last_modified) <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+class CachingMiddleware:
+    def __init__(self, app, max_buffer=MAX_BUFFER):
+        self.app = app
+        self.max_buffer = max_buffer
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+            await self.app(scope, receive, send)
+            return
+
+        request_headers = Headers(scope=scope)
+        start = None
+        chunks = []
+        size = 0
+        mode = "pass"  # "pass" | "buffer" | "drop"
+
+        async def send_wrapper(message):
+            nonlocal start, size, mode
+            if message["type"] == "http.response.start":
+                # The router has resolved the endpoint by the time it responds.
+                policy = getattr(scope.get("endpoint"), "cache_policy", None)
+                if policy is None or message["status"] not in (200, 304):
+                    await send(message)
+                    return
+                headers = MutableHeaders(raw=message["headers"])
+                headers.setdefault("cache-control", policy.header)
+                if policy.last_modified is not None:
+                    headers.setdefault("last-modified", http_date(policy.last_modified))
+                if message["status"] != 200 or policy.no_store:
+                    await send(message)
+                elif "etag" in headers or scope["method"] == "HEAD" or _is_stream(headers):
+                    if is_not_modified(request_headers, headers.get("etag"), headers.get("last-modified")):
+                        mode = "drop"
+                        await send(_not_modified(message))
+                    else:
+                        await send(message)
+                else:
+                    mode = "buffer"
+                    start = message
+                return
+
+            if mode == "pass":
+                await send(message)
+            elif mode == "drop":
+                if not message.get("more_body", False):
+                    await send({"type": "http.response.body", "body": b""})
+            else:
+                chunks.append(message.get("body", b""))
+                size += len(chunks[-1])
+                more_body = message.get("more_body", False)
+                if more_body and size <= self.max_buffer:
+                    return
+                if more_body:
+                    # Too big to hash up front; give up on a computed ETag.
+                    mode = "pass"
+                    await send(start)
+                    await send({"type": "http.response.body", "body": b"".join(chunks), "more_body": True})
+                    return
+                await self._finish(start, b"".join(chunks), request_headers, send)
+
+        await self.app(scope, receive, send_wrapper)
+
+    async def _finish(self, start, body, request_headers, send):
+        headers = MutableHeaders(raw=start["headers"])
+        etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+        headers["etag"] = etag
+        if is_not_modified(request_headers, etag, headers.get("last-modified")):
+            await send(_not_modified(start))
+            body = b""
+        else:
+            await send(start)
+        await send({"type": "http.response.body", "body": body})
+
+
+def _is_stream(headers):
+    return "text/event-stream" in headers.get("content-type", "")
+
+
+def _not_modified(start):
+    headers = [(k, v) for k, v in start["headers"] if k.lower() in NOT_MODIFIED_HEADERS]
+    return {"type": "http.response.start", "status": 304, "headers": headers}
@@ -0,0 +1,200 @@
+"""On-the-fly response compression: zstd, brotli and gzip.
+
+The HTML pages are compressed ahead of time by ``app.assets``; this
+middleware covers everything else (JSON, metrics, event streams). For a
+response the client accepts an encoding for, it compresses when
+
+* it has no ``Content-Encoding`` yet and is not a HEAD, 204, 304 or
+  partial (``Content-Range``) reply,
+* its media type is in ``COMPRESS_TYPES`` (prefix match), and
+* the body is at least ``COMPRESS_MIN_SIZE`` bytes. Below that the framing
+  overhead eats most of the saving and the CPU time is wasted; tune it with
+  ``python -m benchmarks.bench_compression``. Streams of unknown length are
+  always compressed.
+
+``text/event-stream`` and NDJSON bodies are compressed as they stream, with
+a flush after every chunk so each event or line reaches the client at once.
+
+zstd and brotli need the optional ``zstandard`` and ``brotli`` packages; the
+server's preference order is ``COMPRESS_ENCODINGS``. Compressed responses
+get ``Vary: Accept-Encoding`` and a weak ETag, since their bytes differ from
+the identity representation the ETag was computed for.
+"""
+import os
+import zlib
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from .assets import choose_encoding
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+COMPRESS_MIN_SIZE = int(os.environ.get("COMPRESS_MIN_SIZE", "1024"))
+COMPRESS_TYPES = tuple(os.environ.get(
+    "COMPRESS_TYPES",
+    "text/,application/json,application/x-ndjson,application/javascript,application/xml,image/svg+xml",
+).split(","))
+# Flushed after every chunk rather than left to fill the compressor's window.
+STREAM_TYPES = ("text/event-stream", "application/x-ndjson")
+
+# Fast levels: this runs per response, unlike the pages' one-off maximum.
+GZIP_LEVEL = int(os.environ.get("GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.environ.get("BROTLI_QUALITY", "4"))
+ZSTD_LEVEL = int(os.environ.get("ZSTD_LEVEL", "3"))
+
+
+class GzipEncoder:
+    def __init__(self, level=GZIP_LEVEL):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data):
+        return self._compressor.compress(data)
+
+    def flush(self):
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class BrotliEncoder:
+    def __init__(self, quality=BROTLI_QUALITY):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data):
+        return self._compressor.process(data)
+
+    def flush(self):
+        return self._compressor.flush()
+
+    def finish(self):
+        return self._compressor.finish()
+
+
+class ZstdEncoder:
+    def __init__(self, level=ZSTD_LEVEL):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data):
+        return self._compressor.compress(data)
+
+    def flush(self):
+        return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self):
+        return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_FINISH)
+
+
+ENCODERS = {"gzip": GzipEncoder}
+if brotli is not None:
+    ENCODERS["br"] = BrotliEncoder
+if zstandard is not None:
+    ENCODERS["zstd"] = ZstdEncoder
+
+COMPRESS_ENCODINGS = tuple(
+    coding for coding in os.environ.get("COMPRESS_ENCODINGS", "zstd,br,gzip").split(",") if coding in ENCODERS
+)
+
+
+def compress(coding, body):
+    """``body`` compressed in one go with the middleware's settings."""
+    encoder = ENCODERS[coding]()
+    return encoder.compress(body) + encoder.finish()
+
+
+def compressible(media_type, size):
+    """Whether the middleware, as configured, would compress such a response."""
+    return bool(COMPRESS_ENCODINGS) and media_type.startswith(COMPRESS_TYPES) and size >= COMPRESS_MIN_SIZE
+
+
+def _media_type(headers):
+    return headers.get("content-type", "").partition(";")[0].strip().lower()
+
+
+class CompressionMiddleware:
+    def __init__(self, app, min_size=COMPRESS_MIN_SIZE, types=COMPRESS_TYPES, encodings=COMPRESS_ENCODINGS):
+        self.app = app
+        self.min_size = min_size
+        self.types = types
+        self.encodings = encodings
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "HEAD" or not self.encodings:
+            await self.app(scope, receive, send)
+            return
+
+        coding = choose_encoding(Headers(scope=scope).get("accept-encoding"), self.encodings)
+        start = None
+        encoder = None
+        streaming = False
+        mode = "pass"  # "pass" | "wait" (for the first body chunk) | "compress"
+
+        async def send_wrapper(message):
+            nonlocal start, encoder, streaming, mode
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(raw=message["headers"])
+                media_type = _media_type(headers)
+                length = headers.get("content-length")
+                if (
+                    message["status"] in (204, 304)
+                    or "content-encoding" in headers
+                    or "content-range" in headers
+                    or not media_type.startswith(self.types)
+                    or (length is not None and int(length) < self.min_size)
+                ):
+                    await send(message)
+                    return
+                # The body may be compressed, so caches must key on Accept-Encoding.
+                headers.add_vary_header("Accept-Encoding")
+                if coding == "identity":
+                    await send(message)
+                    return
+                start = message
+                streaming = media_type in STREAM_TYPES
+                mode = "wait"
+                return
+
+            if mode == "pass":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if mode == "wait":
+                if not more_body and len(body) < self.min_size:
+                    mode = "pass"
+                    await send(start)
+                    await send(message)
+                    return
+                mode = "compress"
+                encoder = ENCODERS[coding]()
+                headers = MutableHeaders(raw=start["headers"])
+                headers["content-encoding"] = coding
+                if "etag" in headers and not headers["etag"].startswith("W/"):
+                    headers["etag"] = "W/" + headers["etag"]
+                if more_body:
+                    del headers["content-length"]
+                    body = encoder.compress(body) + (encoder.flush() if streaming else b"")
+                else:
+                    body = encoder.compress(body) + encoder.finish()
+                    headers["content-length"] = str(len(body))
+                await send(start)
+                await send({"type": "http.response.body", "body": body, "more_body": more_body})
+                return
+
+            if more_body:
+                body = encoder.compress(body) + (encoder.flush() if streaming else b"")
+                if body:
+                    await send({"type": "http.response.body", "body": body, "more_body": True})
+            else:
+                await send({"type": "http.response.body", "body": encoder.compress(body) + encoder.finish()})
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,78 @@
+"""In-process publish/subscribe of server-sent events.
+
+Each event is encoded to its ``text/event-stream`` form once at publish time
+and the same bytes are handed to every subscriber queue. Slow subscribers
+lose their oldest events rather than growing memory without bound.
+
+A stream ends after ``SSE_MAX_AGE`` seconds (0 for never) and tells the
+browser, through the ``retry`` field, to reconnect ``SSE_RETRY_MS`` later.
+Keeping that below the server's graceful shutdown timeout means open streams
+never hold up a shutdown or a worker restart; ``EventSource`` reconnects on
+its own and receives the current state again as its initial events.
+"""
+import asyncio
+import os
+
+from .responses import dumps
+
+SSE_QUEUE_SIZE = int(os.environ.get("SSE_QUEUE_SIZE", "256"))
+SSE_KEEPALIVE = float(os.environ.get("SSE_KEEPALIVE", "15"))
+SSE_MAX_AGE = float(os.environ.get("SSE_MAX_AGE", "25"))
+SSE_RETRY_MS = int(os.environ.get("SSE_RETRY_MS", "1000"))
+
+
+def encode_event(event, data):
+    return b"event: " + event.encode() + b"\ndata: " + dumps(data) + b"\n\n"
+
+
+class EventBroker:
+    def __init__(self, queue_size=SSE_QUEUE_SIZE, keepalive=SSE_KEEPALIVE, max_age=SSE_MAX_AGE, retry_ms=SSE_RETRY_MS):
+        self.queue_size = queue_size
+        self.keepalive = keepalive
+        self.max_age = max_age
+        self.retry_ms = retry_ms
+        self._subscribers = set()
+
+    @property
+    def subscriber_count(self):
+        return len(self._subscribers)
+
+    def subscribe(self):
+        queue = asyncio.Queue(self.queue_size)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue):
+        self._subscribers.discard(queue)
+
+    def publish(self, event, data):
+        if not self._subscribers:
+            return
+        message = encode_event(event, data)
+        for queue in self._subscribers:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(message)
+
+    async def stream(self, initial=()):
+        """Yield encoded events for one client until it disconnects or
+        ``max_age`` runs out.
+
+        ``initial`` events are sent first so a new client does not need a
+        separate request to learn the current state.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_age if self.max_age else float("inf")
+        queue = self.subscribe()
+        try:
+            yield f"retry: {self.retry_ms}\n\n".encode()
+            for event, data in initial:
+                yield encode_event(event, data)
+            while (remaining := deadline - loop.time()) > 0:
+                try:
+                    yield await asyncio.wait_for(queue.get(), min(self.keepalive, remaining))
+                except TimeoutError:
+                    if remaining > self.keepalive:
+                        yield b": keepalive\n\n"
+        finally:
+            self.unsubscribe(queue)
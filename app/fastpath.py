@@ -0,0 +1,128 @@
+"""Answer the hottest near-static routes before FastAPI is entered.
+
+Load balancers and monitoring poll ``/api`` and ``/version`` far more than
+anything else, and each poll otherwise goes through routing, dependency
+resolution and the caching, compression and profiling middleware to send a
+body that hardly changes. Routes opt in with the ``fast_path`` decorator::
+
+    @app.get("/version")
+    @cache_control(max_age=3600)
+    @fast_path(VERSION_RESPONSE)
+    async def version(): ...
+
+giving either a prebuilt ``StaticResponse`` or a function returning the
+JSON payload (for ``/api``, whose body carries the time). On the first
+request ``FastPathMiddleware`` reads those routes from the router and
+prebuilds their headers, ``Cache-Control`` and ``Last-Modified`` included
+from the route's ``cache_control`` policy. After that a GET or HEAD for one
+of those paths is a dict lookup and two ``send`` calls; ``If-None-Match``
+and ``If-Modified-Since`` are answered with 304 as ``CachingMiddleware``
+would.
+
+It sits just inside ``MetricsMiddleware`` and sets ``scope["route"]``, so
+these requests are still counted under their route. Requests the profiler
+may want, and responses ``CompressionMiddleware`` would compress, take the
+normal path. Set ``FAST_PATH=0`` to send everything through FastAPI
+(``python -m benchmarks.bench_fastpath`` compares the two).
+"""
+import os
+
+from starlette.datastructures import Headers
+from starlette.responses import Response
+
+from .caching import NOT_MODIFIED_HEADERS, http_date, is_not_modified
+from .compression import compressible
+from .responses import dumps
+
+FAST_PATH = os.environ.get("FAST_PATH", "1") != "0"
+
+_CONDITIONAL = (b"if-none-match", b"if-modified-since")
+
+
+def fast_path(source):
+    """Let ``FastPathMiddleware`` serve a route: ``source`` is a ``StaticResponse`` or a payload function."""
+
+    def decorator(endpoint):
+        endpoint.fast_path = source
+        return endpoint
+
+    return decorator
+
+
+class FastRoute:
+    def __init__(self, route):
+        self.route = route
+        self.endpoint = route.endpoint
+        source = self.endpoint.fast_path
+        policy = getattr(self.endpoint, "cache_policy", None)
+        cache_headers = []
+        if policy is not None:
+            cache_headers.append((b"cache-control", policy.header.encode()))
+            if policy.last_modified is not None:
+                cache_headers.append((b"last-modified", http_date(policy.last_modified).encode()))
+        if isinstance(source, Response):
+            self.render, self.body = None, source.body
+            self.headers = [*source.raw_headers, *cache_headers]
+        else:
+            self.render, self.body = source, None
+            self.headers = [(b"content-type", b"application/json"), *cache_headers]
+        raw = dict(self.headers)
+        self.etag = raw[b"etag"].decode() if b"etag" in raw else None
+        self.last_modified = raw[b"last-modified"].decode() if b"last-modified" in raw else None
+        # Only a fixed body has validators worth checking.
+        self.conditional = self.body is not None and policy is not None and not policy.no_store
+
+    def response(self, scope):
+        """``(status, headers, body)`` for this request, or None to leave it to the app."""
+        headers = list(self.headers)
+        if self.render is not None:
+            body = dumps(self.render())
+            headers.append((b"content-length", str(len(body)).encode()))
+        else:
+            body = self.body
+            if (
+                self.conditional
+                and any(name in _CONDITIONAL for name, _ in scope["headers"])
+                and is_not_modified(Headers(scope=scope), self.etag, self.last_modified)
+            ):
+                return 304, [(k, v) for k, v in headers if k in NOT_MODIFIED_HEADERS], b""
+        if compressible("application/json", len(body)):
+            return None
+        return 200, headers, b"" if scope["method"] == "HEAD" else body
+
+
+class FastPathMiddleware:
+    def __init__(self, app, router, profiler=None, enabled=FAST_PATH):
+        self.app = app
+        self.router = router
+        self.profiler = profiler
+        self.enabled = enabled
+        self._routes = None
+
+    def build(self):
+        """Path -> ``FastRoute`` for every GET route marked with ``fast_path``."""
+        routes = {}
+        for route in self.router.routes:
+            endpoint = getattr(route, "endpoint", None)
+            if hasattr(endpoint, "fast_path") and "GET" in route.methods and not route.param_convertors:
+                routes[route.path] = FastRoute(route)
+        return routes
+
+    async def __call__(self, scope, receive, send):
+        if not self.enabled or scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+            await self.app(scope, receive, send)
+            return
+        if self._routes is None:
+            self._routes = self.build()
+        fast = self._routes.get(scope["path"])
+        response = None
+        if fast is not None and (self.profiler is None or not self.profiler.may_profile(scope)):
+            response = fast.response(scope)
+        if response is None:
+            await self.app(scope, receive, send)
+            return
+        status, headers, body = response
+        scope["route"] = fast.route
+        scope["endpoint"] = fast.endpoint
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
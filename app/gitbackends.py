@@ -0,0 +1,247 @@
+"""Where ``git status`` comes from: the git CLI or an in-process library.
+
+``GIT_BACKEND`` selects one:
+
+* ``cli`` (default) runs ``git status --short`` through ``GitRunner``;
+* ``incremental`` also uses the CLI, but with git's untracked cache and,
+  while the repository watcher runs, only for the paths it saw change;
+* ``pygit2`` reads the index and working tree with libgit2, in-process;
+* ``dulwich`` does the same in pure Python.
+
+The library backends save a fork/exec per refresh and need the optional
+``pygit2`` or ``dulwich`` package. They run in a worker thread, since both
+block, and produce the same ``XY path`` lines as ``git status --short``,
+except that untracked directories are listed file by file (like ``-uall``)
+and renames show as a deletion plus an addition. Commit and push always use
+the CLI, which also handles credentials and hooks.
+
+``python -m benchmarks.bench_git_backends`` compares them, and
+``python -m benchmarks.bench_git_incremental`` shows how the incremental
+backend scales with repository size.
+
+The incremental backend keeps the last status per path. A change the
+watcher reports outside ``.git`` only re-runs ``git status`` for the
+changed paths (``git status -- <paths>``) and merges the result in, so the
+cost follows the number of changes, not the size of the tree. Anything else
+means a full scan: a change inside ``.git`` (commits, staging, checkouts),
+more than ``GIT_STATUS_MAX_PATHS`` changed paths, a staged rename, an
+explicit ``invalidate()``, or no watcher at all (then every TTL refresh is
+a full scan, which the untracked cache still makes cheaper). It always
+lists untracked files one by one (``--untracked-files=all``), so that each
+path has its own entry.
+"""
+import asyncio
+import os
+import weakref
+
+try:
+    import pygit2
+except ImportError:  # pragma: no cover - optional dependency
+    pygit2 = None
+
+try:
+    from dulwich import errors as dulwich_errors
+    from dulwich import porcelain as dulwich_porcelain
+except ImportError:  # pragma: no cover - optional dependency
+    dulwich_porcelain = None
+
+GIT_BACKEND = os.environ.get("GIT_BACKEND", "cli")
+GIT_STATUS_MAX_PATHS = int(os.environ.get("GIT_STATUS_MAX_PATHS", "256"))
+
+INCREMENTAL_STATUS = (
+    "--literal-pathspecs", "-c", "core.untrackedCache=true",
+    "status", "--short", "-z", "--untracked-files=all",
+)
+
+# libgit2 git_status_t flags (the values of pygit2.GIT_STATUS_*).
+INDEX_FLAGS = ((1, "A"), (2, "M"), (4, "D"), (8, "R"), (16, "T"))
+WORKTREE_FLAGS = ((256, "M"), (512, "D"), (1024, "T"), (2048, "R"))
+WT_NEW = 128
+IGNORED = 16384
+CONFLICTED = 32768
+
+
+def format_libgit2_status(status):
+    """``{path: libgit2 status flags}`` -> ``git status --short`` output."""
+    lines = []
+    for path, flags in sorted(status.items()):
+        if flags & IGNORED:
+            continue
+        if flags & CONFLICTED:
+            code = "UU"
+        elif flags == WT_NEW:
+            code = "??"
+        else:
+            x = next((c for bit, c in INDEX_FLAGS if flags & bit), " ")
+            y = next((c for bit, c in WORKTREE_FLAGS if flags & bit), " ")
+            code = x + y
+        lines.append(f"{code} {path}")
+    return "\n".join(lines)
+
+
+def format_dulwich_status(status, root):
+    """dulwich's ``porcelain.status()`` -> ``git status --short`` output."""
+    codes = {}
+    for kind, code in (("add", "A"), ("modify", "M"), ("delete", "D")):
+        for path in status.staged[kind]:
+            codes[os.fsdecode(path)] = code + " "
+    for path in map(os.fsdecode, status.unstaged):
+        # dulwich does not say whether the file changed or went away.
+        y = "M" if os.path.lexists(os.path.join(root, path)) else "D"
+        codes[path] = codes.get(path, " ")[0] + y
+    for path in map(os.fsdecode, status.untracked):
+        codes[path] = "??"
+    return "\n".join(f"{code} {path}" for path, code in sorted(codes.items()))
+
+
+def parse_short_z(stdout):
+    """``git status --short -z`` output -> ``{path: (XY, original path or None)}``."""
+    entries = {}
+    fields = iter(stdout.split("\0"))
+    for field in fields:
+        if not field:
+            continue
+        code, path = field[:2], field[3:]
+        # A rename or copy is followed by the path it came from.
+        orig = next(fields) if code[0] in "RC" else None
+        entries[path] = (code, orig)
+    return entries
+
+
+def render_short(entries):
+    """``{path: (XY, orig)}`` -> ``git status --short`` lines, untracked last."""
+    lines = []
+    for path in sorted(entries, key=lambda path: (entries[path][0] == "??", path)):
+        code, orig = entries[path]
+        lines.append(f"{code} {orig} -> {path}" if orig else f"{code} {path}")
+    return "\n".join(lines)
+
+
+class StatusBackend:
+    """Hooks the repository calls; only the incremental backend uses them."""
+
+    # Set by the repository while its file watcher runs.
+    watching = False
+
+    def changed(self, paths):
+        """The watcher saw ``paths`` (absolute) change."""
+
+    def reset(self):
+        """Forget what is known; the next status is a full scan."""
+
+
+class CliBackend(StatusBackend):
+    name = "cli"
+
+    def __init__(self, git):
+        self.git = git
+
+    async def status(self):
+        return (await self.git.run("status", "--short")).stdout
+
+
+class IncrementalCliBackend(StatusBackend):
+    name = "incremental"
+
+    def __init__(self, git, max_paths=GIT_STATUS_MAX_PATHS):
+        self.git = git
+        self.max_paths = max_paths
+        self._entries = None
+        # Paths (relative to the repo) changed since the last scan; None: unknown.
+        self._dirty = None
+        self._locks = weakref.WeakKeyDictionary()
+
+    def changed(self, paths):
+        if self._dirty is None:
+            return
+        for path in paths:
+            relative = os.path.relpath(path, self.git.cwd)
+            if relative == ".git" or relative.startswith((".git" + os.sep, "..")):
+                self._dirty = None
+                return
+            self._dirty.add(relative)
+        if len(self._dirty) > self.max_paths:
+            self._dirty = None
+
+    def reset(self):
+        self._dirty = None
+
+    async def status(self):
+        # One scan at a time, so results are merged in the order git ran.
+        loop = asyncio.get_running_loop()
+        lock = self._locks.get(loop)
+        if lock is None:
+            lock = self._locks[loop] = asyncio.Lock()
+        async with lock:
+            dirty, self._dirty = self._dirty, (set() if self.watching else None)
+            try:
+                if dirty is None or self._entries is None or any(orig for _, orig in self._entries.values()):
+                    self._entries = parse_short_z(await self._run())
+                elif dirty:
+                    self._entries = {
+                        path: entry for path, entry in self._entries.items()
+                        if not any(path == d or path.startswith(d + "/") for d in dirty)
+                    } | parse_short_z(await self._run("--", *sorted(dirty)))
+            except BaseException:
+                self._dirty = None  # rescan everything next time
+                raise
+            return render_short(self._entries)
+
+    async def _run(self, *pathspec):
+        result = await self.git.run(*INCREMENTAL_STATUS, *pathspec)
+        if not result.ok:
+            raise OSError(f"git status failed: {result.output}")
+        return result.stdout
+
+
+class Pygit2Backend(StatusBackend):
+    name = "pygit2"
+
+    def __init__(self, git):
+        self.path = git.cwd
+        self._repo = None
+
+    async def status(self):
+        return await asyncio.to_thread(self._status)
+
+    def _status(self):
+        try:
+            if self._repo is None:
+                self._repo = pygit2.Repository(self.path)
+            # libgit2 re-reads the index when it changed on disk.
+            return format_libgit2_status(self._repo.status(untracked_files="all", ignored=False))
+        except pygit2.GitError as e:
+            self._repo = None
+            raise OSError(f"pygit2: {e}") from e
+
+
+class DulwichBackend(StatusBackend):
+    name = "dulwich"
+
+    def __init__(self, git):
+        self.path = git.cwd
+
+    async def status(self):
+        return await asyncio.to_thread(self._status)
+
+    def _status(self):
+        try:
+            status = dulwich_porcelain.status(self.path, untracked_files="all")
+        except (KeyError, ValueError, dulwich_porcelain.Error, dulwich_errors.NotGitRepository) as e:
+            raise OSError(f"dulwich: {e}") from e
+        return format_dulwich_status(status, self.path)
+
+
+BACKENDS = {"cli": CliBackend, "incremental": IncrementalCliBackend}
+if pygit2 is not None:
+    BACKENDS["pygit2"] = Pygit2Backend
+if dulwich_porcelain is not None:
+    BACKENDS["dulwich"] = DulwichBackend
+
+
+def make_backend(git, name=None):
+    """The status backend called ``name`` (default ``GIT_BACKEND``) for ``git``."""
+    name = name or GIT_BACKEND
+    if name not in BACKENDS:
+        raise ValueError(f"GIT_BACKEND={name!r} is not available; available: {', '.join(BACKENDS)}")
+    return BACKENDS[name](git)
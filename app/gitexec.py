@@ -0,0 +1,170 @@
+"""Asyncio-native execution of git subprocesses.
+
+Every git call made by the API goes through a ``GitRunner`` so that git never
+blocks the event loop: processes are spawned with asyncio, bounded by a
+per-loop semaphore, killed on timeout and killed on cancellation (e.g. when
+the client disconnects).
+"""
+import asyncio
+import os
+import signal
+import time
+import weakref
+from dataclasses import dataclass
+
+from .metrics import GIT_DURATION
+
+REPO_DIR = os.environ.get("GIT_REPO_DIR", "/app")
+GIT_TIMEOUT = float(os.environ.get("GIT_TIMEOUT", "30"))
+GIT_PUSH_TIMEOUT = float(os.environ.get("GIT_PUSH_TIMEOUT", "120"))
+GIT_MAX_CONCURRENCY = int(os.environ.get("GIT_MAX_CONCURRENCY", "4"))
+STREAM_LIMIT = 1024 * 1024
+STREAM_CHUNK = 64 * 1024
+
+
+class GitTimeoutError(Exception):
+    """Raised when a git process does not finish within its timeout."""
+
+
+@dataclass
+class GitResult:
+    args: tuple
+    returncode: int
+    stdout: str
+    stderr: str
+
+    @property
+    def ok(self):
+        return self.returncode == 0
+
+    @property
+    def output(self):
+        return (self.stdout + self.stderr).strip()
+
+
+class GitRunner:
+    """Runs git commands in ``cwd`` without blocking the event loop."""
+
+    def __init__(self, cwd=REPO_DIR, timeout=GIT_TIMEOUT, max_concurrency=GIT_MAX_CONCURRENCY):
+        self.cwd = cwd
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        # asyncio primitives belong to one loop; keep a semaphore per loop.
+        self._semaphores = weakref.WeakKeyDictionary()
+
+    def _semaphore(self):
+        loop = asyncio.get_running_loop()
+        sem = self._semaphores.get(loop)
+        if sem is None:
+            sem = self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        return sem
+
+    async def run(self, *args, timeout=None, on_output=None):
+        """Run ``git *args`` and return a ``GitResult``.
+
+        ``on_output(stream, line)`` is called for every line git writes, as
+        it is written, with ``stream`` being ``"stdout"`` or ``"stderr"``.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        stdout, stderr = [], []
+        command = next((a for a in args if not a.startswith("-") and "=" not in a), "git")
+        outcome = "error"
+        async with self._semaphore():
+            started = time.perf_counter()
+            proc = await self._spawn(args)
+            try:
+                await asyncio.wait_for(
+                    asyncio.gather(
+                        _read_lines(proc.stdout, "stdout", stdout, on_output),
+                        _read_lines(proc.stderr, "stderr", stderr, on_output),
+                        proc.wait(),
+                    ),
+                    timeout,
+                )
+                outcome = "ok" if proc.returncode == 0 else "error"
+            except TimeoutError:
+                outcome = "timeout"
+                raise GitTimeoutError(f"git {' '.join(args)} timed out after {timeout}s") from None
+            except asyncio.CancelledError:
+                outcome = "cancelled"
+                raise
+            finally:
+                # Whatever went wrong (timeout, cancellation, an over-long
+                # line, a failing on_output callback), never leave git running.
+                if proc.returncode is None:
+                    await asyncio.shield(_terminate(proc))
+                GIT_DURATION.observe(time.perf_counter() - started, (command, outcome))
+        return GitResult(
+            args=args,
+            returncode=proc.returncode,
+            stdout=b"".join(stdout).decode("utf-8", "replace"),
+            stderr=b"".join(stderr).decode("utf-8", "replace"),
+        )
+
+
+    async def stream(self, *args, timeout=None, chunk_size=STREAM_CHUNK):
+        """Run ``git *args`` and yield its stdout in chunks as git writes it.
+
+        For output too large to buffer. Closing the generator early (e.g.
+        with ``contextlib.aclosing``) kills git, so a caller that has read
+        enough does not pay for the rest. Raises ``OSError`` if git exits
+        non-zero and ``GitTimeoutError`` once ``timeout`` has passed.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        command = next((a for a in args if not a.startswith("-") and "=" not in a), "git")
+        outcome = "stopped"
+        async with self._semaphore():
+            started = time.perf_counter()
+            deadline = time.monotonic() + timeout
+            proc = await self._spawn(args)
+            stderr = asyncio.ensure_future(proc.stderr.read())
+            try:
+                while chunk := await asyncio.wait_for(proc.stdout.read(chunk_size), deadline - time.monotonic()):
+                    yield chunk
+                await asyncio.wait_for(proc.wait(), deadline - time.monotonic())
+                outcome = "ok" if proc.returncode == 0 else "error"
+                if proc.returncode != 0:
+                    message = (await stderr).decode("utf-8", "replace").strip()
+                    raise OSError(f"git {' '.join(args)} failed: {message}")
+            except TimeoutError:
+                outcome = "timeout"
+                raise GitTimeoutError(f"git {' '.join(args)} timed out after {timeout}s") from None
+            except asyncio.CancelledError:
+                outcome = "cancelled"
+                raise
+            finally:
+                if proc.returncode is None:
+                    await asyncio.shield(_terminate(proc))
+                stderr.cancel()
+                GIT_DURATION.observe(time.perf_counter() - started, (command, outcome))
+
+    def _spawn(self, args):
+        return asyncio.create_subprocess_exec(
+            "git", *args,
+            cwd=self.cwd,
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            start_new_session=True,
+            limit=STREAM_LIMIT,
+        )
+
+
+async def _read_lines(stream, name, chunks, on_output):
+    while True:
+        line = await stream.readline()
+        if not line:
+            return
+        chunks.append(line)
+        if on_output is not None:
+            on_output(name, line.decode("utf-8", "replace").rstrip("\r\n"))
+
+
+async def _terminate(proc):
+    # git runs hooks and remote helpers as children; kill the whole group so
+    # none of them keeps the pipes open after git itself is gone.
+    try:
+        os.killpg(proc.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+    await proc.wait()
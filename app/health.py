@@ -0,0 +1,130 @@
+"""Liveness and readiness probes.
+
+``/healthz`` says the process is up and serving: a constant response, no
+I/O, so a busy git cannot get a healthy worker restarted. ``/readyz`` says
+whether the git routes can work: git runs, ``GIT_REPO_DIR`` is a working
+tree, and its index can be written (``git commit`` writes ``index.lock``
+next to it). Those checks cost three git processes, so they are not run per
+probe: ``ReadinessProbe`` runs them in the background every
+``READY_INTERVAL`` seconds and ``/readyz`` serves the last result, however
+often it is polled.
+
+A result older than ``READY_MAX_AGE`` counts as not ready: the checks
+hanging or the event loop stalling should not leave a stale "ready" up.
+Each check's last outcome is also exported as the ``readiness_check_ok``
+gauge.
+"""
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass
+
+from .gitexec import GitTimeoutError
+from .metrics import READINESS_CHECKS
+
+READY_INTERVAL = float(os.environ.get("READY_INTERVAL", "10"))
+READY_TIMEOUT = float(os.environ.get("READY_TIMEOUT", "5"))
+READY_MAX_AGE = float(os.environ.get("READY_MAX_AGE", str(3 * READY_INTERVAL)))
+
+CHECKS = ("git", "repository", "index")
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Readiness:
+    checks: dict  # check name -> (ok, detail)
+    checked_at: float  # time.monotonic()
+
+    @property
+    def ready(self):
+        return all(ok for ok, _ in self.checks.values())
+
+
+def _index_writable(git_dir):
+    index = os.path.join(git_dir, "index")
+    if not os.access(git_dir, os.W_OK):
+        return False, f"{git_dir} is not writable"
+    if os.path.exists(index) and not os.access(index, os.W_OK):
+        return False, f"{index} is not writable"
+    return True, index
+
+
+class ReadinessProbe:
+    """Checks ``repo``'s dependencies in the background and keeps the last result."""
+
+    def __init__(self, repo, interval=READY_INTERVAL, timeout=READY_TIMEOUT, max_age=READY_MAX_AGE):
+        self.repo = repo
+        self.interval = interval
+        self.timeout = timeout
+        self.max_age = max_age
+        self.result = None
+        self._task = None
+
+    async def check(self):
+        """Run every check now, store the ``Readiness`` and return it."""
+        git = self.repo.git
+        checks = {}
+        try:
+            # Shared with the startup setup; it adds the repo as a safe.directory.
+            await self.repo.setup()
+        except (OSError, GitTimeoutError):
+            pass  # whatever broke it shows up below
+        try:
+            result = await git.run("--version", timeout=self.timeout)
+            checks["git"] = (result.ok, result.output)
+        except (OSError, GitTimeoutError) as e:
+            checks["git"] = (False, str(e))
+        git_dir = None
+        if checks["git"][0]:
+            try:
+                result = await git.run("rev-parse", "--is-inside-work-tree", "--absolute-git-dir", timeout=self.timeout)
+                inside, _, git_dir = result.stdout.strip().partition("\n")
+                if result.ok and inside == "true":
+                    checks["repository"] = (True, git.cwd)
+                else:
+                    checks["repository"] = (False, result.output or f"{git.cwd} is not a working tree")
+                    git_dir = None
+            except (OSError, GitTimeoutError) as e:
+                checks["repository"] = (False, str(e))
+        if git_dir:
+            checks["index"] = await asyncio.to_thread(_index_writable, git_dir)
+        for name in CHECKS:
+            checks.setdefault(name, (False, "not checked"))
+            READINESS_CHECKS.set(int(checks[name][0]), (name,))
+        self.result = Readiness(checks, time.monotonic())
+        return self.result
+
+    def state(self):
+        """The last result as a JSON-ready dict; never does I/O."""
+        result = self.result
+        if result is None:
+            return {"ready": False, "detail": "checks have not run yet", "checks": {}}
+        age = time.monotonic() - result.checked_at
+        state = {
+            "ready": result.ready and age <= self.max_age,
+            "age_seconds": round(age, 3),
+            "checks": {name: {"ok": ok, "detail": detail} for name, (ok, detail) in result.checks.items()},
+        }
+        if age > self.max_age:
+            state["detail"] = f"last check is {age:.0f}s old"
+        return state
+
+    async def _run(self):
+        while True:
+            try:
+                await self.check()
+            except Exception:
+                logger.exception("readiness check failed")
+            await asyncio.sleep(self.interval)
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
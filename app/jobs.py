@@ -0,0 +1,156 @@
+"""Queued git write operations (commit, push) run by a single worker.
+
+``POST /api/git-commit`` and ``POST /api/git-push`` only enqueue a ``Job``
+and answer ``202 Accepted`` with its id; ``GET /api/jobs/{id}`` reports its
+status and output. One worker per event loop takes jobs in order, so
+operations on the repository never overlap (no two clients fighting over
+``index.lock``) and a slow push no longer holds a request open. Live output
+still goes to the event stream, tagged with the job id.
+
+At most ``JOB_QUEUE_SIZE`` jobs wait at once; beyond that ``submit`` raises
+``JobQueueFull``. The last ``JOB_HISTORY`` finished jobs are kept.
+"""
+import asyncio
+import logging
+import os
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass, field
+
+from .gitexec import GitTimeoutError
+
+JOB_QUEUE_SIZE = int(os.environ.get("JOB_QUEUE_SIZE", "100"))
+JOB_HISTORY = int(os.environ.get("JOB_HISTORY", "1000"))
+# Upper bound on ?wait= for the job routes, in seconds.
+JOB_WAIT_MAX = float(os.environ.get("JOB_WAIT_MAX", "30"))
+
+COMMIT_MESSAGE = "feat: Demo change from frontend"
+
+logger = logging.getLogger(__name__)
+
+
+class JobQueueFull(Exception):
+    """Too many jobs are already waiting."""
+
+
+@dataclass
+class Job:
+    id: str
+    operation: str
+    params: dict
+    status: str = "queued"  # "queued" | "running" | "succeeded" | "failed"
+    output: str = ""
+    success: bool | None = None
+    created_at: float = field(default_factory=time.time)
+    started_at: float | None = None
+    finished_at: float | None = None
+    _done: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+
+    @property
+    def finished(self):
+        return self.status in ("succeeded", "failed")
+
+    async def wait(self, timeout):
+        """Wait up to ``timeout`` seconds for the job to finish."""
+        if not self.finished and timeout > 0:
+            try:
+                await asyncio.wait_for(self._done.wait(), timeout)
+            except TimeoutError:
+                pass
+        return self.finished
+
+    def as_dict(self):
+        return {
+            "id": self.id,
+            "operation": self.operation,
+            "status": self.status,
+            "output": self.output,
+            "success": self.success,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class JobQueue:
+    """FIFO of git jobs on one ``GitRepository``, run one at a time."""
+
+    def __init__(self, repo, queue_size=JOB_QUEUE_SIZE, history=JOB_HISTORY):
+        self.repo = repo
+        self.queue_size = queue_size
+        self.history = history
+        self._jobs = {}
+        self._pending = deque()
+        self._wakeup = None
+        self._worker = None
+
+    @property
+    def depth(self):
+        return len(self._pending)
+
+    def get(self, job_id):
+        return self._jobs.get(job_id)
+
+    def submit(self, operation, **params):
+        """Enqueue ``operation`` ("commit" or "push"); return its ``Job``."""
+        if operation not in ("commit", "push"):
+            raise ValueError(f"unknown git operation {operation!r}")
+        if len(self._pending) >= self.queue_size:
+            raise JobQueueFull(f"{len(self._pending)} git jobs are already queued")
+        job = Job(uuid.uuid4().hex[:12], operation, params)
+        self._jobs[job.id] = job
+        self._pending.append(job)
+        self._ensure_worker()
+        return job
+
+    def _ensure_worker(self):
+        loop = asyncio.get_running_loop()
+        if self._worker is None or self._worker.done() or self._worker.get_loop() is not loop:
+            self._wakeup = asyncio.Event()
+            self._worker = loop.create_task(self._run())
+        self._wakeup.set()
+
+    def _forget_old_jobs(self):
+        # Dicts keep insertion order, so the oldest jobs come first.
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[:max(len(finished) - self.history, 0)]:
+            del self._jobs[job_id]
+
+    async def stop(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            await asyncio.gather(self._worker, return_exceptions=True)
+            self._worker = None
+
+    async def _run(self):
+        while True:
+            while self._pending:
+                await self._execute(self._pending.popleft())
+                self._forget_old_jobs()
+            self._wakeup.clear()
+            await self._wakeup.wait()
+
+    async def _execute(self, job):
+        job.status = "running"
+        job.started_at = time.time()
+        try:
+            if job.operation == "commit":
+                result = await self.repo.commit(job.params.get("message", COMMIT_MESSAGE), op_id=job.id)
+            else:
+                remote, branch = job.params.get("remote", "origin"), job.params.get("branch", "main")
+                result = await self.repo.push(remote, branch, op_id=job.id)
+            job.output, job.success = result.output, result.ok
+        except (OSError, GitTimeoutError) as e:
+            job.output, job.success = str(e), False
+        except asyncio.CancelledError:
+            job.output, job.success = "cancelled: the server is shutting down", False
+            raise
+        except Exception as e:
+            # Keep the worker alive for the jobs behind this one.
+            logger.exception("git job %s (%s) failed", job.id, job.operation)
+            job.output, job.success = str(e), False
+        finally:
+            job.status = "succeeded" if job.success else "failed"
+            job.finished_at = time.time()
+            job._done.set()
@@ -0,0 +1,349 @@
+"""Prometheus metrics with per-worker aggregation.
+
+Every metric is updated from its worker's event loop thread only, so updates
+are plain dict operations with no locks. Each uvicorn worker keeps its own
+values; when ``METRICS_DIR`` points at a directory shared by the workers,
+each one also writes its values to ``<METRICS_DIR>/<pid>-<nonce>.json``
+(every ``METRICS_FLUSH_INTERVAL`` seconds and on every scrape) and
+``/metrics`` merges the files, so whichever worker is scraped reports the
+whole server. The counters and histograms of exited workers are folded into
+``archive.json`` by the next scrape, so totals never go backwards when
+workers are recycled and their files do not pile up.
+"""
+import bisect
+import fcntl
+import json
+import os
+import threading
+import time
+
+METRICS_DIR = os.environ.get("METRICS_DIR")
+METRICS_FLUSH_INTERVAL = float(os.environ.get("METRICS_FLUSH_INTERVAL", "5"))
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SUBPROCESS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+ARCHIVE = "archive.json"
+
+
+class Metric:
+    kind = None
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+
+    def snapshot(self):
+        return {"kind": self.kind, "help": self.help, "labelnames": self.labelnames,
+                "values": [[list(k), v] for k, v in list(self.values.items())]}
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, labels=(), amount=1):
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def inc(self, labels=(), amount=1):
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def dec(self, labels=(), amount=1):
+        self.values[labels] = self.values.get(labels, 0) - amount
+
+    def set(self, value, labels=()):
+        self.values[labels] = value
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, labels=()):
+        state = self.values.get(labels)
+        if state is None:
+            # [per-bucket counts (last one is +Inf), sum]
+            state = self.values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        state[0][bisect.bisect_left(self.buckets, value)] += 1
+        state[1] += value
+
+    def snapshot(self):
+        data = super().snapshot()
+        data["buckets"] = self.buckets
+        data["values"] = [[k, [list(counts), total]] for k, (counts, total) in data["values"]]
+        return data
+
+
+class Registry:
+    def __init__(self, directory=METRICS_DIR, flush_interval=METRICS_FLUSH_INTERVAL):
+        self.metrics = {}
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self._flusher = None
+        self._nonce = os.urandom(4).hex()
+
+    def register(self, metric):
+        """Add ``metric``, or return the one already registered under its name."""
+        existing = self.metrics.get(metric.name)
+        if existing is not None:
+            if existing.kind != metric.kind:
+                raise ValueError(f"{metric.name} is already registered as a {existing.kind}")
+            return existing
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, help, labelnames=()):
+        return self.register(Counter(name, help, labelnames))
+
+    def gauge(self, name, help, labelnames=()):
+        return self.register(Gauge(name, help, labelnames))
+
+    def histogram(self, name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self.register(Histogram(name, help, labelnames, buckets))
+
+    def snapshot(self):
+        return {name: metric.snapshot() for name, metric in list(self.metrics.items())}
+
+    # -- multi-worker --------------------------------------------------------
+
+    def start_flusher(self):
+        """Write this worker's values to ``directory`` in the background."""
+        if not self.directory or self._flusher is not None:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        self._flusher = threading.Thread(target=self._flush_forever, name="metrics-flush", daemon=True)
+        self._flusher.start()
+
+    def _flush_forever(self):
+        while True:
+            self.flush()
+            time.sleep(self.flush_interval)
+
+    @property
+    def filename(self):
+        # The nonce tells this worker's file apart from that of an exited
+        # worker which had the same PID.
+        return f"{os.getpid()}-{self._nonce}.json"
+
+    def flush(self):
+        _write_json(os.path.join(self.directory, self.filename), self.snapshot())
+
+    def _is_dead(self, name):
+        pid = _file_pid(name)
+        if pid is None:
+            return False
+        if pid == os.getpid():
+            return name != self.filename
+        return not _pid_alive(pid)
+
+    def archive_dead(self):
+        """Fold the files of exited workers into ``archive.json`` and remove them.
+
+        Gauges describe live state and are dropped. Workers scraped at the
+        same time serialize on a lock file, so no file is counted twice.
+        """
+        dead = [entry.path for entry in os.scandir(self.directory) if self._is_dead(entry.name)]
+        if not dead:
+            return
+        archive = os.path.join(self.directory, ARCHIVE)
+        with open(os.path.join(self.directory, "archive.lock"), "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            merged = {}
+            _merge(merged, _read_json(archive) or {}, gauges=False)
+            folded = []
+            for path in dead:
+                snapshot = _read_json(path)
+                if snapshot is not None:  # else already archived by another worker
+                    _merge(merged, snapshot, gauges=False)
+                    folded.append(path)
+            _write_json(archive, _unmerge(merged))
+            for path in folded:
+                os.unlink(path)
+
+    def collect(self):
+        """``(alive, snapshot)`` for every worker, plus the archive of exited ones.
+
+        Just this worker without ``directory``. Does blocking file I/O: call
+        it from a thread, not the event loop.
+        """
+        if not self.directory:
+            return [(True, self.snapshot())]
+        self.flush()
+        self.archive_dead()
+        snapshots = []
+        for entry in os.scandir(self.directory):
+            if entry.name == ARCHIVE or _file_pid(entry.name) is not None:
+                snapshot = _read_json(entry.path)
+                if snapshot is not None:
+                    snapshots.append((entry.name != ARCHIVE, snapshot))
+        return snapshots
+
+    def render(self):
+        """Prometheus text exposition format (0.0.4), merged across workers."""
+        merged = {}
+        for alive, snapshot in self.collect():
+            # Gauges describe live state, so drop those of exited workers.
+            _merge(merged, snapshot, gauges=alive)
+        lines = []
+        for name, data in sorted(merged.items()):
+            lines.append(f"# HELP {name} {data['help']}")
+            lines.append(f"# TYPE {name} {data['kind']}")
+            for labels, value in sorted(data["values"].items()):
+                pairs = list(zip(data["labelnames"], labels))
+                if data["kind"] == "histogram":
+                    lines.extend(_histogram_lines(name, pairs, data["buckets"], *value))
+                else:
+                    lines.append(f"{name}{_labels(pairs)} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _merge(merged, snapshot, gauges=True):
+    for name, data in snapshot.items():
+        if data["kind"] == "gauge" and not gauges:
+            continue
+        target = merged.setdefault(name, {**data, "values": {}})
+        for labels, value in data["values"]:
+            key = tuple(labels)
+            if data["kind"] == "histogram":
+                counts, total = target["values"].get(key, ([0] * len(value[0]), 0.0))
+                target["values"][key] = ([a + b for a, b in zip(counts, value[0])], total + value[1])
+            else:
+                target["values"][key] = target["values"].get(key, 0) + value
+
+
+def _unmerge(merged):
+    """Turn ``_merge`` output back into the snapshot format."""
+    return {name: {**data, "values": [[list(k), v] for k, v in data["values"].items()]}
+            for name, data in merged.items()}
+
+
+def _file_pid(name):
+    """The PID a worker file belongs to; None for any other file."""
+    pid, _, rest = name.partition("-")
+    return int(pid) if pid.isdigit() and rest.endswith(".json") else None
+
+
+def _read_json(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_json(path, data):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+
+def _histogram_lines(name, pairs, buckets, counts, total):
+    cumulative = 0
+    for bound, count in zip([*buckets, "+Inf"], counts):
+        cumulative += count
+        le = bound if bound == "+Inf" else _number(bound)
+        yield f"{name}_bucket{_labels([*pairs, ('le', le)])} {cumulative}"
+    yield f"{name}_sum{_labels(pairs)} {_number(total)}"
+    yield f"{name}_count{_labels(pairs)} {cumulative}"
+
+
+def _labels(pairs):
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _pid_alive(pid):
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+REGISTRY = Registry()
+
+
+
+def http_metrics(registry):
+    """The request counter, in-flight gauge and latency histogram of ``registry``."""
+    return (
+        registry.counter(
+            "http_requests_total", "HTTP requests by route template and status.", ("method", "route", "status")),
+        registry.gauge(
+            "http_requests_in_flight", "HTTP requests currently being handled."),
+        registry.histogram(
+            "http_request_duration_seconds", "HTTP request latency by route template.", ("method", "route")),
+    )
+
+
+HTTP_REQUESTS, HTTP_IN_FLIGHT, HTTP_LATENCY = http_metrics(REGISTRY)
+GIT_DURATION = REGISTRY.histogram(
+    "git_subprocess_duration_seconds", "Duration of git subprocesses by git command.", ("command", "outcome"),
+    buckets=SUBPROCESS_BUCKETS)
+GIT_STATUS_LOOKUPS = REGISTRY.counter(
+    "git_status_lookups_total",
+    "git status lookups by how they were served: from the cached snapshot, by joining a refresh "
+    "already in flight (a git launch saved), or by launching one.", ("result",))
+LOOP_LAG = REGISTRY.histogram(
+    "event_loop_lag_seconds", "How late the event loop ran a timer it was due to run; time it was blocked.")
+LOOP_BLOCKED = REGISTRY.counter(
+    "event_loop_blocked_total", "Times the event loop was blocked for longer than LOOP_LAG_THRESHOLD.")
+READINESS_CHECKS = REGISTRY.gauge(
+    "readiness_check_ok", "Outcome of the last background readiness check (1 ok, 0 failed).", ("check",))
+
+
+class MetricsMiddleware:
+    """Records request counts, in-flight requests and latency per route."""
+
+    def __init__(self, app, registry=REGISTRY):
+        self.app = app
+        self.requests, self.in_flight, self.latency = http_metrics(registry)
+        registry.start_flusher()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        self.in_flight.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            self.in_flight.dec()
+            route = scope.get("route")
+            # Label by template, never raw path, to keep cardinality bounded.
+            template = route.path if route is not None else "<unmatched>"
+            method = scope["method"]
+            self.requests.inc((method, template, str(status)))
+            self.latency.observe(time.perf_counter() - start, (method, template))
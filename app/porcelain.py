@@ -0,0 +1,143 @@
+"""Structured, paginated ``git status``.
+
+``parse_porcelain_v2`` turns the byte chunks of ``git status --porcelain=v2
+-z`` into ``StatusEntry`` objects as they arrive, so a page can be served
+(and git stopped) without reading the whole output. ``paginate`` does
+keyset paging over those entries: git lists changed tracked files sorted by
+path, then untracked ones sorted by path, and a cursor is the position of
+the last entry returned in that order. Cursors therefore stay valid while
+the tree changes between pages.
+"""
+import base64
+from dataclasses import dataclass
+
+# Porcelain v2 XY letters; "." means unchanged on that side.
+STATES = {
+    ".": "unmodified",
+    "M": "modified",
+    "T": "type-changed",
+    "A": "added",
+    "D": "deleted",
+    "R": "renamed",
+    "C": "copied",
+    "U": "unmerged",
+}
+FILTERS = ("staged", "unstaged", "untracked", "unmerged", *(s for s in STATES.values() if s != "unmodified"))
+
+# Number of space-separated fields before the path, per record type.
+_FIELDS = {b"1": 8, b"2": 9, b"u": 10}
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+@dataclass(frozen=True, slots=True)
+class StatusEntry:
+    path: str
+    index: str
+    worktree: str
+    kind: str  # "changed" | "renamed" | "unmerged" | "untracked" | "ignored"
+    orig_path: str | None = None
+
+    @property
+    def key(self):
+        """Position in git's output order."""
+        return (self.kind in ("untracked", "ignored"), self.path)
+
+    def matches(self, wanted):
+        """Whether the entry has any of the ``FILTERS`` in ``wanted``."""
+        for name in wanted:
+            if name in ("untracked", "ignored", "unmerged"):
+                if self.kind == name:
+                    return True
+            elif name == "staged":
+                if self.kind not in ("untracked", "ignored") and self.index != "unmodified":
+                    return True
+            elif name == "unstaged":
+                if self.kind not in ("untracked", "ignored") and self.worktree != "unmodified":
+                    return True
+            elif name in (self.index, self.worktree):
+                return True
+        return False
+
+    def as_dict(self):
+        return {
+            "path": self.path,
+            "index": self.index,
+            "worktree": self.worktree,
+            "kind": self.kind,
+            "orig_path": self.orig_path,
+        }
+
+
+def _decode(raw):
+    return raw.decode("utf-8", "replace")
+
+
+def parse_record(record):
+    """One NUL-terminated porcelain v2 record -> ``StatusEntry`` (or None)."""
+    kind = record[:1]
+    if kind in (b"?", b"!"):
+        label = "untracked" if kind == b"?" else "ignored"
+        return StatusEntry(_decode(record[2:]), label, label, label)
+    fields = _FIELDS.get(kind)
+    if fields is None:
+        return None  # "#" headers
+    parts = record.split(b" ", fields)
+    xy = parts[1].decode()
+    label = {b"1": "changed", b"2": "renamed", b"u": "unmerged"}[kind]
+    return StatusEntry(_decode(parts[fields]), STATES.get(xy[0], xy[0]), STATES.get(xy[1], xy[1]), label)
+
+
+async def parse_porcelain_v2(chunks):
+    """Yield a ``StatusEntry`` per record of a stream of byte chunks."""
+    pending = b""
+    renamed = None  # a rename record is followed by its original path
+    async for chunk in chunks:
+        *records, pending = (pending + chunk).split(b"\0")
+        for record in records:
+            if renamed is not None:
+                yield StatusEntry(renamed.path, renamed.index, renamed.worktree, renamed.kind, _decode(record))
+                renamed = None
+                continue
+            entry = parse_record(record) if record else None
+            if entry is None:
+                continue
+            if entry.kind == "renamed":
+                renamed = entry
+            else:
+                yield entry
+
+
+def encode_cursor(entry):
+    key = f"{int(entry.key[0])}:{entry.path}".encode()
+    return base64.urlsafe_b64encode(key).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        section, path = raw.split(":", 1)
+        return (bool(int(section)), path)
+    except ValueError as e:
+        raise InvalidCursor(f"invalid cursor {cursor!r}") from e
+
+
+async def paginate(entries, limit, cursor=None, prefix="", wanted=()):
+    """``(page, next_cursor)``: up to ``limit`` matching entries after ``cursor``.
+
+    Stops reading ``entries`` as soon as it knows whether there is a next
+    page, so the caller can close the stream early.
+    """
+    after = decode_cursor(cursor) if cursor else None
+    page = []
+    async for entry in entries:
+        if after is not None and entry.key <= after:
+            continue
+        if not entry.path.startswith(prefix) or (wanted and not entry.matches(wanted)):
+            continue
+        if len(page) == limit:
+            return page, encode_cursor(page[-1])
+        page.append(entry)
+    return page, None
@@ -0,0 +1,172 @@
+"""Sampling profiler for live requests, switched on and off at runtime.
+
+Set ``ADMIN_TOKEN`` to make it available; it is off until asked for:
+
+* ``POST /admin/profiling`` ``{"route": "/api/git-status", "every": 10}``
+  profiles one in ``every`` requests to that route template (all routes if
+  ``route`` is omitted) until ``DELETE /admin/profiling``;
+* a request carrying ``X-Profile: <ADMIN_TOKEN>`` is profiled on its own;
+* ``GET /admin/profiling/stacks`` downloads the samples as collapsed stacks
+  (``route;frame;frame count`` lines), the input format of flamegraph.pl,
+  speedscope and friends. Admin routes take ``Authorization: Bearer <token>``.
+
+A background thread wakes every ``PROFILE_INTERVAL`` seconds while a
+profiled request is in flight and takes the event-loop thread's stack. A
+sample counts for a request only if that request's own middleware frame is
+on the stack, i.e. only while its task is running, so concurrent requests
+do not pollute each other's profiles. That makes this an on-CPU profile of
+the event loop: time a request spends awaiting (git, the network) and sync
+handlers running in the thread pool do not show up.
+
+When off, the middleware costs one attribute check per request, plus a scan
+of the request headers when ``ADMIN_TOKEN`` is set
+(``python -m benchmarks.bench_profiling``).
+"""
+import hmac
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+from starlette.routing import compile_path
+
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN", "")
+PROFILE_INTERVAL = float(os.environ.get("PROFILE_INTERVAL", "0.005"))
+PROFILE_HEADER = b"x-profile"
+
+
+def _frame_label(code):
+    return f"{code.co_qualname} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class Profiler:
+    def __init__(self, token=ADMIN_TOKEN, interval=PROFILE_INTERVAL):
+        self.token = token
+        self.interval = interval
+        self.enabled = False
+        self.route = None
+        self.every = 1
+        self._route_regex = None
+        self._seen = 0
+        # Stacks per route template, "route;outer;...;inner" -> samples.
+        self.stacks = Counter()
+        self.samples = Counter()
+        # Profiled requests in flight: middleware frame -> (thread id, Counter).
+        self._active = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    def enable(self, route=None, every=1, interval=None):
+        self.route = route
+        self._route_regex = compile_path(route)[0] if route else None
+        self.every = max(1, every)
+        if interval is not None:
+            self.interval = interval
+        self._seen = 0
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        with self._lock:
+            self.stacks.clear()
+            self.samples.clear()
+
+    def state(self):
+        return {
+            "enabled": self.enabled,
+            "route": self.route,
+            "every": self.every,
+            "interval": self.interval,
+            "in_flight": len(self._active),
+            "samples": dict(self.samples),
+        }
+
+    def may_profile(self, scope):
+        """Whether ``wants`` could pick this request; cheap, and does not count it."""
+        if self.enabled:
+            return True
+        return bool(self.token) and any(name == PROFILE_HEADER for name, _ in scope["headers"])
+
+    def wants(self, scope):
+        """Whether to profile this request."""
+        if self.token:
+            for name, value in scope["headers"]:
+                if name == PROFILE_HEADER and hmac.compare_digest(value, self.token.encode()):
+                    return True
+        if not self.enabled or (self._route_regex is not None and not self._route_regex.match(scope["path"])):
+            return False
+        self._seen += 1
+        return self._seen % self.every == 0
+
+    def begin(self, frame):
+        with self._lock:
+            self._active[frame] = (threading.get_ident(), Counter())
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._sample_forever, name="profiler", daemon=True)
+            self._thread.start()
+        self._wakeup.set()
+
+    def end(self, frame, route):
+        with self._lock:
+            _, stacks = self._active.pop(frame)
+            if not self._active:
+                self._wakeup.clear()
+            for stack, count in stacks.items():
+                self.stacks[f"{route};{stack}"] += count
+            self.samples[route] += sum(stacks.values())
+
+    def collapsed(self, route=None):
+        with self._lock:
+            items = sorted(self.stacks.items())
+        prefix = f"{route};" if route else ""
+        return "".join(f"{stack} {count}\n" for stack, count in items if stack.startswith(prefix))
+
+    def _sample_forever(self):
+        while True:
+            self._wakeup.wait()
+            self.sample()
+            time.sleep(self.interval)
+
+    def sample(self):
+        """Record one stack sample for every profiled request that is running."""
+        frames = sys._current_frames()
+        with self._lock:
+            for marker, (thread_id, stacks) in self._active.items():
+                frame = frames.get(thread_id)
+                labels = []
+                while frame is not None and frame is not marker:
+                    labels.append(_frame_label(frame.f_code))
+                    frame = frame.f_back
+                if frame is marker and labels:
+                    stacks[";".join(reversed(labels))] += 1
+
+
+class ProfilingMiddleware:
+    def __init__(self, app, profiler):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope, receive, send):
+        profiler = self.profiler
+        if scope["type"] != "http" or not (profiler.enabled or profiler.token) or not profiler.wants(scope):
+            await self.app(scope, receive, send)
+            return
+        # This coroutine's frame is on the loop thread's stack exactly while
+        # this request's task runs; samples are attributed by it.
+        marker = sys._getframe()
+        profiler.begin(marker)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            route = scope.get("route")
+            profiler.end(marker, route.path if route is not None else "<unmatched>")
+
+
+def authorized(token, authorization):
+    """Whether an ``Authorization`` header carries the admin ``token``."""
+    scheme, _, credentials = (authorization or "").partition(" ")
+    return bool(token) and scheme.lower() == "bearer" and hmac.compare_digest(credentials.encode(), token.encode())
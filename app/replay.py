@@ -0,0 +1,256 @@
+"""Replay a JSONL file of captured requests against the app, in-process.
+
+Each line describes one request::
+
+    {"method": "POST", "path": "/echo", "json": {"message": "hi"}}
+    {"method": "GET", "path": "/api/git-status", "headers": {"If-None-Match": "\\"abc\\""}}
+
+``method`` defaults to GET, ``json`` is sent as a JSON body and ``body`` as a
+raw (UTF-8) body. Lines that are not such an object are counted as skipped.
+Requests are sent straight to the ASGI app, with no sockets, by
+``REPLAY_CONCURRENCY`` workers fed from a small queue, so the file is read
+as it is replayed and memory does not grow with its length. Latency
+percentiles come from a fixed-size random sample per route.
+
+    python -m app.replay traffic.jsonl [--concurrency 16] [--output report.json]
+
+``POST /replay`` does the same for an NDJSON request body when
+``REPLAY_ENABLED=1``.
+"""
+import asyncio
+import json
+import logging
+import os
+import random
+import sys
+import time
+from urllib.parse import unquote
+
+from .batch import iter_lines
+
+REPLAY_ENABLED = os.environ.get("REPLAY_ENABLED", "0") == "1"
+REPLAY_CONCURRENCY = int(os.environ.get("REPLAY_CONCURRENCY", "16"))
+REPLAY_TIMEOUT = float(os.environ.get("REPLAY_TIMEOUT", "30"))
+REPLAY_SAMPLE = 10_000
+
+logger = logging.getLogger(__name__)
+
+
+class RouteStats:
+    """Count, status codes and a bounded latency sample for one route."""
+
+    def __init__(self, sample_size=REPLAY_SAMPLE):
+        self.sample_size = sample_size
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.statuses = {}
+        self.samples = []
+
+    def add(self, seconds, status):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        # Reservoir sampling: every request is equally likely to be kept.
+        if len(self.samples) < self.sample_size:
+            self.samples.append(seconds)
+        else:
+            slot = random.randrange(self.count)
+            if slot < self.sample_size:
+                self.samples[slot] = seconds
+
+    def summary(self, elapsed):
+        ordered = sorted(self.samples)
+
+        def pct(p):
+            return round(ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))] * 1000, 3)
+
+        return {
+            "requests": self.count,
+            "rps": round(self.count / elapsed, 1) if elapsed else 0.0,
+            "mean_ms": round(self.total / self.count * 1000, 3),
+            "p50_ms": pct(50),
+            "p95_ms": pct(95),
+            "p99_ms": pct(99),
+            "max_ms": round(self.max * 1000, 3),
+            "statuses": {str(k): v for k, v in sorted(self.statuses.items(), key=str)},
+        }
+
+
+def parse_line(line):
+    """``(method, path, headers, body)`` for one JSONL line, or None."""
+    try:
+        spec = json.loads(line)
+    except ValueError:
+        return None
+    if not isinstance(spec, dict) or not isinstance(spec.get("path"), str) or not spec["path"].startswith("/"):
+        return None
+    headers = {str(k).lower(): str(v) for k, v in (spec.get("headers") or {}).items()}
+    if "json" in spec:
+        body = json.dumps(spec["json"]).encode()
+        headers.setdefault("content-type", "application/json")
+    else:
+        body = str(spec.get("body", "")).encode()
+    if body:
+        headers["content-length"] = str(len(body))
+    return str(spec.get("method", "GET")).upper(), spec["path"], headers, body
+
+
+async def call(app, method, path, headers, body, timeout=REPLAY_TIMEOUT):
+    """Send one request to an ASGI app; return ``(status, route template)``.
+
+    The status is ``"timeout"`` if the response does not complete in
+    ``timeout`` seconds (e.g. an event stream) and ``"error"`` if the app
+    raises without sending a response.
+    """
+    path, _, query = path.partition("?")
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": unquote(path),
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "root_path": "",
+        "headers": [(k.encode("latin-1"), v.encode("latin-1")) for k, v in headers.items()],
+        "client": ("replay", 0),
+        "server": ("replay", 80),
+    }
+    status = "error"
+    body_sent = False
+    done = asyncio.Event()
+
+    async def receive():
+        nonlocal body_sent
+        if not body_sent:
+            body_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        await done.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body" and not message.get("more_body", False):
+            done.set()
+
+    try:
+        await asyncio.wait_for(app(scope, receive, send), timeout)
+    except TimeoutError:
+        status = "timeout"
+    except Exception:
+        logger.debug("replayed %s %s raised", method, path, exc_info=True)
+    finally:
+        done.set()
+    route = scope.get("route")
+    return status, route.path if route is not None else "<unmatched>"
+
+
+async def replay(app, lines, concurrency=REPLAY_CONCURRENCY, exclude=(), timeout=REPLAY_TIMEOUT):
+    """Replay an (async or sync) iterable of JSONL lines; return a report.
+
+    Paths in ``exclude`` are skipped, like malformed lines.
+    """
+    routes = {}
+    skipped = 0
+    queue = asyncio.Queue(concurrency * 2)
+
+    async def worker():
+        while (item := await queue.get()) is not None:
+            method, path, headers, body = item
+            start = time.perf_counter()
+            status, route = await call(app, method, path, headers, body, timeout)
+            routes.setdefault(f"{method} {route}", RouteStats()).add(time.perf_counter() - start, status)
+
+    if not hasattr(lines, "__aiter__"):
+        lines = _aiter(lines)
+    start = time.perf_counter()
+    workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+    try:
+        async for line in lines:
+            if not line.strip():
+                continue
+            item = parse_line(line)
+            if item is None or item[1].partition("?")[0] in exclude:
+                skipped += 1
+                continue
+            await queue.put(item)
+        for _ in workers:
+            await queue.put(None)
+        await asyncio.gather(*workers)
+    finally:
+        for task in workers:
+            task.cancel()
+    elapsed = time.perf_counter() - start
+    return {
+        "requests": sum(stats.count for stats in routes.values()),
+        "skipped": skipped,
+        "elapsed_s": round(elapsed, 3),
+        "rps": round(sum(stats.count for stats in routes.values()) / elapsed, 1) if elapsed else 0.0,
+        "routes": {name: stats.summary(elapsed) for name, stats in sorted(routes.items())},
+    }
+
+
+async def _aiter(iterable):
+    for item in iterable:
+        yield item
+
+
+def format_report(report):
+    lines = [f"{'route':<36} {'n':>7} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9}  statuses"]
+    for name, stats in report["routes"].items():
+        statuses = " ".join(f"{k}:{v}" for k, v in stats["statuses"].items())
+        lines.append(
+            f"{name:<36} {stats['requests']:>7} {stats['rps']:>9.1f} "
+            f"{stats['p50_ms']:>9.3f} {stats['p99_ms']:>9.3f}  {statuses}"
+        )
+    lines.append(
+        f"{report['requests']} requests in {report['elapsed_s']}s ({report['rps']} req/s), "
+        f"{report['skipped']} lines skipped"
+    )
+    return "\n".join(lines)
+
+
+async def _replay_file(path, concurrency, timeout):
+    from .main import app
+
+    async with app.router.lifespan_context(app):
+        return await replay(app, iter_lines(_read_chunks(path)), concurrency, exclude={"/replay"}, timeout=timeout)
+
+
+async def _read_chunks(path, size=1 << 16):
+    # Read in a thread so the app's handlers keep the loop to themselves.
+    f = await asyncio.to_thread(open, path, "rb")
+    try:
+        while chunk := await asyncio.to_thread(f.read, size):
+            yield chunk
+    finally:
+        f.close()
+
+
+def main(argv=None):
+    import argparse  # CLI only; app.main imports this module
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("file", help="JSONL file of requests ('-' for stdin)")
+    parser.add_argument("--concurrency", type=int, default=REPLAY_CONCURRENCY)
+    parser.add_argument("--timeout", type=float, default=REPLAY_TIMEOUT, help="per-request timeout in seconds")
+    parser.add_argument("--output", help="also write the report as JSON to this file")
+    args = parser.parse_args(argv)
+
+    path = "/dev/stdin" if args.file == "-" else args.file
+    report = asyncio.run(_replay_file(path, args.concurrency, args.timeout))
+    print(format_report(report))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,267 @@
+"""Long-lived handle on the demo git repository.
+
+Git is configured once (``setup``) instead of on every request, and
+``git status`` is served from an in-memory snapshot. When the optional
+``watchfiles`` package is installed the snapshot is refreshed as soon as a
+file in the repo changes; otherwise it expires after ``GIT_STATUS_TTL``
+seconds. Concurrent requests for a stale snapshot share one ``git status``.
+
+If an ``EventBroker`` is attached, status changes and the line-by-line output
+of commit/push are published to it while anyone is subscribed.
+"""
+import asyncio
+import hashlib
+import logging
+import os
+import time
+import uuid
+import weakref
+from contextlib import aclosing
+from dataclasses import dataclass
+
+from .gitbackends import make_backend
+from .gitexec import GIT_PUSH_TIMEOUT, GitRunner, GitTimeoutError
+from .metrics import GIT_STATUS_LOOKUPS
+from .porcelain import parse_porcelain_v2
+
+try:
+    import watchfiles
+except ImportError:  # pragma: no cover - optional dependency
+    watchfiles = None
+
+GIT_STATUS_TTL = float(os.environ.get("GIT_STATUS_TTL", "2"))
+GIT_STATUS_WATCH = os.environ.get("GIT_STATUS_WATCH", "1") == "1"
+
+COMMIT_EMAIL = "demo@devops.com"
+COMMIT_NAME = "DevOps Demo"
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class StatusSnapshot:
+    output: str
+    success: bool
+    etag: str
+    taken_at: float
+
+    def as_dict(self):
+        return {"output": self.output, "success": self.success}
+
+
+def _make_snapshot(output, success):
+    digest = hashlib.sha256(f"{success}:{output}".encode()).hexdigest()[:32]
+    return StatusSnapshot(output, success, f'"{digest}"', time.monotonic())
+
+
+def _watch_filter(change, path):
+    # Inside .git only the index, HEAD and refs say anything about status.
+    if "/.git/" not in path and not path.endswith("/.git"):
+        return True
+    return path.endswith(("/.git/index", "/.git/HEAD")) or "/.git/refs/" in path
+
+
+class GitRepository:
+    """Cached view of, and write operations on, one git working tree."""
+
+    def __init__(self, git=None, ttl=GIT_STATUS_TTL, watch=GIT_STATUS_WATCH, events=None, backend=None):
+        self.git = git or GitRunner()
+        # Where status comes from (GIT_BACKEND); writes always use the CLI.
+        self.backend = make_backend(self.git, backend)
+        self.ttl = ttl
+        self.watch = watch and watchfiles is not None
+        self.events = events
+        self._setup_done = False
+        self._snapshot = None
+        self._snapshot_generation = -1
+        self._generation = 0
+        self._watching = False
+        self._refreshes = weakref.WeakKeyDictionary()
+        self._setups = weakref.WeakKeyDictionary()
+        self._tasks = []
+        self._stop = None
+
+    @property
+    def path(self):
+        return self.git.cwd
+
+    async def setup(self):
+        """One-time git configuration; retried on the next call if it fails.
+
+        Concurrent callers share one attempt, so the ``--add`` below never
+        runs twice.
+        """
+        if self._setup_done:
+            return
+        loop = asyncio.get_running_loop()
+        task = self._setups.get(loop)
+        if task is None or task.done():  # a finished task here has failed
+            task = self._setups[loop] = loop.create_task(self._configure())
+        await asyncio.shield(task)
+
+    async def _configure(self):
+        for args in (
+            ("config", "--global", "--add", "safe.directory", self.path),
+            ("config", "--global", "user.email", COMMIT_EMAIL),
+            ("config", "--global", "user.name", COMMIT_NAME),
+        ):
+            await self.git.run(*args)
+        self._setup_done = True
+
+    async def start(self):
+        """Start the background tasks, including ``setup``.
+
+        Returns at once, so git configuration does not delay the first
+        request; the git routes wait for ``setup`` themselves.
+        """
+        if self._tasks:
+            return
+        self._stop = asyncio.Event()
+        self._tasks.append(asyncio.create_task(self._setup_in_background()))
+        if self.watch:
+            self._tasks.append(asyncio.create_task(self._watch()))
+        if self.events is not None:
+            self._tasks.append(asyncio.create_task(self._refresh_for_subscribers()))
+
+    async def _setup_in_background(self):
+        try:
+            await self.setup()
+        except (OSError, GitTimeoutError):
+            # Not fatal: setup is retried by the next git request.
+            logger.exception("git setup failed at startup")
+
+    async def stop(self):
+        if self._stop is not None:
+            self._stop.set()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _watch(self):
+        self._watching = self.backend.watching = True
+        try:
+            async for changes in watchfiles.awatch(self.path, watch_filter=_watch_filter, stop_event=self._stop):
+                self.changed(path for _, path in changes)
+        except (OSError, RuntimeError):
+            # Fall back to TTL refreshes if the watcher cannot run.
+            logger.warning("watching %s failed; using a %ss status TTL", self.path, self.ttl, exc_info=True)
+        finally:
+            self._watching = self.backend.watching = False
+            self.invalidate()
+
+    async def _refresh_for_subscribers(self):
+        # Nobody polls when clients listen on the event stream, so keep the
+        # snapshot fresh ourselves; status() publishes any change.
+        while True:
+            await asyncio.sleep(self.ttl)
+            if self.events.subscriber_count:
+                await self.status()
+
+    def changed(self, paths):
+        """Files under the repo changed; an incremental backend rescans just those."""
+        self.backend.changed(paths)
+        self._generation += 1
+
+    def invalidate(self):
+        self.backend.reset()
+        self._generation += 1
+
+    def _is_fresh(self, snapshot):
+        if snapshot is None or self._snapshot_generation != self._generation:
+            return False
+        # The watcher invalidates on every change; only without it does the
+        # snapshot need to expire.
+        return self._watching or time.monotonic() - snapshot.taken_at < self.ttl
+
+    async def status(self):
+        """Return the current ``StatusSnapshot``, refreshing it if needed.
+
+        Concurrent callers share one in-flight refresh; cancelling a caller
+        does not cancel the refresh the others are waiting on.
+        """
+        if self._is_fresh(self._snapshot):
+            GIT_STATUS_LOOKUPS.inc(("cached",))
+            return self._snapshot
+        # A refresh started before the last invalidate() may miss the change.
+        loop = asyncio.get_running_loop()
+        generation, task = self._refreshes.get(loop, (None, None))
+        if task is None or generation != self._generation:
+            GIT_STATUS_LOOKUPS.inc(("launched",))
+            task = loop.create_task(self._refresh(self._generation))
+            self._refreshes[loop] = (self._generation, task)
+            task.add_done_callback(lambda done: self._forget_refresh(loop, done))
+        else:
+            GIT_STATUS_LOOKUPS.inc(("coalesced",))
+        return await asyncio.shield(task)
+
+    def _forget_refresh(self, loop, task):
+        if self._refreshes.get(loop, (None, None))[1] is task:
+            del self._refreshes[loop]
+
+    async def _refresh(self, generation):
+        try:
+            await self.setup()
+            stdout = await self.backend.status()
+            output = stdout.strip() if stdout.strip() else "Working tree clean"
+            snapshot = _make_snapshot(output, True)
+        except (OSError, GitTimeoutError) as e:
+            snapshot = _make_snapshot(str(e), False)
+        if generation < self._snapshot_generation:
+            return snapshot  # a newer refresh finished first
+        previous, self._snapshot = self._snapshot, snapshot
+        self._snapshot_generation = generation
+        if self.events is not None and (previous is None or previous.etag != snapshot.etag):
+            self.events.publish("git-status", {**snapshot.as_dict(), "etag": snapshot.etag})
+        return snapshot
+
+    async def iter_status(self, pathspec=(), untracked="normal"):
+        """Yield ``StatusEntry`` objects straight from ``git status --porcelain=v2``.
+
+        Uncached; stop iterating (closing the generator) to stop git.
+        """
+        await self.setup()
+        args = ("--literal-pathspecs", "status", "--porcelain=v2", "-z", f"--untracked-files={untracked}", "--")
+        async with aclosing(self.git.stream(*args, *pathspec)) as chunks:
+            async for entry in parse_porcelain_v2(chunks):
+                yield entry
+
+    async def commit(self, message, op_id=None):
+        async def steps(on_output):
+            await self.git.run("add", ".", on_output=on_output)
+            return await self.git.run("commit", "-m", message, on_output=on_output)
+
+        return await self._operation("commit", steps, op_id)
+
+    async def push(self, remote="origin", branch="main", op_id=None):
+        async def steps(on_output):
+            return await self.git.run("push", remote, branch, timeout=GIT_PUSH_TIMEOUT, on_output=on_output)
+
+        return await self._operation("push", steps, op_id)
+
+    async def _operation(self, name, steps, op_id=None):
+        """Run a write operation, streaming its output to subscribers.
+
+        Events carry ``op_id`` (the job id when run from ``app.jobs``).
+        """
+        await self.setup()
+        op_id = op_id or uuid.uuid4().hex[:12]
+        on_output = None
+        if self.events is not None:
+            self.events.publish("git-start", {"id": op_id, "operation": name})
+
+            def on_output(stream, line):
+                self.events.publish("git-output", {"id": op_id, "stream": stream, "line": line})
+
+        result = None
+        try:
+            result = await steps(on_output)
+            return result
+        finally:
+            self.invalidate()
+            if self.events is not None:
+                self.events.publish("git-done", {
+                    "id": op_id,
+                    "operation": name,
+                    "success": result is not None and result.ok,
+                })
@@ -0,0 +1,79 @@
+"""JSON responses serialized by the fastest encoder available.
+
+orjson is preferred, then msgspec, then the standard library; set
+``JSON_ENCODER`` to ``orjson``, ``msgspec`` or ``json`` to force one.
+
+Handlers return ``FastJSONResponse(payload)`` for payloads they build
+themselves from plain str/int/float/bool/None/list/dict values. Returning a
+response skips both FastAPI's ``jsonable_encoder`` pass and response-model
+validation, which for payloads like these only re-checks what the handler
+just wrote; the route's ``response_model`` still documents the schema.
+Payloads that never change are serialized once into a ``StaticResponse``.
+"""
+import hashlib
+import json
+import os
+
+from fastapi.responses import JSONResponse, Response
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover - optional dependency
+    msgspec = None
+
+
+def _stdlib_dumps(obj):
+    # Same output as Starlette's JSONResponse.
+    return json.dumps(obj, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode()
+
+
+ENCODERS = {"json": _stdlib_dumps}
+if msgspec is not None:
+    ENCODERS["msgspec"] = msgspec.json.encode
+if orjson is not None:
+    ENCODERS["orjson"] = orjson.dumps
+
+
+def select_encoder(name=None):
+    """``(name, dumps)`` of the requested, or else the fastest, encoder."""
+    if name:
+        if name not in ENCODERS:
+            raise ValueError(f"JSON_ENCODER={name!r} is not installed; available: {', '.join(ENCODERS)}")
+        return name, ENCODERS[name]
+    for preferred in ("orjson", "msgspec", "json"):
+        if preferred in ENCODERS:
+            return preferred, ENCODERS[preferred]
+
+
+JSON_ENCODER, dumps = select_encoder(os.environ.get("JSON_ENCODER"))
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content):
+        return dumps(content)
+
+
+class StaticResponse(Response):
+    """A response rendered once, with a strong ETag, and sent as-is.
+
+    Handlers return the same instance to every request, so serving it is two
+    ``send`` calls. Middleware may edit the header list it is sent, so each
+    request gets a copy of that list rather than the shared one.
+    """
+
+    def __init__(self, content, media_type="application/json", headers=None):
+        super().__init__(content, media_type=media_type, headers=headers)
+        self.raw_headers.append((b"etag", f'"{hashlib.sha256(self.body).hexdigest()[:32]}"'.encode()))
+
+    async def __call__(self, scope, receive, send):
+        await send({"type": "http.response.start", "status": self.status_code, "headers": list(self.raw_headers)})
+        await send({"type": "http.response.body", "body": self.body})
+
+    @classmethod
+    def json(cls, payload, headers=None):
+        return cls(dumps(payload), headers=headers)
@@ -0,0 +1,123 @@
+"""Production entry point: ``python -m app.serve``.
+
+Runs uvicorn with uvloop and httptools when they are installed and tuned
+connection settings.
+
+It runs a single worker unless told otherwise. The git side of the app keeps
+per-process state: the event broker behind ``/api/events``, the status
+snapshot and its file watcher. With several workers, a browser streaming
+events from one worker does not see the commit output of a commit handled by
+another, a status snapshot may lag a commit made through another worker
+until its TTL or watcher catches up, and concurrent commits from different
+workers can fail on git's ``index.lock``. The stateless routes scale fine;
+set ``WEB_CONCURRENCY=auto`` for one worker per usable CPU (respecting cgroup
+CPU quotas, so a container limited to 2 CPUs on a 64-core host gets 2
+workers) when those caveats are acceptable.
+
+Environment variables:
+
+    HOST               bind address (default 0.0.0.0)
+    PORT               bind port (default 8000)
+    WEB_CONCURRENCY    worker processes, or "auto" for usable CPUs (default 1)
+    KEEPALIVE          idle keep-alive timeout in seconds (default 5)
+    BACKLOG            listen backlog (default 2048)
+    GRACEFUL_TIMEOUT   seconds to finish in-flight requests on shutdown,
+                       0 to cancel them immediately (default 30)
+    MAX_REQUESTS       recycle a worker after this many requests (default 0, never)
+    ACCESS_LOG         "0" to disable per-request access logging (default 1)
+    LOG_LEVEL          uvicorn log level (default info)
+"""
+import importlib.util
+import math
+import os
+import shutil
+import tempfile
+
+import uvicorn
+
+
+def _env_int(name, default):
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+
+def cgroup_cpu_limit():
+    """CPUs allowed by the cgroup CPU quota, or None when unlimited."""
+    try:
+        # cgroup v2: "<quota> <period>" or "max <period>"
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+        if quota != "max":
+            return int(quota) / int(period)
+        return None
+    except (OSError, ValueError):
+        pass
+    try:
+        # cgroup v1
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us") as f:
+            quota = int(f.read())
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_period_us") as f:
+            period = int(f.read())
+        if quota > 0 and period > 0:
+            return quota / period
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def available_cpus():
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:  # pragma: no cover - not Linux
+        cpus = os.cpu_count() or 1
+    limit = cgroup_cpu_limit()
+    if limit is not None:
+        cpus = min(cpus, math.ceil(limit))
+    return max(1, cpus)
+
+
+def _installed(module):
+    return importlib.util.find_spec(module) is not None
+
+
+def server_options():
+    """uvicorn keyword arguments derived from the environment."""
+    if os.environ.get("WEB_CONCURRENCY") == "auto":
+        workers = available_cpus()
+    else:
+        workers = _env_int("WEB_CONCURRENCY", 1)
+    graceful = _env_int("GRACEFUL_TIMEOUT", 30)
+    if graceful < 0:
+        raise ValueError("GRACEFUL_TIMEOUT must be >= 0")
+    return {
+        "host": os.environ.get("HOST", "0.0.0.0"),
+        "port": _env_int("PORT", 8000),
+        "workers": workers,
+        "loop": "uvloop" if _installed("uvloop") else "asyncio",
+        "http": "httptools" if _installed("httptools") else "h11",
+        "backlog": _env_int("BACKLOG", 2048),
+        "timeout_keep_alive": _env_int("KEEPALIVE", 5),
+        # uvicorn treats None as "wait forever"; 0 cancels at once.
+        "timeout_graceful_shutdown": graceful,
+        "limit_max_requests": _env_int("MAX_REQUESTS", 0) or None,
+        "access_log": os.environ.get("ACCESS_LOG", "1") != "0",
+        "log_level": os.environ.get("LOG_LEVEL", "info"),
+        "proxy_headers": True,
+    }
+
+
+def main():
+    options = server_options()
+    metrics_dir = None
+    if options["workers"] > 1 and not os.environ.get("METRICS_DIR"):
+        # Workers must share a directory for /metrics to report all of them.
+        metrics_dir = os.environ["METRICS_DIR"] = tempfile.mkdtemp(prefix="devops-metrics-")
+    try:
+        uvicorn.run("app.main:app", **options)
+    finally:
+        if metrics_dir:
+            shutil.rmtree(metrics_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+"""Static files: ``frontend/`` assets and downloads such as the PDF guide.
+
+``StaticDirectory`` is a plain ASGI app mounted under a URL prefix. It
+indexes its files on first use (size, mtime, sha256) and serves each one
+under two URLs:
+
+* ``/frontend/style.css`` - revalidated after ``STATIC_MAX_AGE`` seconds;
+* ``/frontend/style.<hash>.css`` - ``Cache-Control: immutable`` for a year.
+  ``rewrite`` swaps plain references in the HTML pages for these, so a
+  browser fetches each asset once per content change.
+
+Both carry a strong ETag and ``Last-Modified``, answer conditional requests
+with 304 and honour a single ``Range`` (206, or 416 past the end; several
+ranges get the whole file). Bodies are sent with ``os.sendfile`` when the
+server offers the ASGI ``http.response.zerocopysend`` extension, and
+otherwise read in ``STATIC_CHUNK`` pieces in a worker thread; uvicorn does
+not implement the extension yet (``python -m benchmarks.bench_static``
+compares the two). Text that ``CompressionMiddleware`` would compress is
+never sent with sendfile, since the middleware needs the bytes.
+
+Files are indexed once; the image's ``frontend/`` does not change at
+runtime. With ``ASSETS_DEV_RELOAD=1`` every request re-checks the file and
+pages link to the plain URLs, so edits show up on reload.
+"""
+import asyncio
+import hashlib
+import mimetypes
+import os
+from dataclasses import dataclass
+from pathlib import Path, PurePosixPath
+
+from starlette.datastructures import Headers
+
+from .assets import ASSETS_DEV_RELOAD, FRONTEND_DIR
+from .caching import CachePolicy, http_date, is_not_modified
+from .compression import compressible
+from .responses import FastJSONResponse
+
+STATIC_MAX_AGE = int(os.environ.get("STATIC_MAX_AGE", "300"))
+STATIC_CHUNK = 64 * 1024
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+ZEROCOPY = "http.response.zerocopysend"
+DOWNLOADS_DIR = FRONTEND_DIR.parent
+
+PLAIN_CACHE = CachePolicy(max_age=STATIC_MAX_AGE).header.encode()
+HASHED_CACHE = CachePolicy(max_age=IMMUTABLE_MAX_AGE, immutable=True).header.encode()
+
+
+class RangeNotSatisfiable(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class StaticFile:
+    path: Path
+    name: str  # relative to the directory, "/"-separated
+    size: int
+    mtime: float
+    digest: str
+    media_type: str
+
+    @property
+    def etag(self):
+        return f'"{self.digest[:32]}"'
+
+    @property
+    def hashed_name(self):
+        return hashed_name(self.name, self.digest)
+
+
+def hashed_name(name, digest):
+    """``dir/style.css`` -> ``dir/style.<first 12 of digest>.css``."""
+    name = PurePosixPath(name)
+    return str(name.with_name(f"{name.stem}.{digest[:12]}{name.suffix}"))
+
+
+def _media_type(path):
+    media_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+    if media_type.startswith("text/") or media_type == "application/javascript":
+        media_type += "; charset=utf-8"
+    return media_type
+
+
+def read_file(path, name):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(STATIC_CHUNK):
+            digest.update(chunk)
+        stat = os.fstat(f.fileno())
+    return StaticFile(path, name, stat.st_size, stat.st_mtime, digest.hexdigest(), _media_type(path))
+
+
+def byte_range(header, size):
+    """``(start, stop)`` asked for by a ``Range`` header, or None for the whole file.
+
+    Only a single ``bytes`` range is honoured; anything else is ignored, as
+    RFC 9110 allows. Raises ``RangeNotSatisfiable`` when it starts past the end.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, dash, last = spec.strip().partition("-")
+    if not dash:
+        return None
+    try:
+        if first:
+            start = int(first)
+            stop = int(last) + 1 if last else size
+            if last and stop <= start:
+                return None
+        else:
+            suffix = int(last)
+            if suffix <= 0:
+                raise RangeNotSatisfiable(header)
+            start, stop = max(size - suffix, 0), size
+    except RangeNotSatisfiable:
+        raise
+    except ValueError:
+        return None
+    if start >= size:
+        raise RangeNotSatisfiable(header)
+    return start, min(stop, size)
+
+
+class StaticDirectory:
+    """ASGI app serving the files of ``directory`` (or just ``names`` in it) under ``prefix``."""
+
+    def __init__(self, directory, prefix, names=None, dev_reload=ASSETS_DEV_RELOAD):
+        self.directory = Path(directory)
+        self.prefix = prefix.rstrip("/")
+        self.names = names
+        self.dev_reload = dev_reload
+        self._files = None
+        self._hashed = {}
+
+    @property
+    def files(self):
+        if self._files is None:
+            self.scan()
+        return self._files
+
+    def scan(self):
+        if self.names is not None:
+            paths = [self.directory / name for name in self.names]
+        else:
+            paths = sorted(self.directory.rglob("*"))
+        files = {}
+        for path in paths:
+            name = path.relative_to(self.directory).as_posix()
+            if path.is_file() and not any(part.startswith(".") for part in PurePosixPath(name).parts):
+                files[name] = read_file(path, name)
+        self._files = files
+        self._hashed = {file.hashed_name: file for file in files.values()}
+
+    def url(self, name):
+        """The URL to link ``name`` by: content-hashed unless reloading."""
+        file = self.files[name]
+        return f"{self.prefix}/{file.name if self.dev_reload else file.hashed_name}"
+
+    def rewrite(self, body):
+        """Point the references to this directory's files in ``body`` at their hashed URLs."""
+        for name in self.files:
+            for quote in (b'"', b"'"):
+                plain = quote + f"{self.prefix}/{name}".encode() + quote
+                body = body.replace(plain, quote + self.url(name).encode() + quote)
+        return body
+
+    def lookup(self, name):
+        """``(file, immutable)`` for a plain or hashed name, or ``(None, False)``."""
+        file = self.files.get(name)
+        if file is not None:
+            if self.dev_reload:
+                file = self._refresh(file)
+            return file, False
+        file = self._hashed.get(name)
+        return file, file is not None
+
+    def _refresh(self, file):
+        try:
+            stat = os.stat(file.path)
+        except FileNotFoundError:
+            return None
+        if (stat.st_size, stat.st_mtime) != (file.size, file.mtime):
+            file = self._files[file.name] = read_file(file.path, file.name)
+        return file
+
+    async def __call__(self, scope, receive, send):
+        if scope["method"] not in ("GET", "HEAD"):
+            response = FastJSONResponse({"detail": "Method Not Allowed"}, 405, headers={"Allow": "GET, HEAD"})
+            await response(scope, receive, send)
+            return
+        # Mounted: root_path ends with the prefix, path continues with the name.
+        path, root_path = scope["path"], scope.get("root_path", "")
+        file, immutable = self.lookup(path[len(root_path):].lstrip("/") if path.startswith(root_path) else "")
+        if file is None:
+            await FastJSONResponse({"detail": "Not Found"}, 404)(scope, receive, send)
+            return
+
+        request_headers = Headers(scope=scope)
+        last_modified = http_date(file.mtime)
+        headers = [
+            (b"content-type", file.media_type.encode()),
+            (b"accept-ranges", b"bytes"),
+            (b"etag", file.etag.encode()),
+            (b"last-modified", last_modified.encode()),
+            (b"cache-control", HASHED_CACHE if immutable else PLAIN_CACHE),
+        ]
+        if is_not_modified(request_headers, file.etag, last_modified):
+            await send({"type": "http.response.start", "status": 304, "headers": headers[2:]})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        status, start, stop = 200, 0, file.size
+        range_header = request_headers.get("range")
+        if_range = request_headers.get("if-range")
+        if range_header and (if_range is None or if_range in (file.etag, last_modified)):
+            try:
+                requested = byte_range(range_header, file.size)
+            except RangeNotSatisfiable:
+                headers[0] = (b"content-type", b"text/plain; charset=utf-8")
+                headers.append((b"content-range", f"bytes */{file.size}".encode()))
+                headers.append((b"content-length", b"0"))
+                await send({"type": "http.response.start", "status": 416, "headers": headers})
+                await send({"type": "http.response.body", "body": b""})
+                return
+            if requested is not None:
+                status, (start, stop) = 206, requested
+                headers.append((b"content-range", f"bytes {start}-{stop - 1}/{file.size}".encode()))
+        headers.append((b"content-length", str(stop - start).encode()))
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        if scope["method"] == "HEAD":
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        zerocopy = ZEROCOPY in scope.get("extensions", {}) and (
+            status == 206 or not compressible(file.media_type.partition(";")[0], file.size)
+        )
+        with await asyncio.to_thread(open, file.path, "rb") as f:
+            if zerocopy:
+                await send({"type": ZEROCOPY, "file": f, "offset": start, "count": stop - start})
+                return
+            offset = start
+            while True:
+                chunk = await asyncio.to_thread(os.pread, f.fileno(), min(STATIC_CHUNK, stop - offset), offset)
+                offset += len(chunk)
+                more_body = bool(chunk) and offset < stop
+                await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+                if not more_body:
+                    return
+
+
+def default_directories():
+    """``frontend/`` and the downloadable guide, keyed by mount prefix."""
+    return {
+        "/frontend": StaticDirectory(FRONTEND_DIR, "/frontend"),
+        "/downloads": StaticDirectory(DOWNLOADS_DIR, "/downloads", names=("COMPLETE_GUIDE.pdf",)),
+    }
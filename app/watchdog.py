@@ -0,0 +1,118 @@
+"""Event-loop lag watchdog.
+
+Every handler here is ``async def`` and runs on the worker's one event-loop
+thread, so a blocking call in any of them (a ``subprocess.run``, a
+``time.sleep``, a slow file read) stalls every connection on the worker.
+``LoopWatchdog`` makes that visible:
+
+* a heartbeat task sleeps ``LOOP_LAG_INTERVAL`` seconds at a time and
+  records how late it wakes up in the ``event_loop_lag_seconds``
+  histogram; wake-ups later than ``LOOP_LAG_THRESHOLD`` also count in
+  ``event_loop_blocked_total``;
+* a thread checks the heartbeat from outside the loop and, once it is
+  ``LOOP_LAG_THRESHOLD`` overdue, logs the loop thread's stack - the
+  blocking call and the coroutine that made it - while it is still
+  blocked. Each stall is dumped once.
+
+The metrics are updated from the loop thread only, like all the others.
+``LOOP_WATCHDOG=0`` turns it off.
+"""
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+
+from .metrics import LOOP_BLOCKED, LOOP_LAG
+
+LOOP_WATCHDOG = os.environ.get("LOOP_WATCHDOG", "1") != "0"
+LOOP_LAG_INTERVAL = float(os.environ.get("LOOP_LAG_INTERVAL", "0.05"))
+LOOP_LAG_THRESHOLD = float(os.environ.get("LOOP_LAG_THRESHOLD", "0.1"))
+
+logger = logging.getLogger(__name__)
+
+
+def _loop_stack(frame):
+    """``frame``'s stack, outermost first, without the event loop's own frames."""
+    frames = []
+    while frame is not None:
+        # Everything above the callback the loop is running is asyncio/uvicorn.
+        if frame.f_code.co_name == "_run" and frame.f_code.co_filename.endswith(os.path.join("asyncio", "events.py")):
+            break
+        frames.append(frame)
+        frame = frame.f_back
+    return "".join(traceback.format_list(
+        [(f.f_code.co_filename, f.f_lineno, f.f_code.co_name, None) for f in reversed(frames)]
+    ))
+
+
+class LoopWatchdog:
+    def __init__(self, interval=LOOP_LAG_INTERVAL, threshold=LOOP_LAG_THRESHOLD, enabled=LOOP_WATCHDOG):
+        self.interval = interval
+        self.threshold = threshold
+        self.enabled = enabled
+        # Stacks dumped so far, newest last (for tests and debugging).
+        self.dumps = []
+        self._beat = None
+        self._loop = None
+        self._loop_thread = None
+        self._task = None
+        self._thread = None
+        self._stop = threading.Event()
+
+    async def start(self):
+        """Start watching the running loop."""
+        if not self.enabled or self._task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._beat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.create_task(self._heartbeat())
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._stop.set()
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        await asyncio.to_thread(self._thread.join)
+        self._task = self._thread = None
+
+    async def _heartbeat(self):
+        while True:
+            due = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            self._beat = now = time.monotonic()
+            lag = max(0.0, now - due)
+            LOOP_LAG.observe(lag)
+            if lag >= self.threshold:
+                LOOP_BLOCKED.inc()
+                logger.warning("event loop was blocked for %.3fs", lag)
+
+    def _watch(self):
+        dumped = None
+        while not self._stop.wait(self.threshold / 2):
+            beat = self._beat
+            overdue = time.monotonic() - beat - self.interval
+            if overdue >= self.threshold and beat != dumped:
+                dumped = beat
+                self.dump(overdue)
+
+    def dump(self, overdue):
+        """Log what the loop thread is running right now."""
+        frame = sys._current_frames().get(self._loop_thread)
+        if frame is None:
+            return
+        task = asyncio.current_task(self._loop)
+        stack = _loop_stack(frame)
+        del frame
+        self.dumps.append(stack)
+        logger.warning(
+            "event loop blocked for %.3fs so far, in task %s:\n%s",
+            overdue, task.get_name() if task is not None else "<none>", stack,
+        )
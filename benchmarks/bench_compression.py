@@ -0,0 +1,72 @@
+"""CPU cost versus bytes saved of compressing each route's response.
+
+Every route's uncompressed body is fetched once, then compressing it with
+each installed encoder, at the levels ``CompressionMiddleware`` uses, is
+timed in isolation. Rows are sorted by body size, so the point where the
+saving stops being worth the CPU time, i.e. a good ``COMPRESS_MIN_SIZE``,
+can be read off the table. Pages are listed too, although they are served
+pre-compressed by ``app.assets`` rather than by the middleware.
+
+    python -m benchmarks.bench_compression [--number 2000]
+"""
+import argparse
+import asyncio
+import timeit
+
+from .harness import asgi_client, git_sandbox
+
+ROUTES = [
+    ("GET", "/api", {}),
+    ("GET", "/version", {}),
+    ("GET", "/api/devops-fact", {}),
+    ("GET", "/api/git-status", {}),
+    ("POST", "/echo", {"json": {"message": "DevOps"}}),
+    ("POST", "/echo/batch", {"json": [{"message": f"m{n}"} for n in range(10)]}),
+    ("POST", "/echo/batch", {"json": [{"message": f"message {n}"} for n in range(1000)]}),
+    ("GET", "/metrics", {}),
+    ("GET", "/", {}),
+    ("GET", "/demo", {}),
+    ("GET", "/cicd-demo", {}),
+    ("GET", "/frontend", {}),
+]
+
+
+async def fetch_bodies(app):
+    bodies = []
+    async with asgi_client(app) as client:
+        for method, path, kwargs in ROUTES:
+            r = await client.request(method, path, headers={"Accept-Encoding": "identity"}, **kwargs)
+            bodies.append((f"{method} {path}", r.content))
+    return bodies
+
+
+def microseconds(coding, body, number):
+    from app.compression import compress
+
+    return min(timeit.repeat(lambda: compress(coding, body), number=number, repeat=3)) / number * 1e6
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--number", type=int, default=2000, help="compressions per measurement")
+    args = parser.parse_args(argv)
+
+    with git_sandbox():
+        from app import compression
+        from app.main import app
+
+        bodies = asyncio.run(fetch_bodies(app))
+
+    print(f"{'route':<22} {'bytes':>8} {'coding':>7} {'out':>8} {'saved':>8} {'us':>9} {'ns/saved B':>11}")
+    for name, body in sorted(bodies, key=lambda item: len(item[1])):
+        for coding in compression.ENCODERS:
+            size = len(compression.compress(coding, body))
+            saved = len(body) - size
+            us = microseconds(coding, body, max(1, args.number * 1024 // max(len(body), 1024)))
+            per_byte = f"{us * 1000 / saved:11.1f}" if saved > 0 else f"{'-':>11}"
+            print(f"{name:<22} {len(body):>8} {coding:>7} {size:>8} {saved:>8} {us:>9.1f} {per_byte}")
+    print(f"\nCOMPRESS_MIN_SIZE={compression.COMPRESS_MIN_SIZE}, encodings: {', '.join(compression.COMPRESS_ENCODINGS)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Messages/sec through `/echo/batch` versus one `/echo` request per message.
+
+    python -m benchmarks.bench_echo_batch [--messages 20000] [--batch 1000]
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from .harness import asgi_client
+
+
+async def single(client, messages, concurrency):
+    queue = iter(messages)
+
+    async def worker():
+        for message in queue:
+            r = await client.post("/echo", json=message)
+            r.raise_for_status()
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+
+async def batched(client, messages, batch, content_type):
+    for start in range(0, len(messages), batch):
+        part = messages[start:start + batch]
+        if content_type == "application/x-ndjson":
+            body = "".join(json.dumps(m) + "\n" for m in part)
+        else:
+            body = json.dumps(part)
+        r = await client.post("/echo/batch", content=body, headers={"Content-Type": content_type})
+        r.raise_for_status()
+
+
+async def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=20000)
+    parser.add_argument("--batch", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args(argv)
+
+    from app.main import app
+
+    messages = [{"message": f"message {n}"} for n in range(args.messages)]
+    runs = {
+        "POST /echo (one per request)": lambda c: single(c, messages, args.concurrency),
+        f"POST /echo/batch JSON x{args.batch}": lambda c: batched(c, messages, args.batch, "application/json"),
+        f"POST /echo/batch NDJSON x{args.batch}": lambda c: batched(c, messages, args.batch, "application/x-ndjson"),
+    }
+    async with asgi_client(app) as client:
+        for name, run in runs.items():
+            start = time.perf_counter()
+            await run(client)
+            elapsed = time.perf_counter() - start
+            print(f"{name:<36} {args.messages / elapsed:>10.0f} messages/s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,80 @@
+"""Requests/sec on ``/api`` and ``/version`` with and without the fast path.
+
+Drives the real app in-process, once with ``FastPathMiddleware`` answering
+both routes and once with it switched off so they go through FastAPI's
+routing and the caching, compression and profiling middleware. The httpx
+client costs more than either, so the app is also called directly, as the
+server would, to show the server-side microseconds per request.
+
+    python -m benchmarks.bench_fastpath [--requests 5000] [--concurrency 1 10]
+"""
+import argparse
+import asyncio
+import time
+
+from .harness import Scenario, asgi_client, drive, format_row, git_sandbox
+
+
+def find_middleware(app, cls):
+    node = app.middleware_stack or app.build_middleware_stack()
+    app.middleware_stack = node
+    while node is not None and not isinstance(node, cls):
+        node = getattr(node, "app", None)
+    return node
+
+
+async def server_us(app, path, requests):
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET", "scheme": "http",
+        "path": path, "raw_path": path.encode(), "root_path": "", "query_string": b"",
+        "headers": [(b"host", b"bench"), (b"accept", b"*/*"), (b"accept-encoding", b"gzip")],
+        "client": ("127.0.0.1", 1), "server": ("bench", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        pass
+
+    start = time.perf_counter()
+    for _ in range(requests):
+        await app(dict(scope), receive, send)
+    return (time.perf_counter() - start) / requests * 1e6
+
+
+async def measure(app, fast, requests, concurrency):
+    results = {}
+    async with asgi_client(app) as client:
+        for path in ("/api", "/version"):
+            scenario = Scenario("GET", path)
+            await drive(client, scenario, 200, 1)  # warm up
+            for label, enabled in (("FastAPI", False), ("fast path", True)):
+                fast.enabled = enabled
+                results[f"{path}, {label}, c={concurrency}"] = await drive(client, scenario, requests, concurrency)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10])
+    args = parser.parse_args(argv)
+
+    with git_sandbox():
+        from app.fastpath import FastPathMiddleware
+        from app.main import app
+
+        fast = find_middleware(app, FastPathMiddleware)
+        for path in ("/api", "/version"):
+            for label, enabled in (("FastAPI", False), ("fast path", True)):
+                fast.enabled = enabled
+                print(f"{path + ', ' + label:<28} {asyncio.run(server_us(app, path, args.requests)):8.1f} us/request")
+        print()
+        for concurrency in args.concurrency:
+            for name, stats in asyncio.run(measure(app, fast, args.requests, concurrency)).items():
+                print(format_row(name, stats))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""``git status`` cost of each installed backend on repos of growing size.
+
+For each size a repository of that many tracked files (in nested
+directories) is created, 1% of them are modified, one new file is staged and
+a few untracked files are added. Each backend in ``app.gitbackends`` is then
+timed on ``--runs`` consecutive status calls, and its output is checked
+against the CLI's.
+
+    python -m benchmarks.bench_git_backends [--sizes 100 1000 10000] [--runs 20]
+"""
+import argparse
+import asyncio
+import statistics
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+
+from .harness import git_sandbox
+
+
+def make_repo(root, files):
+    repo = Path(root) / f"repo-{files}"
+    subprocess.run(["git", "init", "-q", "-b", "main", str(repo)], check=True)
+    for n in range(files):
+        path = repo / f"d{n % 100}" / f"e{n % 7}" / f"f{n}.txt"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(f"file {n}\n")
+    subprocess.run(["git", "add", "."], cwd=repo, check=True)
+    subprocess.run(["git", "-c", "user.name=Bench", "-c", "user.email=bench@devops.com",
+                    "commit", "-qm", "init"], cwd=repo, check=True)
+    for n in range(0, files, 100):
+        (repo / f"d{n % 100}" / f"e{n % 7}" / f"f{n}.txt").write_text("changed\n")
+    (repo / "staged.txt").write_text("staged\n")
+    subprocess.run(["git", "add", "staged.txt"], cwd=repo, check=True)
+    for n in range(3):
+        (repo / f"untracked-{n}.txt").write_text("?\n")
+    return repo
+
+
+async def time_backend(backend, runs):
+    output = await backend.status()  # warm up: index and page cache
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        await backend.status()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings), output.strip()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    with git_sandbox(), tempfile.TemporaryDirectory() as tmp:
+        from app.gitbackends import BACKENDS, make_backend
+        from app.gitexec import GitRunner
+
+        print(f"{'files':>8} {'backend':>9} {'median ms':>10}  matches cli")
+        for size in args.sizes:
+            runner = GitRunner(cwd=str(make_repo(tmp, size)))
+            expected = None
+            for name in BACKENDS:
+                seconds, output = asyncio.run(time_backend(make_backend(runner, name), args.runs))
+                expected = output if expected is None else expected
+                print(f"{size:>8} {name:>9} {seconds * 1000:>10.2f}  {output == expected}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Event-loop responsiveness while git operations are in flight.
+
+Measures `/api` latency on an idle server, then again while several slow
+`git push` jobs run. The push target is a local bare repository
+whose pre-push hook sleeps, so no network is needed.
+
+    python -m benchmarks.bench_git_event_loop
+"""
+import asyncio
+import time
+
+from .harness import asgi_client, format_row, git_sandbox, summarize
+
+PROBES = 300
+PUSHES = 4
+PUSH_DELAY = 2
+
+
+async def _probe(client, count=None, seconds=None):
+    latencies = []
+    start = time.perf_counter()
+    deadline = start + seconds if seconds else None
+    while (deadline and time.perf_counter() < deadline) or (count and len(latencies) < count):
+        t = time.perf_counter()
+        (await client.get("/api")).raise_for_status()
+        latencies.append(time.perf_counter() - t)
+    return summarize(latencies, time.perf_counter() - start)
+
+
+async def main():
+    from app.main import app
+
+    async with asgi_client(app) as client:
+        idle = await _probe(client, count=PROBES)
+        pushes = [
+            asyncio.create_task(client.post("/api/git-push", params={"wait": PUSHES * PUSH_DELAY + 10}))
+            for _ in range(PUSHES)
+        ]
+        await asyncio.sleep(0.1)
+        busy = await _probe(client, seconds=PUSH_DELAY - 0.5)
+        results = await asyncio.gather(*pushes)
+
+    print(format_row("/api idle", idle))
+    print(format_row(f"/api during {PUSHES} pushes", busy))
+    # The job worker runs the pushes one after another.
+    print(f"push results: {[r.json()['success'] for r in results]}")
+
+
+if __name__ == "__main__":
+    with git_sandbox(push_delay=PUSH_DELAY):
+        asyncio.run(main())
@@ -0,0 +1,75 @@
+"""Status cost versus repository size: full scans against incremental ones.
+
+For each size (tracked files, in nested directories) this times, as the
+median of ``--runs`` calls:
+
+* ``cli full`` - ``git status --short``, what the default backend runs;
+* ``incremental full`` - the incremental backend without a watcher: a full
+  ``git status`` with the untracked cache;
+* ``incremental, N changed`` - with a watcher, after N files were modified
+  and reported, i.e. ``git status -- <N paths>``;
+* ``incremental, none changed`` - with a watcher and nothing reported.
+
+    python -m benchmarks.bench_git_incremental [--sizes 10000 100000] [--runs 10]
+"""
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+
+from .bench_git_backends import make_repo
+from .harness import git_sandbox
+
+
+async def median_ms(fn, runs):
+    await fn()  # warm up
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        await fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+async def measure(repo, runs):
+    from app.gitbackends import make_backend
+    from app.gitexec import GitRunner
+
+    runner = GitRunner(cwd=str(repo))
+    files = sorted(repo.glob("d0/e0/*.txt"))
+    results = {
+        "cli full": await median_ms(make_backend(runner, "cli").status, runs),
+        "incremental full": await median_ms(make_backend(runner, "incremental").status, runs),
+    }
+    backend = make_backend(runner, "incremental")
+    backend.watching = True
+    await backend.status()
+    for changed in (1, 10):
+        async def partial(changed=changed):
+            for path in files[:changed]:
+                path.write_text(f"{time.perf_counter_ns()}\n")
+            backend.changed(str(path) for path in files[:changed])
+            return await backend.status()
+
+        results[f"incremental, {changed} changed"] = await median_ms(partial, runs)
+    results["incremental, none changed"] = await median_ms(backend.status, runs)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    with git_sandbox(), tempfile.TemporaryDirectory() as tmp:
+        rows = {size: asyncio.run(measure(make_repo(tmp, size), args.runs)) for size in args.sizes}
+
+    print(f"{'median ms':<28}" + "".join(f"{size:>12} files" for size in args.sizes))
+    for name in rows[args.sizes[0]]:
+        print(f"{name:<28}" + "".join(f"{rows[size][name]:>18.2f}" for size in args.sizes))
+
+
+if __name__ == "__main__":
+    main()
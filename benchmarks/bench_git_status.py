@@ -0,0 +1,68 @@
+"""Concurrent load on /api/git-status: how many git launches coalescing saves.
+
+``--clients`` clients poll ``GET /api/git-status`` back to back for
+``--seconds`` while the snapshot is invalidated every ``--churn`` seconds,
+as if files kept changing. Every lookup that misses the cache would have run
+its own ``git status`` without coalescing; the report splits them into the
+refreshes actually launched and the lookups that joined one in flight, from
+the ``git_status_lookups_total`` metric.
+
+    python -m benchmarks.bench_git_status [--clients 50] [--seconds 5] [--churn 0.01]
+"""
+import argparse
+import asyncio
+import time
+
+from .harness import asgi_client, format_row, git_sandbox, summarize
+
+
+async def load(app, repo, clients, seconds, churn):
+    latencies = []
+    deadline = time.perf_counter() + seconds
+
+    async def client_loop(client):
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            (await client.get("/api/git-status")).raise_for_status()
+            latencies.append(time.perf_counter() - start)
+            # Cache hits never suspend in-process; let the invalidator run.
+            await asyncio.sleep(0)
+
+    async def invalidate():
+        while time.perf_counter() < deadline:
+            await asyncio.sleep(churn)
+            repo.invalidate()
+
+    async with asgi_client(app) as client:
+        await client.get("/api/git-status")  # git setup
+        start = time.perf_counter()
+        await asyncio.gather(invalidate(), *(client_loop(client) for _ in range(clients)))
+    return summarize(latencies, time.perf_counter() - start)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--churn", type=float, default=0.01, help="seconds between invalidations")
+    args = parser.parse_args(argv)
+
+    with git_sandbox():
+        from app import main as app_main
+        from app.metrics import GIT_STATUS_LOOKUPS
+
+        before = dict(GIT_STATUS_LOOKUPS.values)
+        stats = asyncio.run(load(app_main.app, app_main.repo, args.clients, args.seconds, args.churn))
+        counts = {k[0]: v - before.get(k, 0) for k, v in GIT_STATUS_LOOKUPS.values.items()}
+
+    cached, coalesced, launched = (counts.get(k, 0) for k in ("cached", "coalesced", "launched"))
+    print(format_row(f"/api/git-status x{args.clients}", stats))
+    print(f"lookups: {cached + coalesced + launched}  served from cache: {cached}")
+    print(f"git status launched: {launched}  joined an in-flight refresh: {coalesced}")
+    misses = coalesced + launched
+    if misses:
+        print(f"launches saved by coalescing: {coalesced} of {misses} ({coalesced / misses:.1%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Bytes per page view with the pages' inline CSS/JS, and with it split out.
+
+Builds every page twice, as served before ``app.bundles`` (styles and
+scripts inline) and after (linked, immutable files), and reports the
+response bodies a browser downloads, compressed with ``--encoding``:
+
+* first view - the page plus every file it links that is not cached yet;
+* repeat view - the page alone, its files being cached as immutable;
+* a session visiting every page once, in order, counting each file once.
+
+Headers are not counted; every linked file is one more request.
+
+    python -m benchmarks.bench_page_weight [--encoding gzip|identity]
+"""
+import argparse
+import re
+
+from app.assets import default_registry
+from app.bundles import bundle_pages
+from app.static import default_directories
+
+LINK = re.compile(rb'(?:href|src)="/(assets|frontend)/([^"]+)"')
+
+
+def page_weights(registry, static, coding):
+    """Page name -> (page bytes, {linked file: bytes})."""
+    weights = {}
+    for name in registry.names:
+        body, _ = registry.get(name).variant(coding)
+        linked = {}
+        for mount, file in LINK.findall(registry.get(name).variants["identity"][0]):
+            file = file.decode()
+            if mount == b"assets":
+                linked[file] = len(registry.file(file).variant(coding)[0])
+            else:
+                linked[file] = static.lookup(file)[0].size
+        weights[name] = (len(body), linked)
+    return weights
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--encoding", choices=["gzip", "identity"], default="gzip")
+    args = parser.parse_args(argv)
+
+    static = default_directories()["/frontend"]
+    before = page_weights(default_registry(rewrite=static.rewrite), static, args.encoding)
+    after = page_weights(default_registry(rewrite=static.rewrite, bundle=bundle_pages), static, args.encoding)
+
+    print(f"{args.encoding} bytes          first view      repeat view    requests (first)")
+    print(f"{'page':<22}{'before':>8}{'after':>8}{'before':>9}{'after':>8}{'before':>9}{'after':>7}")
+    totals = {"before": 0, "after": 0}
+    seen = {"before": set(), "after": set()}
+    for name in before:
+        row = []
+        for label, weights in (("before", before), ("after", after)):
+            page, linked = weights[name]
+            row.append((page + sum(linked.values()), page, 1 + len(linked)))
+            totals[label] += page + sum(size for file, size in linked.items() if file not in seen[label])
+            seen[label].update(linked)
+        (first_b, repeat_b, req_b), (first_a, repeat_a, req_a) = row
+        print(f"{name:<22}{first_b:>8}{first_a:>8}{repeat_b:>9}{repeat_a:>8}{req_b:>9}{req_a:>7}")
+    print(f"{'session, all pages':<22}{totals['before']:>8}{totals['after']:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Overhead of the profiling middleware, off and on.
+
+Two measurements:
+
+* per call: a trivial ASGI app called directly, bare and wrapped in
+  ``ProfilingMiddleware`` with the profiler off (without and with
+  ``ADMIN_TOKEN``, which adds a scan for the ``X-Profile`` header) and on;
+* end to end: ``GET /api`` throughput of the real app, profiler off and
+  profiling every request.
+
+    python -m benchmarks.bench_profiling [--calls 200000] [--requests 3000]
+"""
+import argparse
+import asyncio
+import time
+
+from .harness import Scenario, asgi_client, drive, format_row, git_sandbox
+
+HEADERS = [(b"host", b"bench"), (b"accept", b"*/*"), (b"user-agent", b"bench"), (b"accept-encoding", b"gzip")]
+
+
+async def _app(scope, receive, send):
+    pass
+
+
+async def per_call_ns(app, calls):
+    scope = {"type": "http", "path": "/api", "headers": HEADERS}
+    start = time.perf_counter()
+    for _ in range(calls):
+        await app(scope, None, None)
+    return (time.perf_counter() - start) / calls * 1e9
+
+
+async def end_to_end(app, profiler, requests):
+    results = {}
+    async with asgi_client(app) as client:
+        scenario = Scenario("GET", "/api")
+        await drive(client, scenario, 200, 1)  # warm up
+        results["/api, profiler off"] = await drive(client, scenario, requests, 1)
+        profiler.enable()
+        results["/api, every request"] = await drive(client, scenario, requests, 1)
+        profiler.disable()
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=200_000)
+    parser.add_argument("--requests", type=int, default=3000)
+    args = parser.parse_args(argv)
+
+    with git_sandbox():
+        from app.main import app, profiler
+        from app.profiling import Profiler, ProfilingMiddleware
+
+        enabled = Profiler()
+        enabled.enable()
+        variants = {
+            "bare app": _app,
+            "off": ProfilingMiddleware(_app, Profiler(token="")),
+            "off, ADMIN_TOKEN set": ProfilingMiddleware(_app, Profiler(token="secret")),
+            "on (every request)": ProfilingMiddleware(_app, enabled),
+        }
+        for name, variant in variants.items():
+            print(f"{name:<28} {asyncio.run(per_call_ns(variant, args.calls)):8.0f} ns/call")
+        print()
+        for name, stats in asyncio.run(end_to_end(app, profiler, args.requests)).items():
+            print(format_row(name, stats))
+
+
+if __name__ == "__main__":
+    main()
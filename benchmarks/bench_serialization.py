@@ -0,0 +1,92 @@
+"""Per-request JSON serialization cost of every JSON route.
+
+For each route the payload it actually returns is fetched once, then the
+step that turns it into response bytes is timed in isolation:
+
+* ``jsonable_encoder`` - what FastAPI did for handlers returning a plain
+  dict: ``jsonable_encoder`` and then ``json.dumps`` in ``JSONResponse``;
+* ``model`` - FastAPI's path for a declared response model when the handler
+  returns a dict: validate against the model, then pydantic's ``dump_json``;
+* one column per installed encoder - ``FastJSONResponse`` with that encoder,
+  which is what the handlers return now.
+
+    python -m benchmarks.bench_serialization [--number 20000]
+"""
+import argparse
+import asyncio
+import json
+import timeit
+
+from .harness import asgi_client, git_sandbox
+
+ROUTES = [
+    ("GET", "/api", {}),
+    ("POST", "/echo", {"json": {"message": "DevOps"}}),
+    ("POST", "/echo/batch", {"json": [{"message": f"m{n}"} for n in range(100)]}),
+    ("GET", "/version", {}),
+    ("GET", "/api/devops-fact", {}),
+    ("GET", "/api/git-status", {}),
+    ("POST", "/api/git-commit", {}),
+]
+
+
+async def fetch_payloads(app):
+    payloads = {}
+    async with asgi_client(app) as client:
+        for method, path, kwargs in ROUTES:
+            r = await client.request(method, path, **kwargs)
+            payloads[(method, path)] = json.loads(r.content)
+    return payloads
+
+
+def response_models(app):
+    from fastapi.routing import APIRoute
+
+    return {
+        (method, route.path): route.response_model
+        for route in app.routes if isinstance(route, APIRoute)
+        for method in route.methods
+    }
+
+
+def nanoseconds(fn, number):
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number * 1e9
+
+
+def measure(payload, model, encoders, number):
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+    from pydantic import TypeAdapter
+
+    adapter = TypeAdapter(model)
+    timings = [
+        nanoseconds(lambda: JSONResponse(jsonable_encoder(payload)).body, number),
+        nanoseconds(lambda: adapter.dump_json(adapter.validate_python(payload)), number),
+    ]
+    for dumps in encoders.values():
+        timings.append(nanoseconds(lambda dumps=dumps: dumps(payload), number))
+    return timings
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--number", type=int, default=20000, help="calls per measurement")
+    args = parser.parse_args(argv)
+
+    with git_sandbox():
+        from app import responses
+        from app.main import app
+
+        payloads = asyncio.run(fetch_payloads(app))
+
+    columns = ["jsonable_encoder", "model", *responses.ENCODERS]
+    print(f"{'route':<24}" + "".join(f"{c + ' ns':>20}" for c in columns))
+    models = response_models(app)
+    for (method, path), payload in payloads.items():
+        timings = measure(payload, models[(method, path)], responses.ENCODERS, args.number)
+        print(f"{method + ' ' + path:<24}" + "".join(f"{t:>20.0f}" for t in timings))
+    print(f"\nselected encoder: {responses.JSON_ENCODER}")
+
+
+if __name__ == "__main__":
+    main()
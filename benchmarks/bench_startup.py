@@ -0,0 +1,127 @@
+"""Cold-start report: import-time breakdown and time to first request.
+
+    python -m benchmarks.bench_startup [--runs 5] [--top 15]
+
+* import time of ``app.main`` from ``python -X importtime``: the total, the
+  share of each top-level package and the slowest ``app.*`` modules;
+* in-process phases in a fresh interpreter: import, lifespan startup, and
+  the first and second ``GET /api`` (the difference is lazy first-use work);
+* time to first request of ``python -m app.serve``: from spawning the
+  process to the first 200 from ``GET /api`` over loopback, i.e. what an
+  autoscaler waits for.
+
+Each number is the median over ``--runs`` fresh processes.
+"""
+import argparse
+import http.client
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from .harness import free_port, git_sandbox
+
+# Runs in a fresh interpreter so nothing is imported beforehand.
+PHASES = """
+import asyncio, json, time
+t0 = time.perf_counter()
+import app.main as m
+t1 = time.perf_counter()
+
+async def run():
+    import httpx  # the client is not part of the app's startup
+    t1b = time.perf_counter()
+    async with m.app.router.lifespan_context(m.app):
+        t2 = time.perf_counter()
+        transport = httpx.ASGITransport(app=m.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://startup") as client:
+            t3 = time.perf_counter()
+            await client.get("/api")
+            t4 = time.perf_counter()
+            await client.get("/api")
+            t5 = time.perf_counter()
+    return {"import": t1 - t0, "lifespan": t2 - t1b, "first /api": t4 - t3, "second /api": t5 - t4}
+
+print(json.dumps(asyncio.run(run())))
+"""
+
+
+def import_times():
+    """``{module: (self_us, cumulative_us)}`` for a fresh ``import app.main``."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        capture_output=True, text=True, check=True,
+    )
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, cumulative, name = line.removeprefix("import time:").split("|")
+        times[name.strip()] = (int(own), int(cumulative))
+    return times
+
+
+def phases():
+    proc = subprocess.run([sys.executable, "-c", PHASES], capture_output=True, text=True, check=True)
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def time_to_first_request(timeout=30):
+    port = free_port()
+    env = {"WEB_CONCURRENCY": "1", "PORT": str(port), "HOST": "127.0.0.1", "ACCESS_LOG": "0", "LOG_LEVEL": "warning"}
+    start = time.perf_counter()
+    server = subprocess.Popen([sys.executable, "-m", "app.serve"], env={**os.environ, **env})
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+                conn.request("GET", "/api")
+                if conn.getresponse().status == 200:
+                    return time.perf_counter() - start
+            except OSError:
+                time.sleep(0.002)
+            finally:
+                conn.close()
+        raise RuntimeError("server did not answer")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args(argv)
+
+    with git_sandbox():
+        runs = [import_times() for _ in range(args.runs)]
+        phase_runs = [phases() for _ in range(args.runs)]
+        ttfr = [time_to_first_request() for _ in range(args.runs)]
+
+    def median(module, index):
+        return statistics.median(run.get(module, (0, 0))[index] for run in runs) / 1000
+
+    print(f"import app.main: {median('app.main', 1):.1f} ms (cumulative, median of {args.runs})\n")
+    packages = {}
+    for module in runs[0]:
+        packages.setdefault(module.split(".")[0], []).append(module)
+    print("self time by top-level package:")
+    by_package = sorted(((sum(median(m, 0) for m in mods), pkg) for pkg, mods in packages.items()), reverse=True)
+    for ms, package in by_package[:args.top]:
+        print(f"  {package:<32} {ms:8.1f} ms")
+    print("\napp modules (cumulative):")
+    app_modules = sorted(((median(m, 1), m) for m in runs[0] if m.startswith("app")), reverse=True)
+    for ms, module in app_modules[:args.top]:
+        print(f"  {module:<32} {ms:8.1f} ms")
+
+    print("\nin-process phases:")
+    for phase in phase_runs[0]:
+        print(f"  {phase:<32} {statistics.median(run[phase] for run in phase_runs) * 1000:8.1f} ms")
+    print(f"\npython -m app.serve to first 200: {statistics.median(ttfr) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
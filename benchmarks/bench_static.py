@@ -0,0 +1,90 @@
+"""Static file transfer: ``os.sendfile`` against reading the file in Python.
+
+``StaticDirectory`` is driven by a minimal server loop that writes to a real
+(Unix) socket drained by another thread, once as uvicorn runs it today
+(``http.response.body`` chunks read in a worker thread, then
+``socket.sendall``) and once with the ``http.response.zerocopysend``
+extension offered, which it serves with ``os.sendfile``. Reported per file
+size: requests/sec, MB/s and the process CPU time per request, where
+zero-copy saves the most.
+
+    python -m benchmarks.bench_static [--sizes 100000 1000000 16000000] [--requests 200]
+"""
+import argparse
+import asyncio
+import os
+import socket
+import tempfile
+import threading
+import time
+
+from app.static import ZEROCOPY, StaticDirectory
+
+
+def drain(sock):
+    while sock.recv(1 << 20):
+        pass
+
+
+async def serve(directory, name, sock, zerocopy):
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": f"{directory.prefix}/{name}",
+        "root_path": directory.prefix,
+        "headers": [],
+        "extensions": {ZEROCOPY: {}} if zerocopy else {},
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        if message["type"] == "http.response.body":
+            sock.sendall(message["body"])
+        elif message["type"] == ZEROCOPY:
+            offset, count = message["offset"], message["count"]
+            while count:
+                sent = os.sendfile(sock.fileno(), message["file"].fileno(), offset, count)
+                offset, count = offset + sent, count - sent
+
+    await directory(scope, receive, send)
+
+
+async def measure(directory, name, size, requests, zerocopy):
+    server, client = socket.socketpair()
+    reader = threading.Thread(target=drain, args=(client,), daemon=True)
+    reader.start()
+    await serve(directory, name, server, zerocopy)  # warm up
+    wall, cpu = time.perf_counter(), time.process_time()
+    for _ in range(requests):
+        await serve(directory, name, server, zerocopy)
+    wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+    server.close()
+    reader.join()
+    client.close()
+    return requests / wall, size * requests / wall / 1e6, cpu / requests * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000, 16_000_000])
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            with open(os.path.join(tmp, f"{size}.bin"), "wb") as f:
+                f.write(os.urandom(size))
+        directory = StaticDirectory(tmp, "/files")
+
+        print(f"{'size':>10} {'mode':<13} {'req/s':>9} {'MB/s':>9} {'cpu ms/req':>11}")
+        for size in args.sizes:
+            requests = max(10, args.requests * 100_000 // max(size, 100_000))
+            for mode, zerocopy in (("python read", False), ("sendfile", True)):
+                rps, mbps, cpu_ms = asyncio.run(measure(directory, f"{size}.bin", size, requests, zerocopy))
+                print(f"{size:>10} {mode:<13} {rps:>9.1f} {mbps:>9.1f} {cpu_ms:>11.3f}")
+
+
+if __name__ == "__main__":
+    main()
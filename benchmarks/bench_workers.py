@@ -0,0 +1,79 @@
+"""Single- vs multi-worker throughput of `python -m app.serve` over loopback.
+
+Starts the production launcher with WEB_CONCURRENCY=1 and then with one
+worker per CPU, and drives `/api` and `/echo` from several client processes
+so the load generator is not the bottleneck.
+
+    python -m benchmarks.bench_workers [--seconds 5] [--connections 64] [--workers 1 4]
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import subprocess
+import sys
+import time
+
+from app.serve import available_cpus
+
+from .harness import format_row, free_port, summarize, wait_until_up
+
+ROUTES = [("GET", "/api", None), ("POST", "/echo", {"message": "DevOps"})]
+
+
+def _client(args):
+    port, method, path, body, connections, seconds = args
+    import httpx
+
+    async def run():
+        latencies = []
+        deadline = time.perf_counter() + seconds
+        limits = httpx.Limits(max_connections=connections, max_keepalive_connections=connections)
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits) as client:
+            async def worker():
+                while time.perf_counter() < deadline:
+                    start = time.perf_counter()
+                    await client.request(method, path, json=body)
+                    latencies.append(time.perf_counter() - start)
+
+            await asyncio.gather(*(worker() for _ in range(connections)))
+        return latencies
+
+    return asyncio.run(run())
+
+
+def measure(port, method, path, body, connections, seconds, clients):
+    per_client = max(1, connections // clients)
+    with multiprocessing.Pool(clients) as pool:
+        start = time.perf_counter()
+        parts = pool.map(_client, [(port, method, path, body, per_client, seconds)] * clients)
+        elapsed = time.perf_counter() - start
+    return summarize([x for part in parts for x in part], elapsed)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--connections", type=int, default=64)
+    parser.add_argument("--clients", type=int, default=max(2, available_cpus() // 2))
+    parser.add_argument("--workers", type=int, nargs="+", default=sorted({1, available_cpus()}))
+    args = parser.parse_args(argv)
+
+    for workers in args.workers:
+        port = free_port()
+        env = {**os.environ, "WEB_CONCURRENCY": str(workers), "PORT": str(port),
+               "HOST": "127.0.0.1", "ACCESS_LOG": "0", "LOG_LEVEL": "warning"}
+        server = subprocess.Popen([sys.executable, "-m", "app.serve"], env=env)
+        try:
+            wait_until_up(port)
+            time.sleep(1)  # let every worker finish booting
+            for method, path, body in ROUTES:
+                stats = measure(port, method, path, body, args.connections, args.seconds, args.clients)
+                print(format_row(f"{workers} worker(s) {method} {path}", stats))
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""Shared helpers for the in-process benchmarks.
+
+Requests are driven through ``httpx.ASGITransport`` so no sockets or network
+are involved, and git endpoints run against a throwaway repository with a
+local bare ``origin``.
+"""
+import asyncio
+import contextlib
+import os
+import socket
+import statistics
+import subprocess
+import tempfile
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def summarize(latencies, elapsed):
+    """Latencies in seconds -> requests/sec and millisecond percentiles."""
+    ms = [x * 1000 for x in latencies]
+    return {
+        "requests": len(ms),
+        "rps": round(len(ms) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(statistics.median(ms), 3),
+        "p95_ms": round(percentile(ms, 95), 3),
+        "p99_ms": round(percentile(ms, 99), 3),
+        "max_ms": round(max(ms), 3),
+    }
+
+
+@dataclass(frozen=True)
+class Scenario:
+    """One benchmarked request.
+
+    ``prepare(repo)`` runs before each request and ``check(response)`` after
+    it, both outside the timed section. ``concurrency`` caps the suite-wide
+    concurrency for this scenario and ``divisor`` scales its request count down.
+    """
+
+    method: str
+    path: str
+    kwargs: dict = field(default_factory=dict)
+    divisor: int = 1
+    concurrency: int | None = None
+    prepare: object = None
+    check: object = None
+
+
+async def drive(client, scenario, requests, concurrency, repo=None):
+    """Send ``requests`` requests with at most ``concurrency`` in flight."""
+    latencies = []
+    remaining = iter(range(requests))
+    method, path = scenario.method, scenario.path
+
+    async def worker():
+        for _ in remaining:
+            if scenario.prepare is not None:
+                scenario.prepare(repo)
+            start = time.perf_counter()
+            r = await client.request(method, path, **scenario.kwargs)
+            latencies.append(time.perf_counter() - start)
+            if r.status_code >= 500:
+                raise RuntimeError(f"{method} {path} -> {r.status_code}")
+            if scenario.check is not None:
+                scenario.check(r)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, time.perf_counter() - start)
+
+
+def format_row(name, stats):
+    return (
+        f"{name:<28} n={stats['requests']:<6} {stats['rps']:>9.1f} req/s  "
+        f"p50={stats['p50_ms']:8.3f}ms p95={stats['p95_ms']:8.3f}ms p99={stats['p99_ms']:8.3f}ms"
+    )
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_until_up(port, timeout=20, interval=0.1):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return
+        except OSError:
+            time.sleep(interval)
+    raise RuntimeError("server did not start")
+
+
+def make_git_repo(root, push_delay=0):
+    """Create ``root/repo`` with one commit and a bare ``origin`` to push to."""
+    root = Path(root)
+    origin = root / "origin.git"
+    repo = root / "repo"
+    subprocess.run(["git", "init", "-q", "--bare", str(origin)], check=True)
+    subprocess.run(["git", "init", "-q", "-b", "main", str(repo)], check=True)
+    for key, value in (("user.email", "bench@devops.com"), ("user.name", "Bench")):
+        subprocess.run(["git", "config", key, value], cwd=repo, check=True)
+    subprocess.run(["git", "remote", "add", "origin", str(origin)], cwd=repo, check=True)
+    (repo / "README.md").write_text("bench\n")
+    subprocess.run(["git", "add", "."], cwd=repo, check=True)
+    subprocess.run(["git", "commit", "-q", "-m", "init"], cwd=repo, check=True)
+    if push_delay:
+        hook = repo / ".git" / "hooks" / "pre-push"
+        hook.write_text(f"#!/bin/sh\nsleep {push_delay}\n")
+        hook.chmod(0o755)
+    return repo
+
+
+@contextlib.contextmanager
+def git_sandbox(push_delay=0):
+    """Point the app at a temp repo and a temp HOME (for ``git config --global``).
+
+    Must be entered before ``app.main`` is imported.
+    """
+    saved = {key: os.environ.get(key) for key in ("HOME", "GIT_REPO_DIR", "GIT_CONFIG_NOSYSTEM")}
+    with tempfile.TemporaryDirectory() as tmp:
+        home = Path(tmp) / "home"
+        home.mkdir()
+        os.environ["HOME"] = str(home)
+        os.environ["GIT_CONFIG_NOSYSTEM"] = "1"
+        os.environ["GIT_REPO_DIR"] = str(make_git_repo(tmp, push_delay))
+        try:
+            yield Path(os.environ["GIT_REPO_DIR"])
+        finally:
+            for key, value in saved.items():
+                if value is None:
+                    os.environ.pop(key, None)
+                else:
+                    os.environ[key] = value
+
+
+def asgi_client(app):
+    import httpx
+
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=120)
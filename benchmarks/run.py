@@ -0,0 +1,148 @@
+"""Throughput and latency of every route, compared against a stored baseline.
+
+    python -m benchmarks.run --update-baseline    # record a baseline first
+    python -m benchmarks.run                      # run, compare with baseline
+    python -m benchmarks.run --only /api /echo    # subset of scenarios
+
+Results are written as JSON (``--output``). A scenario regresses when its
+requests/sec drops, or its p99 grows, by more than ``--threshold`` relative to
+the baseline; the exit status is 1 if any scenario regressed. Baselines are
+machine specific, so none is committed: record one (by default in
+``bench_baseline.json``, git-ignored) on the machine you compare on, e.g.
+before and after a change.
+
+The git write scenarios do real work: every commit request first dirties the
+tree, and every push request first makes a new local commit, so neither
+times the "nothing to do" path. They pass ``wait`` so each request times the
+queued job end to end, and run one at a time, as the job worker serializes
+git writes anyway.
+"""
+import argparse
+import asyncio
+import json
+import platform
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from .harness import Scenario, asgi_client, drive, format_row, git_sandbox
+
+BASELINE = Path("bench_baseline.json")
+
+
+def _dirty(repo):
+    path = repo / "bench.txt"
+    with path.open("a") as f:
+        f.write(f"{time.perf_counter_ns()}\n")
+
+
+def _new_commit(repo):
+    _dirty(repo)
+    subprocess.run(["git", "commit", "-qam", "bench"], cwd=repo, check=True)
+
+
+def _succeeded(response):
+    if not response.json()["success"]:
+        raise RuntimeError(f"{response.request.url.path} failed: {response.json()['output']}")
+
+
+SCENARIOS = {
+    "GET /api": Scenario("GET", "/api"),
+    "POST /echo": Scenario("POST", "/echo", {"json": {"message": "DevOps"}}),
+    "POST /echo/batch": Scenario("POST", "/echo/batch", {"json": [{"message": f"m{n}"} for n in range(100)]}),
+    "GET /version": Scenario("GET", "/version"),
+    "GET /api/devops-fact": Scenario("GET", "/api/devops-fact"),
+    "GET /": Scenario("GET", "/"),
+    "GET /demo": Scenario("GET", "/demo"),
+    "GET /cicd-demo": Scenario("GET", "/cicd-demo"),
+    "GET /frontend": Scenario("GET", "/frontend"),
+    "GET /cicd-live": Scenario("GET", "/cicd-live"),
+    "GET /manual-vs-automated": Scenario("GET", "/manual-vs-automated"),
+    "GET /api/git-status": Scenario("GET", "/api/git-status"),
+    # Write operations fork several git processes each; run fewer of them.
+    "POST /api/git-commit": Scenario(
+        "POST", "/api/git-commit", {"params": {"wait": 60}}, divisor=20, concurrency=1,
+        prepare=_dirty, check=_succeeded,
+    ),
+    "POST /api/git-push": Scenario(
+        "POST", "/api/git-push", {"params": {"wait": 60}}, divisor=20, concurrency=1,
+        prepare=_new_commit, check=_succeeded,
+    ),
+}
+
+
+async def run_suite(names, requests, concurrency, repo):
+    from app.main import app
+
+    results = {}
+    async with asgi_client(app) as client:
+        for name in names:
+            scenario = SCENARIOS[name]
+            workers = min(concurrency, scenario.concurrency or concurrency)
+            count = max(workers, requests // scenario.divisor)
+            await drive(client, scenario, min(count, 50), workers, repo)  # warm up
+            results[name] = await drive(client, scenario, count, workers, repo)
+            print(format_row(name, results[name]))
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Return a list of human-readable regressions."""
+    regressions = []
+    for name, stats in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if stats["rps"] < base["rps"] * (1 - threshold):
+            regressions.append(f"{name}: {stats['rps']} req/s vs baseline {base['rps']}")
+        if stats["p99_ms"] > base["p99_ms"] * (1 + threshold):
+            regressions.append(f"{name}: p99 {stats['p99_ms']}ms vs baseline {base['p99_ms']}ms")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--only", nargs="*", metavar="PATH", help="only scenarios whose path is listed")
+    parser.add_argument("--output", type=Path, default=Path("bench_results.json"))
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed relative regression")
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    names = [n for n in SCENARIOS if not args.only or SCENARIOS[n].path in args.only]
+    with git_sandbox() as repo:
+        results = asyncio.run(run_suite(names, args.requests, args.concurrency, repo))
+
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "results": results,
+    }
+    args.output.write_text(json.dumps(report, indent=2) + "\n")
+    print(f"\nresults written to {args.output}")
+
+    if args.update_baseline:
+        args.baseline.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"baseline updated: {args.baseline}")
+        return 0
+    if not args.baseline.exists():
+        print(f"no baseline at {args.baseline} to compare against (record one with --update-baseline)")
+        return 0
+
+    baseline = json.loads(args.baseline.read_text())["results"]
+    regressions = compare(results, baseline, args.threshold)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    if not regressions:
+        print(f"no regressions beyond {args.threshold:.0%} of {args.baseline}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,66 @@
+import gzip
+import os
+
+from fastapi.testclient import TestClient
+
+from app.assets import AssetRegistry, choose_encoding
+from app.main import app
+
+client = TestClient(app)
+
+
+def test_pages_are_served_and_compressed():
+    for path in ("/demo", "/cicd-demo", "/frontend", "/cicd-live", "/manual-vs-automated"):
+        plain = client.get(path, headers={"Accept-Encoding": "identity"})
+        assert plain.status_code == 200
+        assert plain.headers["content-type"].startswith("text/html")
+        assert "content-encoding" not in plain.headers
+
+        r = client.get(path, headers={"Accept-Encoding": "gzip"})
+        assert r.headers["content-encoding"] in ("gzip", "br")
+        assert r.headers["vary"] == "Accept-Encoding"
+        assert r.content == plain.content  # decoded transparently by httpx
+        assert int(r.headers["content-length"]) < len(plain.content)
+
+
+def test_not_modified():
+    etag = client.get("/demo", headers={"Accept-Encoding": "gzip"}).headers["etag"]
+    r = client.get("/demo", headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+    assert r.status_code == 304
+    assert r.content == b""
+
+
+def test_choose_encoding():
+    available = ["identity", "br", "gzip"]
+    assert choose_encoding("gzip, deflate, br", available) == "br"
+    assert choose_encoding("gzip;q=1, br;q=0", available) == "gzip"
+    assert choose_encoding("", available) == "identity"
+    assert choose_encoding("*", ["identity", "gzip"]) == "gzip"
+
+
+def test_dev_reload(tmp_path):
+    page = tmp_path / "page.html"
+    page.write_text("<p>one</p>")
+    registry = AssetRegistry(dev_reload=True)
+    registry.register("page", page)
+    registry.build()
+    assert registry.get("page").variants["identity"][0] == b"<p>one</p>"
+
+    page.write_text("<p>two</p>")
+    os.utime(page, (0, 12345))
+    asset = registry.get("page")
+    assert asset.variants["identity"][0] == b"<p>two</p>"
+    assert gzip.decompress(asset.variant("gzip")[0]) == b"<p>two</p>"
+
+
+def test_variants_are_compressed_on_first_use(tmp_path):
+    page = tmp_path / "page.html"
+    page.write_text("<p>lazy</p>" * 100)
+    registry = AssetRegistry()
+    registry.register("page", page)
+    asset = registry.get("page")
+    assert list(asset.variants) == ["identity"]
+    body, etag = asset.variant("gzip")
+    assert gzip.decompress(body) == page.read_bytes()
+    assert etag == f'"{asset.digest}-gz"'
+    assert asset.variant("gzip")[0] is body
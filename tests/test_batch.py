@@ -0,0 +1,78 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from app import batch
+from app.main import app
+
+client = TestClient(app)
+
+
+def _post_with_timeout(path, content, headers, timeout=5):
+    """POST through the ASGI app, failing instead of hanging forever."""
+    async def post():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+            return await c.post(path, content=content, headers=headers)
+
+    async def guarded():
+        return await asyncio.wait_for(post(), timeout)
+
+    return asyncio.run(guarded())
+
+
+async def _chunks(*parts):
+    for part in parts:
+        yield part
+
+
+def test_batch_json_array_keeps_order():
+    messages = [{"message": m} for m in ("a", "bb", "ccc")]
+    r = client.post("/echo/batch", json=messages)
+    assert r.status_code == 200
+    assert r.json() == [client.post("/echo", json=m).json() for m in messages]
+
+
+def test_large_batch_is_streamed(monkeypatch):
+    monkeypatch.setattr("app.main.BATCH_STREAM_THRESHOLD", 10)
+    messages = [{"message": str(n)} for n in range(25)] + [{"nope": 1}]
+    r = _post_with_timeout("/echo/batch", json.dumps(messages), {"Content-Type": "application/json"})
+    assert r.status_code == 200
+    # Took the streaming path: no Content-Length, and bad items are inline.
+    assert "content-length" not in r.headers
+    body = r.json()
+    assert [item["you_said"] for item in body[:25]] == [str(n) for n in range(25)]
+    assert body[25]["index"] == 25 and "error" in body[25]
+
+
+def test_batch_rejects_invalid_items():
+    r = client.post("/echo/batch", json=[{"message": "ok"}, {"nope": 1}])
+    assert r.status_code == 422
+    r = client.post("/echo/batch", content=b'{"message": "not an array"}')
+    assert r.status_code == 422
+
+
+def test_batch_ndjson():
+    body = '{"message": "one"}\n\n{"bad": true}\n{"message": "three"}'
+    r = _post_with_timeout("/echo/batch", body, {"Content-Type": "application/x-ndjson"})
+    assert r.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in r.text.splitlines()]
+    assert lines[0] == {"you_said": "one", "length": 3}
+    assert lines[1]["line"] == 3 and "error" in lines[1]
+    assert lines[2] == {"you_said": "three", "length": 5}
+
+
+def test_iter_json_array_across_chunk_boundaries():
+    async def collect(*parts):
+        return [item async for item in batch.iter_json_array(_chunks(*parts))]
+
+    raw = json.dumps([{"message": "héllo"}, 12, "x"]).encode()
+    # Split everywhere, including inside the multi-byte "é" and the number.
+    for cut in range(1, len(raw)):
+        assert asyncio.run(collect(raw[:cut], raw[cut:])) == [{"message": "héllo"}, 12, "x"]
+
+    with pytest.raises(ValueError):
+        asyncio.run(collect(b'[{"message": "a"}, {'))
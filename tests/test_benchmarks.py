@@ -0,0 +1,34 @@
+import pytest
+
+from benchmarks.harness import summarize
+from benchmarks.run import compare
+
+
+def test_summarize():
+    stats = summarize([0.001] * 98 + [0.010, 0.020], elapsed=0.5)
+    assert stats["requests"] == 100
+    assert stats["rps"] == 200.0
+    assert stats["p50_ms"] == 1.0
+    assert stats["p99_ms"] == 20.0
+
+
+def test_compare_flags_regressions():
+    baseline = {"GET /api": {"rps": 1000, "p99_ms": 10.0}}
+    assert compare({"GET /api": {"rps": 900, "p99_ms": 11.0}}, baseline, 0.25) == []
+    regressions = compare({"GET /api": {"rps": 500, "p99_ms": 20.0}}, baseline, 0.25)
+    assert len(regressions) == 2
+    assert compare({"GET /new": {"rps": 1, "p99_ms": 1}}, baseline, 0.25) == []
+
+
+def test_git_write_scenarios_do_real_work():
+    import httpx
+
+    from benchmarks.run import SCENARIOS, _succeeded
+
+    for name in ("POST /api/git-commit", "POST /api/git-push"):
+        assert SCENARIOS[name].prepare is not None
+        assert SCENARIOS[name].check is _succeeded
+    request = httpx.Request("POST", "http://bench/api/git-commit")
+    _succeeded(httpx.Response(200, json={"success": True, "output": ""}, request=request))
+    with pytest.raises(RuntimeError, match="nothing to commit"):
+        _succeeded(httpx.Response(200, json={"success": False, "output": "nothing to commit"}, request=request))
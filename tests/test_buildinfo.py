@@ -0,0 +1,39 @@
+import json
+
+from fastapi.testclient import TestClient
+
+from app import buildinfo, main
+
+client = TestClient(main.app)
+
+
+def test_load_falls_back_without_a_file(tmp_path, monkeypatch):
+    monkeypatch.setenv("GIT_SHA", "abc123")
+    info = buildinfo.load(tmp_path / "missing.json")
+    assert info["git_sha"] == "abc123"
+    assert info["built_at"].endswith("Z")
+    assert info["dependencies"]["fastapi"]
+    assert buildinfo.built_at_timestamp(info) > 0
+
+
+def test_cli_writes_what_load_reads(tmp_path, monkeypatch, capsys):
+    monkeypatch.setenv("SOURCE_DATE_EPOCH", "1700000000")
+    output = tmp_path / "build_info.json"
+    assert buildinfo.main(["--git-sha", "deadbeef", "--output", str(output)]) == 0
+    info = buildinfo.load(output)
+    assert info == json.loads(output.read_text())
+    assert info["git_sha"] == "deadbeef"
+    assert info["built_at"] == "2023-11-14T22:13:20Z"
+    assert buildinfo.built_at_timestamp(info) == 1700000000
+
+
+def test_version_is_prebuilt():
+    first = client.get("/version")
+    second = client.get("/version")
+    assert first.content == second.content
+    assert first.headers["etag"] == second.headers["etag"]
+    body = first.json()
+    assert body["git_sha"] == main.BUILD_INFO["git_sha"]
+    assert set(body["dependencies"]) == set(buildinfo.DEPENDENCIES)
+    assert first.headers["content-length"] == str(len(first.content))
+    assert client.get("/version", headers={"If-None-Match": first.headers["etag"]}).status_code == 304
@@ -0,0 +1,112 @@
+import re
+
+from fastapi.testclient import TestClient
+
+from app.bundles import bundle_pages, minify_css, minify_js, parse_css, specificity
+from app.main import app
+
+client = TestClient(app)
+
+BASE = "* { margin: 0; }\n.card { color: red; }\n"
+
+
+def page(css, body="", script=None):
+    html = f"<html><head><style>{css}</style></head><body>{body}"
+    if script is not None:
+        html += f"<script>{script}</script>"
+    return (html + "</body></html>").encode()
+
+
+def linked(html):
+    return re.findall(rb'(?:href|src)="/assets/([^"]+)"', html)
+
+
+def test_minify_css():
+    css = """
+        /* comment */
+        .a h1 , .b > p { font-family: 'Segoe UI',  Tahoma; box-shadow: 0 8px 32px rgba( 0, 0, 0, 0.1 ) ; }
+        .x:hover { background: url("a b;c.png") }
+    """
+    assert minify_css(css) == (
+        ".a h1,.b>p{font-family:'Segoe UI',Tahoma;box-shadow:0 8px 32px rgba(0,0,0,0.1)}"
+        '.x:hover{background:url("a b;c.png")}'
+    )
+    # At-rules are not parsed, only squeezed.
+    assert parse_css("@media (max-width: 600px) { .a { color: red } }") is None
+    assert minify_css("@media (max-width: 600px) {\n  .a { color: red }\n}") == "@media (max-width: 600px) { .a { color: red } }"
+
+
+def test_specificity():
+    assert specificity("*") == (0, 0, 0)
+    assert specificity(".header h1") == (0, 1, 1)
+    assert specificity("#main .btn:hover") == (1, 2, 0)
+    assert specificity("a::before") == specificity("a:before") == (0, 0, 2)
+
+
+def test_minify_js_keeps_template_literals():
+    js = """
+        // a comment
+        function go(n) {
+            const text = `line one
+    indented ${n > 1 ? `nested ${n}` : "x"} line
+  last`;
+            return text;  // trailing comments stay
+        }
+    """
+    assert minify_js(js) == (
+        "function go(n) {\nconst text = `line one\n    indented ${n > 1 ? `nested ${n}` : \"x\"} line\n"
+        "  last`;\nreturn text;  // trailing comments stay\n}"
+    )
+
+
+def test_repeated_rules_are_shared_when_safe():
+    pages = {"a": page(BASE + ".a { color: blue; }", '<div class="card a">'),
+             "b": page(BASE + ".b { color: green; }", '<div class="card b">'),
+             "c": page("* { margin: 0; }\n.c { color: black; }", '<div class="c">')}
+    bundled, files = bundle_pages(pages, shared_min_size=0)
+    bodies = {file.name: file.body for file in files}
+    assert bodies["common.css"] == b"*{margin:0}.card{color:red}"
+    assert bodies["a.css"] == b".a{color:blue}"
+    assert [name.split(b".")[0] for name in linked(bundled["a"])] == [b"common", b"a"]
+    assert [name.split(b".")[0] for name in linked(bundled["c"])] == [b"common", b"c"]
+    assert b"<style>" not in bundled["a"]
+
+    # Below the threshold a shared file is not worth its request.
+    _, files = bundle_pages(pages)
+    assert "common.css" not in {file.name for file in files}
+
+
+def test_rules_are_not_shared_when_the_cascade_could_change():
+    # On "a", .card follows a rule of the same specificity setting a
+    # colour; hoisting .card ahead of it would let that rule win.
+    a = page(".a { color: blue; }" + BASE, '<div class="card a">')
+    b = page(BASE, '<div class="card">')
+    _, files = bundle_pages({"a": a, "b": b}, shared_min_size=0)
+    assert {file.name: file.body for file in files}["common.css"] == b"*{margin:0}"
+
+    # "c" has a .card element but not the .card rule: it must not get it.
+    c = page("* { margin: 0; }", '<div class="card">')
+    _, files = bundle_pages({"b": b, "c": c, "d": page(BASE)}, shared_min_size=0)
+    assert {file.name: file.body for file in files}["common.css"] == b"*{margin:0}"
+
+
+def test_identical_scripts_share_a_file():
+    pages = {"a": page("", script="\n  go();\n"), "b": page("", script="go();")}
+    bundled, files = bundle_pages(pages)
+    assert [file.body for file in files] == [b"go();"]
+    assert linked(bundled["a"]) == linked(bundled["b"])
+
+
+def test_pages_link_immutable_bundles():
+    html = client.get("/demo").content
+    assert b"<style>" not in html and b"<script>" not in html
+    names = linked(html)
+    assert len(names) == 2
+    for name in names:
+        r = client.get(f"/assets/{name.decode()}")
+        assert r.status_code == 200
+        assert r.headers["cache-control"] == "public, max-age=31536000, immutable"
+        assert r.headers["content-type"].startswith(("text/css", "text/javascript"))
+    assert b"function runStep" in client.get(f"/assets/{names[1].decode()}").content
+    assert client.get("/assets/demo").status_code == 404
+    assert client.get("/assets/missing.css").status_code == 404
@@ -0,0 +1,51 @@
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+client = TestClient(app)
+
+CACHEABLE = ["/", "/demo", "/cicd-demo", "/frontend", "/cicd-live", "/manual-vs-automated", "/version"]
+
+
+def test_cache_control_per_route():
+    assert client.get("/version").headers["cache-control"] == "public, max-age=3600"
+    assert client.get("/demo").headers["cache-control"].startswith("public, max-age=")
+    assert client.get("/api").headers["cache-control"] == "no-store"
+    assert client.get("/api/devops-fact").headers["cache-control"] == "no-store"
+    assert "cache-control" not in client.post("/echo", json={"message": "x"}).headers
+
+
+def test_version_validators():
+    r = client.get("/version")
+    assert r.headers["etag"]
+    assert r.headers["last-modified"]
+
+    again = client.get("/version", headers={"If-None-Match": r.headers["etag"]})
+    assert again.status_code == 304
+    assert again.headers["etag"] == r.headers["etag"]
+    assert "content-length" not in again.headers or again.headers["content-length"] == "0"
+
+    since = client.get("/version", headers={"If-Modified-Since": r.headers["last-modified"]})
+    assert since.status_code == 304
+
+    stale = client.get("/version", headers={"If-None-Match": '"nope"'})
+    assert stale.status_code == 200
+
+
+def test_repeat_loads_save_bytes():
+    first_bytes = repeat_bytes = 0
+    for path in CACHEABLE:
+        first = client.get(path, headers={"Accept-Encoding": "identity"})
+        assert first.status_code == 200
+        first_bytes += len(first.content)
+
+        repeat = client.get(path, headers={
+            "Accept-Encoding": "identity",
+            "If-None-Match": first.headers["etag"],
+        })
+        assert repeat.status_code == 304, path
+        repeat_bytes += len(repeat.content)
+
+    print(f"first load: {first_bytes} bytes, repeat load: {repeat_bytes} bytes")
+    assert first_bytes > 50_000
+    assert repeat_bytes == 0
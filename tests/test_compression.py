@@ -0,0 +1,92 @@
+import asyncio
+import gzip
+import zlib
+
+from fastapi.testclient import TestClient
+
+from app import main
+from app.compression import CompressionMiddleware, compress
+
+client = TestClient(main.app)
+
+BIG = b'{"items":[' + b",".join(b'{"n":%d,"ok":true}' % n for n in range(200)) + b"]}"
+
+
+def _app(chunks, media_type="application/json", headers=()):
+    async def app(scope, receive, send):
+        raw = [(b"content-type", media_type.encode()), *headers]
+        await send({"type": "http.response.start", "status": 200, "headers": raw})
+        for n, chunk in enumerate(chunks):
+            await send({"type": "http.response.body", "body": chunk, "more_body": n < len(chunks) - 1})
+
+    return app
+
+
+def _call(app, accept_encoding="gzip", method="GET", **options):
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {"type": "http", "method": method, "path": "/", "headers": [(b"accept-encoding", accept_encoding.encode())]}
+    asyncio.run(CompressionMiddleware(app, **options)(scope, receive, send))
+    headers = {k.decode(): v.decode() for k, v in messages[0]["headers"]}
+    return headers, [m["body"] for m in messages[1:]]
+
+
+def test_compresses_large_json():
+    headers, bodies = _call(_app([BIG], headers=[(b"etag", b'"abc"')]), encodings=("gzip",))
+    assert headers["content-encoding"] == "gzip"
+    assert headers["vary"] == "Accept-Encoding"
+    assert headers["etag"] == 'W/"abc"'
+    assert gzip.decompress(b"".join(bodies)) == BIG
+    assert int(headers["content-length"]) == len(bodies[0]) < len(BIG)
+
+
+def test_small_bodies_and_other_types_pass_through():
+    headers, bodies = _call(_app([b'{"a":1}']), encodings=("gzip",))
+    assert "content-encoding" not in headers
+    assert bodies == [b'{"a":1}']
+
+    headers, _ = _call(_app([BIG], media_type="image/png"), encodings=("gzip",))
+    assert "content-encoding" not in headers and "vary" not in headers
+
+    headers, _ = _call(_app([BIG], headers=[(b"content-encoding", b"br")]), encodings=("gzip",))
+    assert headers["content-encoding"] == "br"
+
+
+def test_identity_clients_get_vary():
+    headers, bodies = _call(_app([BIG]), accept_encoding="identity", encodings=("gzip",))
+    assert "content-encoding" not in headers
+    assert headers["vary"] == "Accept-Encoding"
+    assert bodies == [BIG]
+
+
+def test_event_streams_are_flushed_per_chunk():
+    events = [b"event: tick\ndata: {}\n\n", b": keepalive\n\n", b""]
+    headers, bodies = _call(_app(events, media_type="text/event-stream"), encodings=("gzip",))
+    assert headers["content-encoding"] == "gzip"
+    assert "content-length" not in headers
+    decoder = zlib.decompressobj(31)
+    # Every event can be decoded as soon as it arrives.
+    assert decoder.decompress(bodies[0]) == events[0]
+    assert decoder.decompress(bodies[1]) == events[1]
+    assert decoder.decompress(bodies[2]) == b"" and decoder.eof
+
+
+def test_compress_round_trips():
+    assert gzip.decompress(compress("gzip", BIG)) == BIG
+
+
+def test_app_compresses_json_but_not_pages_twice():
+    batch = [{"message": f"message {n}"} for n in range(100)]
+    r = client.post("/echo/batch", json=batch, headers={"Accept-Encoding": "gzip"})
+    assert r.headers["content-encoding"] == "gzip"
+    assert r.json()[0] == {"you_said": "message 0", "length": 9}
+
+    page = client.get("/demo", headers={"Accept-Encoding": "gzip"})
+    assert page.headers["content-encoding"] == "gzip"
+    assert "<html" in page.text.lower()  # decoded once, so compressed once
@@ -0,0 +1,79 @@
+import asyncio
+import json
+
+from app.events import EventBroker, encode_event
+from app.gitexec import GitRunner
+from app.repository import GitRepository
+
+
+def _decode(message):
+    event, data = message.decode().strip().split("\n")
+    return event.removeprefix("event: "), json.loads(data.removeprefix("data: "))
+
+
+def test_encode_event():
+    assert encode_event("ping", {"a": 1}) == b'event: ping\ndata: {"a":1}\n\n'
+
+
+def test_stream_sends_initial_then_published_events():
+    async def scenario():
+        broker = EventBroker()
+        stream = broker.stream(initial=[("hello", {"n": 0})])
+        assert await anext(stream) == b"retry: 1000\n\n"
+        first = await anext(stream)
+        broker.publish("tick", {"n": 1})
+        second = await anext(stream)
+        await stream.aclose()
+        return first, second, broker.subscriber_count
+
+    first, second, remaining = asyncio.run(scenario())
+    assert _decode(first) == ("hello", {"n": 0})
+    assert _decode(second) == ("tick", {"n": 1})
+    assert remaining == 0
+
+
+def test_stream_ends_after_max_age():
+    async def scenario():
+        broker = EventBroker(keepalive=0.05, max_age=0.2, retry_ms=500)
+        return [message async for message in broker.stream()], broker.subscriber_count
+
+    messages, remaining = asyncio.run(asyncio.wait_for(scenario(), 5))
+    assert messages[0] == b"retry: 500\n\n"
+    assert set(messages[1:]) == {b": keepalive\n\n"}
+    assert remaining == 0
+
+
+def test_slow_subscriber_drops_oldest():
+    async def scenario():
+        broker = EventBroker(queue_size=2)
+        queue = broker.subscribe()
+        for n in range(5):
+            broker.publish("tick", {"n": n})
+        return [_decode(queue.get_nowait())[1]["n"] for _ in range(queue.qsize())]
+
+    assert asyncio.run(scenario()) == [3, 4]
+
+
+def test_commit_output_and_status_changes_are_published(git_repo):
+    async def scenario():
+        broker = EventBroker()
+        queue = broker.subscribe()
+        repository = GitRepository(GitRunner(cwd=str(git_repo)), watch=False, events=broker)
+        await repository.status()
+        (git_repo / "new.txt").write_text("hello\n")
+        repository.invalidate()
+        await repository.status()
+        await repository.status()  # unchanged: no event
+        await repository.commit("add new.txt")
+        await repository.status()
+        return [_decode(queue.get_nowait()) for _ in range(queue.qsize())]
+
+    events = asyncio.run(scenario())
+    names = [name for name, _ in events]
+    assert names[:3] == ["git-status", "git-status", "git-start"]
+    assert "new.txt" in events[1][1]["output"]
+    assert "git-output" in names
+    assert any("add new.txt" in data["line"] for name, data in events if name == "git-output")
+    done = next(data for name, data in events if name == "git-done")
+    assert done["success"] is True
+    assert events[-1] == ("git-status", {**events[0][1]})
@@ -0,0 +1,110 @@
+from contextlib import contextmanager
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.fastpath import FastPathMiddleware, fast_path
+from app.main import app
+from app.profiling import Profiler
+from benchmarks.bench_fastpath import find_middleware
+
+client = TestClient(app)
+
+# Headers the two paths may legitimately differ in.
+VOLATILE = {"date", "server", "content-length"}
+
+
+def _headers(response):
+    return {k: v for k, v in response.headers.items() if k not in VOLATILE}
+
+
+@contextmanager
+def fast_path_enabled(enabled):
+    fast = find_middleware(app, FastPathMiddleware)
+    before = fast.enabled
+    fast.enabled = enabled
+    try:
+        yield fast
+    finally:
+        fast.enabled = before
+
+
+def test_fast_path_matches_the_full_stack():
+    for path in ("/version", "/healthz", "/api"):
+        with fast_path_enabled(False):
+            slow = client.get(path)
+        with fast_path_enabled(True):
+            fast = client.get(path)
+        assert fast.status_code == slow.status_code == 200
+        assert _headers(fast) == _headers(slow)
+        assert fast.headers["content-length"] == str(len(fast.content))
+        if path != "/api":
+            assert fast.content == slow.content
+        else:
+            assert fast.json().keys() == slow.json().keys()
+
+
+def test_conditional_and_head_requests():
+    with fast_path_enabled(True):
+        first = client.get("/version")
+        etag = first.headers["etag"]
+        r = client.get("/version", headers={"If-None-Match": etag})
+        assert r.status_code == 304 and r.content == b""
+        assert r.headers["etag"] == etag and "content-type" not in r.headers
+        r = client.get("/version", headers={"If-Modified-Since": first.headers["last-modified"]})
+        assert r.status_code == 304
+        assert client.get("/version", headers={"If-None-Match": '"other"'}).status_code == 200
+        r = client.head("/version")
+        assert r.status_code == 200 and r.content == b""
+
+
+def test_requests_are_still_counted_under_their_route():
+    def count(text):
+        prefix = 'http_requests_total{method="GET",route="/version",status="200"} '
+        return next((float(line[len(prefix):]) for line in text.splitlines() if line.startswith(prefix)), 0.0)
+
+    with fast_path_enabled(True):
+        before = count(client.get("/metrics").text)
+        client.get("/version")
+        client.get("/version")
+        assert count(client.get("/metrics").text) == before + 2
+
+
+def _app(profiler=None):
+    calls = []
+    inner = FastAPI()
+
+    @inner.get("/ping")
+    @fast_path(lambda: {"pong": True})
+    async def ping():
+        calls.append("ping")
+        return {"pong": True}
+
+    @inner.get("/big")
+    @fast_path(lambda: {"data": "x" * 4096})
+    async def big():
+        calls.append("big")
+        return {"data": "x" * 4096}
+
+    inner.add_middleware(FastPathMiddleware, router=inner.router, profiler=profiler)
+    return TestClient(inner), calls
+
+
+def test_falls_through_when_profiled_compressible_or_disabled():
+    profiler = Profiler()
+    test_client, calls = _app(profiler)
+    assert test_client.get("/ping").json() == {"pong": True}
+    assert calls == []
+    # A body CompressionMiddleware would compress goes to the app.
+    assert test_client.get("/big").status_code == 200
+    assert calls == ["big"]
+    # So does a request the profiler may sample.
+    profiler.enable("/ping")
+    test_client.get("/ping")
+    profiler.disable()
+    assert calls == ["big", "ping"]
+
+    test_client, calls = _app()
+    find_middleware(test_client.app, FastPathMiddleware).enabled = False
+    test_client.get("/ping")
+    assert calls == ["ping"]
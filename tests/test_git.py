@@ -0,0 +1,214 @@
+import asyncio
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import main
+from app.gitexec import GitRunner, GitTimeoutError
+from app.jobs import JobQueue
+from app.metrics import GIT_STATUS_LOOKUPS
+from app.repository import GitRepository
+
+client = TestClient(main.app)
+
+
+@pytest.fixture
+def repo(git_repo, monkeypatch):
+    monkeypatch.setattr(main, "repo", GitRepository(GitRunner(cwd=str(git_repo)), watch=False))
+    monkeypatch.setattr(main, "jobs", JobQueue(main.repo))
+    return git_repo
+
+
+def test_git_status_clean(repo):
+    r = client.get("/api/git-status")
+    assert r.json() == {"output": "Working tree clean", "success": True}
+
+
+def test_git_status_and_commit(repo):
+    (repo / "new.txt").write_text("hello\n")
+    main.repo.invalidate()
+    r = client.get("/api/git-status")
+    assert "new.txt" in r.json()["output"]
+
+    r = client.post("/api/git-commit", params={"wait": 10})
+    assert r.status_code == 200
+    assert r.json()["success"] is True
+    assert client.get("/api/git-status").json()["output"] == "Working tree clean"
+
+
+def test_git_push_without_remote_fails(repo):
+    r = client.post("/api/git-push", params={"wait": 10})
+    assert r.json()["status"] == "failed"
+    assert r.json()["success"] is False
+
+
+def test_runner_timeout_kills_process(git_repo):
+    runner = GitRunner(cwd=str(git_repo), timeout=0.2)
+    # `git -c alias...` gives us a slow, harmless git process.
+    args = ("-c", "alias.slow=!sleep 5", "slow")
+    with pytest.raises(GitTimeoutError):
+        asyncio.run(runner.run(*args))
+
+
+def test_runner_kills_process_when_callback_fails(git_repo):
+    runner = GitRunner(cwd=str(git_repo))
+    args = ("-c", "alias.chatty=!echo $$; sleep 5", "chatty")
+    pids = []
+
+    def on_output(stream, line):
+        pids.append(int(line))
+        raise RuntimeError("callback failed")
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(runner.run(*args, on_output=on_output))
+
+    # The shell git spawned for the alias must not outlive the failed call
+    # (once killed it may linger as a zombie until init reaps it).
+    deadline = time.monotonic() + 2
+    while time.monotonic() < deadline:
+        try:
+            with open(f"/proc/{pids[0]}/stat") as f:
+                if f.read().rsplit(")", 1)[1].split()[0] == "Z":
+                    return
+        except FileNotFoundError:
+            return
+        time.sleep(0.05)
+    pytest.fail("git alias process is still running")
+
+
+def test_runner_bounds_concurrency(git_repo):
+    runner = GitRunner(cwd=str(git_repo), max_concurrency=1)
+    args = ("-c", "alias.nap=!sleep 0.3", "nap")
+
+    async def two_at_once():
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        await asyncio.gather(runner.run(*args), runner.run(*args))
+        return loop.time() - start
+
+    assert asyncio.run(two_at_once()) >= 0.6
+
+
+def test_git_status_served_from_cache_with_etag(repo):
+    r = client.get("/api/git-status")
+    etag = r.headers["etag"]
+
+    # A change inside the TTL is not seen: no git process was forked.
+    (repo / "new.txt").write_text("hello\n")
+    assert client.get("/api/git-status").headers["etag"] == etag
+
+    r = client.get("/api/git-status", headers={"If-None-Match": etag})
+    assert r.status_code == 304
+    assert r.content == b""
+
+    main.repo.invalidate()
+    r = client.get("/api/git-status", headers={"If-None-Match": etag})
+    assert r.status_code == 200
+    assert r.headers["etag"] != etag
+
+
+def test_repository_setup_runs_once(git_repo):
+    calls = []
+    runner = GitRunner(cwd=str(git_repo))
+    original = runner.run
+
+    async def counting_run(*args, **kwargs):
+        calls.append(args)
+        return await original(*args, **kwargs)
+
+    runner.run = counting_run
+    repository = GitRepository(runner, ttl=60, watch=False)
+
+    async def poll():
+        for _ in range(5):
+            await repository.status()
+
+    asyncio.run(poll())
+    assert [args[0] for args in calls] == ["config", "config", "config", "status"]
+
+
+def test_concurrent_status_calls_share_one_git_process(git_repo):
+    calls = []
+    runner = GitRunner(cwd=str(git_repo))
+    original = runner.run
+
+    async def counting_run(*args, **kwargs):
+        calls.append(args)
+        return await original(*args, **kwargs)
+
+    runner.run = counting_run
+    repository = GitRepository(runner, ttl=60, watch=False)
+
+    async def burst():
+        await repository.setup()
+        return await asyncio.gather(*(repository.status() for _ in range(50)))
+
+    before = dict(GIT_STATUS_LOOKUPS.values)
+    snapshots = asyncio.run(burst())
+    assert [args[0] for args in calls].count("status") == 1
+    assert len({s.etag for s in snapshots}) == 1
+    after = GIT_STATUS_LOOKUPS.values
+    assert after[("launched",)] - before.get(("launched",), 0) == 1
+    assert after[("coalesced",)] - before.get(("coalesced",), 0) == 49
+
+
+def test_invalidate_during_refresh_starts_a_new_one(git_repo):
+    repository = GitRepository(GitRunner(cwd=str(git_repo)), ttl=60, watch=False)
+
+    async def race():
+        first = asyncio.ensure_future(repository.status())
+        await asyncio.sleep(0)  # the first refresh is now in flight
+        (git_repo / "new.txt").write_text("hello\n")
+        repository.invalidate()
+        second = await repository.status()
+        await first
+        return second, await repository.status()
+
+    second, latest = asyncio.run(race())
+    assert "new.txt" in second.output
+    assert latest is second
+
+
+def test_start_runs_background_tasks_when_setup_fails(git_repo, tmp_path, caplog):
+    from app.events import EventBroker
+
+    repository = GitRepository(GitRunner(cwd=str(tmp_path / "missing")), watch=False, events=EventBroker())
+
+    async def start():
+        await repository.start()  # does not wait for setup
+        await asyncio.sleep(0.2)
+        running = [t for t in repository._tasks if not t.done()]
+        await repository.stop()
+        return running
+
+    assert len(asyncio.run(start())) == 1
+    assert "git setup failed at startup" in caplog.text
+
+
+def test_concurrent_setup_runs_once(git_repo):
+    calls = []
+    runner = GitRunner(cwd=str(git_repo))
+    original = runner.run
+
+    async def counting_run(*args, **kwargs):
+        calls.append(args)
+        return await original(*args, **kwargs)
+
+    runner.run = counting_run
+    repository = GitRepository(runner, watch=False)
+
+    async def burst():
+        await asyncio.gather(*(repository.setup() for _ in range(5)))
+
+    asyncio.run(burst())
+    assert len(calls) == 3
+
+
+def test_git_durations_are_recorded(repo):
+    from app.metrics import GIT_DURATION
+
+    before = sum(GIT_DURATION.values.get(("status", "ok"), [[0]])[0])
+    main.repo.invalidate()
+    client.get("/api/git-status")
+    assert sum(GIT_DURATION.values[("status", "ok")][0]) == before + 1
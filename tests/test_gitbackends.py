@@ -0,0 +1,119 @@
+import asyncio
+import subprocess
+from types import SimpleNamespace
+
+import pytest
+
+from app.gitbackends import (
+    BACKENDS,
+    format_dulwich_status,
+    format_libgit2_status,
+    make_backend,
+    parse_short_z,
+    render_short,
+)
+from app.gitexec import GitRunner
+
+
+def _dirty(repo):
+    (repo / "README.md").write_text("changed\n")
+    (repo / "staged.txt").write_text("new\n")
+    subprocess.run(["git", "add", "staged.txt"], cwd=repo, check=True)
+    (repo / "untracked.txt").write_text("?\n")
+
+
+def test_format_libgit2_status():
+    status = {"b.txt": 128, "a.txt": 2 | 256, "gone.txt": 512, "new.txt": 1, "ignored.log": 16384}
+    assert format_libgit2_status(status) == "MM a.txt\n?? b.txt\n D gone.txt\nA  new.txt"
+
+
+def test_format_dulwich_status(tmp_path):
+    (tmp_path / "a.txt").write_text("")
+    status = SimpleNamespace(
+        staged={"add": [b"new.txt"], "modify": [b"a.txt"], "delete": []},
+        unstaged=[b"a.txt", b"gone.txt"],
+        untracked=["b.txt"],
+    )
+    assert format_dulwich_status(status, str(tmp_path)) == "MM a.txt\n?? b.txt\n D gone.txt\nA  new.txt"
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError, match="not available"):
+        make_backend(GitRunner(), "svn")
+
+
+@pytest.mark.parametrize("name", sorted(BACKENDS))
+def test_backends_agree_with_the_cli(git_repo, name):
+    _dirty(git_repo)
+    backend = make_backend(GitRunner(cwd=str(git_repo)), name)
+    cli = subprocess.run(["git", "status", "--short"], cwd=git_repo, capture_output=True, text=True, check=True)
+    expected = cli.stdout
+    assert asyncio.run(backend.status()).strip() == expected.strip()
+
+
+@pytest.mark.parametrize("name", ["pygit2", "dulwich"])
+def test_library_backend_when_installed(git_repo, name):
+    if name not in BACKENDS:
+        pytest.skip(f"{name} is not installed")
+    _dirty(git_repo)
+    status = asyncio.run(make_backend(GitRunner(cwd=str(git_repo)), name).status())
+    assert status.splitlines() == [" M README.md", "A  staged.txt", "?? untracked.txt"]
+
+
+def test_parse_and_render_short_z():
+    entries = parse_short_z("R  new.txt\0old.txt\0 M a b.txt\0?? z.txt\0A  c.txt\0")
+    assert entries["new.txt"] == ("R ", "old.txt")
+    assert render_short(entries) == " M a b.txt\nA  c.txt\nR  old.txt -> new.txt\n?? z.txt"
+
+
+def _full_status(repo):
+    cli = subprocess.run(
+        ["git", "status", "--short", "--untracked-files=all"], cwd=repo, capture_output=True, text=True, check=True,
+    )
+    return cli.stdout.strip()
+
+
+def test_incremental_backend_rescans_only_changed_paths(git_repo):
+    runner = GitRunner(cwd=str(git_repo))
+    calls = []
+    original = runner.run
+
+    async def counting_run(*args, **kwargs):
+        calls.append(args[args.index("--") + 1:] if "--" in args else "full")
+        return await original(*args, **kwargs)
+
+    runner.run = counting_run
+    backend = make_backend(runner, "incremental")
+    backend.watching = True
+    (git_repo / "dir").mkdir()
+
+    async def scenario():
+        outputs = [await backend.status()]  # first scan is full
+        outputs.append(await backend.status())  # nothing changed: no git at all
+        (git_repo / "README.md").write_text("changed\n")
+        (git_repo / "dir" / "new.txt").write_text("new\n")
+        backend.changed([str(git_repo / "README.md"), str(git_repo / "dir" / "new.txt")])
+        outputs.append(await backend.status())
+        (git_repo / "README.md").write_text("# demo\n")
+        backend.changed([str(git_repo / "README.md")])
+        outputs.append(await backend.status())
+        backend.changed([str(git_repo / ".git" / "index")])
+        outputs.append(await backend.status())
+        return outputs
+
+    outputs = asyncio.run(scenario())
+    assert calls == ["full", ("README.md", "dir/new.txt"), ("README.md",), "full"]
+    assert outputs[:2] == ["", ""]
+    assert outputs[2] == " M README.md\n?? dir/new.txt"
+    assert outputs[3] == outputs[4] == _full_status(git_repo) == "?? dir/new.txt"
+
+
+def test_incremental_backend_without_a_watcher_always_scans(git_repo):
+    backend = make_backend(GitRunner(cwd=str(git_repo)), "incremental")
+
+    async def scenario():
+        await backend.status()
+        (git_repo / "README.md").write_text("changed\n")
+        return await backend.status()
+
+    assert asyncio.run(scenario()) == " M README.md"
@@ -0,0 +1,96 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import health, main
+from app.gitexec import GitRunner
+from app.health import ReadinessProbe
+from app.repository import GitRepository
+
+client = TestClient(main.app)
+
+
+def _probe(path, **kwargs):
+    return ReadinessProbe(GitRepository(GitRunner(cwd=str(path)), watch=False), **kwargs)
+
+
+@pytest.fixture
+def probe(git_repo, monkeypatch):
+    probe = _probe(git_repo)
+    monkeypatch.setattr(main, "readiness", probe)
+    return probe
+
+
+def test_healthz_is_constant():
+    r = client.get("/healthz")
+    assert r.status_code == 200
+    assert r.json() == {"status": "ok"}
+    assert r.headers["cache-control"] == "no-store"
+
+
+def test_not_ready_until_checked(probe):
+    r = client.get("/readyz")
+    assert r.status_code == 503
+    assert r.json()["ready"] is False
+
+
+def test_ready_serves_the_cached_result(probe):
+    asyncio.run(probe.check())
+    r = client.get("/readyz")
+    assert r.status_code == 200
+    checks = r.json()["checks"]
+    assert {name: check["ok"] for name, check in checks.items()} == {"git": True, "repository": True, "index": True}
+    assert checks["git"]["detail"].startswith("git version")
+    assert 'readiness_check_ok{check="index"} 1' in client.get("/metrics").text
+
+    # Polling does no work of its own: a broken repo goes unnoticed until the next check.
+    probe.repo.git.cwd = str(probe.repo.git.cwd) + "-missing"
+    assert client.get("/readyz").status_code == 200
+    asyncio.run(probe.check())
+    assert client.get("/readyz").status_code == 503
+
+    probe.max_age = 0
+    asyncio.run(probe.check())
+    assert "old" in client.get("/readyz").json()["detail"]
+
+
+def test_not_a_repository(tmp_path, git_repo, monkeypatch):
+    plain = tmp_path / "plain"
+    plain.mkdir()
+    monkeypatch.setenv("GIT_CEILING_DIRECTORIES", str(tmp_path))
+    result = asyncio.run(_probe(plain).check())
+    assert not result.ready
+    assert result.checks["git"][0] and not result.checks["repository"][0]
+    assert result.checks["index"] == (False, "not checked")
+
+
+def test_git_missing(git_repo, tmp_path, monkeypatch):
+    monkeypatch.setenv("PATH", str(tmp_path / "empty"))
+    result = asyncio.run(_probe(git_repo).check())
+    assert not result.checks["git"][0]
+    assert result.checks["repository"] == (False, "not checked")
+
+
+def test_read_only_index(git_repo, monkeypatch):
+    index = str(git_repo / ".git" / "index")
+    real_access = health.os.access
+    monkeypatch.setattr(health.os, "access", lambda path, mode: path != index and real_access(path, mode))
+    ok, detail = asyncio.run(_probe(git_repo).check()).checks["index"]
+    assert not ok and detail == f"{index} is not writable"
+
+
+def test_checks_run_in_the_background(git_repo):
+    probe = _probe(git_repo, interval=0.01)
+
+    async def run():
+        await probe.start()
+        while probe.result is None:
+            await asyncio.sleep(0.01)
+        first = probe.result
+        while probe.result is first:
+            await asyncio.sleep(0.01)
+        await probe.stop()
+
+    asyncio.run(asyncio.wait_for(run(), 10))
+    assert probe.state()["ready"] is True
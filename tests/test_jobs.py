@@ -0,0 +1,111 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import main
+from app.gitexec import GitResult
+from app.jobs import JobQueue, JobQueueFull
+
+
+class FakeRepo:
+    """Records how many operations overlap."""
+
+    def __init__(self, delay=0.01):
+        self.delay = delay
+        self.running = 0
+        self.max_running = 0
+        self.calls = []
+
+    async def _run(self, name, op_id):
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        self.calls.append((name, op_id))
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.running -= 1
+        if name == "push":
+            raise OSError("no remote")
+        return GitResult(("git", name), 0, f"{name} done", "")
+
+    async def commit(self, message, op_id=None):
+        return await self._run("commit", op_id)
+
+    async def push(self, remote="origin", branch="main", op_id=None):
+        return await self._run("push", op_id)
+
+
+def test_jobs_run_one_at_a_time_in_order():
+    async def scenario():
+        repo = FakeRepo()
+        queue = JobQueue(repo)
+        submitted = [queue.submit("commit") for _ in range(5)] + [queue.submit("push")]
+        assert all(job.status == "queued" for job in submitted)
+        for job in submitted:
+            assert await job.wait(5)
+        await queue.stop()
+        return repo, submitted
+
+    repo, submitted = asyncio.run(scenario())
+    assert repo.max_running == 1
+    assert [op_id for _, op_id in repo.calls] == [job.id for job in submitted]
+    assert submitted[0].as_dict()["status"] == "succeeded"
+    assert submitted[0].output == "commit done"
+    assert submitted[-1].status == "failed"
+    assert submitted[-1].output == "no remote"
+
+
+def test_queue_is_bounded_and_history_trimmed():
+    async def scenario():
+        queue = JobQueue(FakeRepo(delay=0), queue_size=2, history=3)
+        first = queue.submit("commit")
+        second = queue.submit("commit")
+        with pytest.raises(JobQueueFull):
+            queue.submit("commit")
+        await second.wait(5)
+        for _ in range(10):
+            await queue.submit("commit").wait(5)
+        await queue.stop()
+        return queue, first
+
+    queue, first = asyncio.run(scenario())
+    assert len(queue._jobs) == 3
+    assert queue.get(first.id) is None
+
+
+def test_stop_fails_the_running_job():
+    async def scenario():
+        queue = JobQueue(FakeRepo(delay=10))
+        job = queue.submit("commit")
+        await asyncio.sleep(0.05)
+        await queue.stop()
+        return job
+
+    job = asyncio.run(scenario())
+    assert job.status == "failed"
+    assert "cancelled" in job.output
+
+
+def test_job_routes(monkeypatch):
+    monkeypatch.setattr(main, "jobs", JobQueue(FakeRepo(delay=0.2)))
+    with TestClient(main.app) as client:
+        r = client.post("/api/git-commit")
+        assert r.status_code == 202
+        job = r.json()
+        assert job["status"] in ("queued", "running")
+        assert r.headers["location"] == f"/api/jobs/{job['id']}"
+
+        r = client.get(f"/api/jobs/{job['id']}", params={"wait": 5})
+        assert r.status_code == 200
+        assert r.json()["status"] == "succeeded"
+        assert r.headers["cache-control"] == "no-store"
+
+        assert client.get("/api/jobs/nope").status_code == 404
+
+
+def test_full_queue_is_503(monkeypatch):
+    monkeypatch.setattr(main, "jobs", JobQueue(FakeRepo(delay=1), queue_size=0))
+    r = TestClient(main.app).post("/api/git-push")
+    assert r.status_code == 503
+    assert r.headers["retry-after"] == "5"
@@ -0,0 +1,93 @@
+import os
+import subprocess
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.metrics import MetricsMiddleware, Registry
+
+client = TestClient(app)
+
+
+def _value(text, prefix):
+    for line in text.splitlines():
+        if line.startswith(prefix):
+            return float(line.rsplit(" ", 1)[1])
+    return 0.0
+
+
+def test_requests_are_counted_by_route_template():
+    before = _value(client.get("/metrics").text, 'http_requests_total{method="POST",route="/echo",status="200"}')
+    client.post("/echo", json={"message": "hi"})
+    client.post("/echo", json={"message": "there"})
+    client.get("/no-such-page")
+
+    text = client.get("/metrics").text
+    assert _value(text, 'http_requests_total{method="POST",route="/echo",status="200"}') == before + 2
+    assert _value(text, 'http_requests_total{method="GET",route="<unmatched>",status="404"}') >= 1
+    assert 'http_request_duration_seconds_bucket{method="POST",route="/echo",le="+Inf"}' in text
+    assert "# TYPE http_request_duration_seconds histogram" in text
+    # The scrape itself is in flight while rendering.
+    assert _value(text, "http_requests_in_flight") == 1
+
+
+def test_workers_are_merged(tmp_path):
+    worker_a = Registry(directory=str(tmp_path))
+    requests = worker_a.counter("requests_total", "Requests.", ("route",))
+    latency = worker_a.histogram("latency_seconds", "Latency.", buckets=(0.1, 1))
+    requests.inc(("/a",), 3)
+    latency.observe(0.05)
+    worker_a.flush()
+    # Pretend the values on disk came from another (live) worker.
+    os.rename(tmp_path / worker_a.filename, tmp_path / f"{os.getppid()}-0.json")
+
+    requests.values.clear()
+    latency.values.clear()
+    requests.inc(("/a",), 2)
+    latency.observe(0.5)
+
+    text = worker_a.render()
+    assert 'requests_total{route="/a"} 5' in text
+    assert 'latency_seconds_bucket{le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{le="1"} 2' in text
+    assert "latency_seconds_count 2" in text
+
+
+def _exited_pid():
+    proc = subprocess.Popen(["true"])
+    proc.wait()
+    return proc.pid
+
+
+def test_exited_workers_are_archived(tmp_path):
+    registry = Registry(directory=str(tmp_path))
+    requests = registry.counter("requests_total", "Requests.")
+    in_flight = registry.gauge("in_flight", "In flight.")
+    requests.inc(amount=3)
+    in_flight.set(7)
+    registry.flush()
+    # The values on disk now belong to a worker that has exited...
+    os.rename(tmp_path / registry.filename, tmp_path / f"{_exited_pid()}-0.json")
+    requests.values.clear()
+    in_flight.values.clear()
+    requests.inc(amount=2)
+
+    text = registry.render()
+    assert "requests_total 5" in text
+    assert "in_flight 7" not in text
+    assert set(os.listdir(tmp_path)) == {"archive.json", "archive.lock", registry.filename}
+
+    # ...and stay counted, once, on later scrapes.
+    requests.inc()
+    assert "requests_total 6" in registry.render()
+
+
+def test_middleware_records_into_its_registry():
+    registry = Registry()
+    inner = FastAPI()
+    inner.add_middleware(MetricsMiddleware, registry=registry)
+    inner.get("/ping")(lambda: "pong")
+
+    TestClient(inner).get("/ping")
+    assert 'http_requests_total{method="GET",route="/ping",status="200"} 1' in registry.render()
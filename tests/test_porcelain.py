@@ -0,0 +1,121 @@
+import asyncio
+import subprocess
+from contextlib import aclosing
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import main
+from app.gitexec import GitRunner
+from app.jobs import JobQueue
+from app.metrics import GIT_DURATION
+from app.porcelain import InvalidCursor, decode_cursor, paginate, parse_porcelain_v2
+from app.repository import GitRepository
+
+client = TestClient(main.app)
+
+OUTPUT = (
+    b"1 .M N... 100644 100644 100644 abc abc README.md\0"
+    b"u UU N... 100644 100644 100644 100644 a b c conflict.txt\0"
+    b"2 R. N... 100644 100644 100644 abc abc R100 new name.txt\0old.txt\0"
+    b"1 A. N... 000000 100644 100644 000 abc staged.txt\0"
+    b"? notes/todo.txt\0"
+)
+
+
+async def _chunks(data, size):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+async def _entries(data=OUTPUT, size=7):
+    return [entry async for entry in parse_porcelain_v2(_chunks(data, size))]
+
+
+def test_parse_porcelain_v2_across_chunk_boundaries():
+    entries = asyncio.run(_entries())
+    assert [e.as_dict() for e in entries] == [
+        {"path": "README.md", "index": "unmodified", "worktree": "modified", "kind": "changed", "orig_path": None},
+        {"path": "conflict.txt", "index": "unmerged", "worktree": "unmerged", "kind": "unmerged", "orig_path": None},
+        {"path": "new name.txt", "index": "renamed", "worktree": "unmodified", "kind": "renamed",
+         "orig_path": "old.txt"},
+        {"path": "staged.txt", "index": "added", "worktree": "unmodified", "kind": "changed", "orig_path": None},
+        {"path": "notes/todo.txt", "index": "untracked", "worktree": "untracked", "kind": "untracked",
+         "orig_path": None},
+    ]
+    assert asyncio.run(_entries(size=1)) == entries
+
+
+def test_paginate_with_cursor_and_filters():
+    async def pages(**kwargs):
+        seen, cursor = [], None
+        while True:
+            page, cursor = await paginate(parse_porcelain_v2(_chunks(OUTPUT, 64)), 2, cursor, **kwargs)
+            seen.append([e.path for e in page])
+            if cursor is None:
+                return seen
+
+    assert asyncio.run(pages()) == [["README.md", "conflict.txt"], ["new name.txt", "staged.txt"], ["notes/todo.txt"]]
+    assert asyncio.run(pages(wanted=("staged",))) == [["conflict.txt", "new name.txt"], ["staged.txt"]]
+    assert asyncio.run(pages(wanted=("untracked", "modified"))) == [["README.md", "notes/todo.txt"]]
+    assert asyncio.run(pages(prefix="notes/")) == [["notes/todo.txt"]]
+
+
+def test_invalid_cursor():
+    with pytest.raises(InvalidCursor):
+        decode_cursor("not a cursor!")
+
+
+def test_stream_stops_git_when_closed_early(git_repo):
+    for n in range(2000):
+        (git_repo / f"untracked-{n:04}.txt").write_text("")
+    runner = GitRunner(cwd=str(git_repo))
+
+    async def first_chunk():
+        async with aclosing(runner.stream("status", "--porcelain=v2", "-z", "-uall", chunk_size=64)) as chunks:
+            async for chunk in chunks:
+                return chunk
+
+    stopped = GIT_DURATION.values.get(("status", "stopped"), [[0]])[0]
+    before = sum(stopped)
+    assert asyncio.run(first_chunk()).startswith(b"? untracked-0000.txt\0")
+    assert sum(GIT_DURATION.values[("status", "stopped")][0]) == before + 1
+
+
+@pytest.fixture
+def repo(git_repo, monkeypatch):
+    monkeypatch.setattr(main, "repo", GitRepository(GitRunner(cwd=str(git_repo)), watch=False))
+    monkeypatch.setattr(main, "jobs", JobQueue(main.repo))
+    (git_repo / "README.md").write_text("changed\n")
+    (git_repo / "src").mkdir()
+    for n in range(5):
+        (git_repo / "src" / f"f{n}.py").write_text("")
+    subprocess.run(["git", "add", "src/f0.py"], cwd=git_repo, check=True)
+    return git_repo
+
+
+def test_status_files_endpoint(repo):
+    r = client.get("/api/git-status/files", params={"limit": 2, "untracked": "all"})
+    assert r.status_code == 200
+    body = r.json()
+    assert [f["path"] for f in body["files"]] == ["README.md", "src/f0.py"]
+    assert body["files"][1]["index"] == "added"
+
+    paths = []
+    cursor = body["next_cursor"]
+    while cursor:
+        body = client.get("/api/git-status/files", params={"limit": 2, "untracked": "all", "cursor": cursor}).json()
+        paths += [f["path"] for f in body["files"]]
+        cursor = body["next_cursor"]
+    assert paths == [f"src/f{n}.py" for n in range(1, 5)]
+
+    r = client.get("/api/git-status/files", params={"status": "untracked", "prefix": "src/"})
+    assert [f["path"] for f in r.json()["files"]] == [f"src/f{n}.py" for n in range(1, 5)]
+    r = client.get("/api/git-status/files", params={"status": "staged,modified", "untracked": "no"})
+    assert [f["path"] for f in r.json()["files"]] == ["README.md", "src/f0.py"]
+
+
+def test_status_files_rejects_bad_input(repo):
+    assert client.get("/api/git-status/files", params={"status": "shiny"}).status_code == 422
+    assert client.get("/api/git-status/files", params={"cursor": "%%%"}).status_code == 422
+    assert client.get("/api/git-status/files", params={"limit": 0}).status_code == 422
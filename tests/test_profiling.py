@@ -0,0 +1,85 @@
+import time
+
+from fastapi.testclient import TestClient
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from app import main
+from app.profiling import Profiler, ProfilingMiddleware, authorized
+
+
+def spin(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+async def slow(request):
+    spin(0.1)
+    return PlainTextResponse("done")
+
+
+async def fast(request):
+    return PlainTextResponse("done")
+
+
+def _client(profiler):
+    app = Starlette(routes=[Route("/slow/{n}", slow), Route("/fast", fast)])
+    return TestClient(ProfilingMiddleware(app, profiler))
+
+
+def test_profiles_the_chosen_route_only():
+    profiler = Profiler(interval=0.001)
+    client = _client(profiler)
+    profiler.enable("/slow/{n}")
+    client.get("/slow/1")
+    client.get("/fast")
+    profiler.disable()
+    client.get("/slow/2")
+
+    assert set(profiler.samples) == {"/slow/{n}"}
+    stacks = profiler.collapsed("/slow/{n}").splitlines()
+    assert all(line.startswith("/slow/{n};") for line in stacks)
+    # The hot loop dominates the profile.
+    spinning = sum(int(line.rsplit(" ", 1)[1]) for line in stacks if "spin (test_profiling.py" in line)
+    assert spinning >= 0.5 * profiler.samples["/slow/{n}"] > 0
+
+
+def test_every_nth_request_and_header():
+    profiler = Profiler(token="secret")
+    profiler.enable(every=3)
+    scope = {"type": "http", "path": "/fast", "headers": []}
+    assert [profiler.wants(scope) for _ in range(6)] == [False, False, True, False, False, True]
+
+    profiler.disable()
+    assert not profiler.wants(scope)
+    assert profiler.wants({**scope, "headers": [(b"x-profile", b"secret")]})
+    assert not profiler.wants({**scope, "headers": [(b"x-profile", b"guess")]})
+
+
+def test_authorized():
+    assert authorized("secret", "Bearer secret")
+    assert not authorized("secret", "Bearer nope")
+    assert not authorized("", "Bearer ")
+    assert not authorized("secret", None)
+
+
+def test_admin_routes(monkeypatch):
+    client = TestClient(main.app)
+    assert client.get("/admin/profiling").status_code == 404
+
+    monkeypatch.setattr(main.profiler, "token", "secret")
+    assert client.get("/admin/profiling").status_code == 401
+    auth = {"Authorization": "Bearer secret"}
+
+    state = client.post("/admin/profiling", json={"route": "/api", "every": 2}, headers=auth).json()
+    assert state["enabled"] is True and state["every"] == 2
+    for _ in range(4):
+        client.get("/api")
+    r = client.get("/admin/profiling/stacks", params={"route": "/api"}, headers=auth)
+    assert r.headers["content-type"].startswith("text/plain")
+    assert all(line.startswith("/api;") for line in r.text.splitlines())
+
+    state = client.delete("/admin/profiling", params={"reset": True}, headers=auth).json()
+    assert state["enabled"] is False and state["samples"] == {}
@@ -0,0 +1,63 @@
+import asyncio
+import json
+
+from fastapi.testclient import TestClient
+
+from app import main, replay
+
+client = TestClient(main.app)
+
+LINES = [
+    json.dumps({"path": "/api"}),
+    json.dumps({"method": "POST", "path": "/echo", "json": {"message": "hi"}}),
+    json.dumps({"method": "POST", "path": "/echo", "json": {"wrong": 1}}),
+    json.dumps({"path": "/no-such-page"}),
+    json.dumps({"request_id": "user-001", "title": "not a request"}),
+    "not json",
+    "",
+]
+
+
+def test_replay_reports_per_route_stats():
+    report = asyncio.run(replay.replay(main.app, LINES * 10, concurrency=4))
+    assert report["requests"] == 40
+    assert report["skipped"] == 20
+    routes = report["routes"]
+    assert routes["GET /api"]["statuses"] == {"200": 10}
+    assert routes["POST /echo"]["statuses"] == {"200": 10, "422": 10}
+    assert routes["GET <unmatched>"]["statuses"] == {"404": 10}
+    assert routes["POST /echo"]["p50_ms"] <= routes["POST /echo"]["max_ms"]
+
+
+def test_replay_times_out_endless_responses():
+    lines = [json.dumps({"path": "/api/events"})]
+    report = asyncio.run(asyncio.wait_for(replay.replay(main.app, lines, timeout=0.2), 5))
+    assert report["routes"]["GET /api/events"]["statuses"] == {"timeout": 1}
+
+
+def test_latency_sample_is_bounded():
+    stats = replay.RouteStats(sample_size=100)
+    for n in range(10_000):
+        stats.add(n / 1000, 200)
+    assert len(stats.samples) == 100
+    assert stats.summary(1.0)["max_ms"] == 9999.0
+
+
+def test_replay_endpoint(monkeypatch):
+    body = "\n".join(LINES + [json.dumps({"method": "POST", "path": "/replay"})])
+    assert client.post("/replay", content=body).status_code == 404
+
+    monkeypatch.setattr(replay, "REPLAY_ENABLED", True)
+    report = client.post("/replay", content=body).json()
+    assert report["requests"] == 4
+    assert report["skipped"] == 3
+
+
+def test_cli(tmp_path, capsys):
+    traffic = tmp_path / "traffic.jsonl"
+    traffic.write_text("\n".join(LINES) + "\n")
+    output = tmp_path / "report.json"
+
+    assert replay.main([str(traffic), "--concurrency", "2", "--output", str(output)]) == 0
+    assert "POST /echo" in capsys.readouterr().out
+    assert json.loads(output.read_text())["requests"] == 4
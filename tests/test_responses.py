@@ -0,0 +1,34 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app import responses
+from app.main import app
+
+client = TestClient(app)
+
+PAYLOAD = {"output": "M é\n?? new.txt", "success": True, "n": [1, 2.5, None]}
+
+
+@pytest.mark.parametrize("name", list(responses.ENCODERS))
+def test_encoders_match_stdlib_output(name):
+    assert responses.ENCODERS[name](PAYLOAD) == responses.ENCODERS["json"](PAYLOAD)
+
+
+def test_fallback_and_forced_encoder(monkeypatch):
+    monkeypatch.setattr(responses, "ENCODERS", {"json": responses.ENCODERS["json"]})
+    assert responses.select_encoder()[0] == "json"
+    with pytest.raises(ValueError, match="not installed"):
+        responses.select_encoder("orjson")
+
+
+def test_json_routes_declare_response_models():
+    paths = client.get("/openapi.json").json()["paths"]
+    schema = paths["/echo"]["post"]["responses"]["200"]["content"]["application/json"]["schema"]
+    assert schema == {"$ref": "#/components/schemas/EchoResponse"}
+    assert "GitOutput" in paths["/api/git-status"]["get"]["responses"]["200"]["content"]["application/json"]["schema"]["$ref"]
+
+
+def test_echo_uses_fast_response():
+    r = client.post("/echo", json={"message": "héllo"})
+    assert r.content == responses.dumps({"you_said": "héllo", "length": 5})
+    assert r.headers["content-type"] == "application/json"
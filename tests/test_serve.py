@@ -0,0 +1,38 @@
+import pytest
+
+from app import serve
+
+
+def test_server_options_from_env(monkeypatch):
+    monkeypatch.setenv("WEB_CONCURRENCY", "3")
+    monkeypatch.setenv("PORT", "9000")
+    monkeypatch.setenv("KEEPALIVE", "15")
+    monkeypatch.setenv("GRACEFUL_TIMEOUT", "0")
+    monkeypatch.setenv("ACCESS_LOG", "0")
+    options = serve.server_options()
+    assert options["workers"] == 3
+    assert options["port"] == 9000
+    assert options["timeout_keep_alive"] == 15
+    assert options["timeout_graceful_shutdown"] == 0
+    assert options["access_log"] is False
+
+
+def test_single_worker_by_default(monkeypatch):
+    monkeypatch.delenv("WEB_CONCURRENCY", raising=False)
+    assert serve.server_options()["workers"] == 1
+
+
+def test_negative_graceful_timeout_is_rejected(monkeypatch):
+    monkeypatch.setenv("GRACEFUL_TIMEOUT", "-1")
+    with pytest.raises(ValueError):
+        serve.server_options()
+
+
+def test_auto_workers_follow_cgroup_limit(monkeypatch):
+    monkeypatch.setenv("WEB_CONCURRENCY", "auto")
+    monkeypatch.setattr(serve.os, "sched_getaffinity", lambda pid: set(range(64)))
+    monkeypatch.setattr(serve, "cgroup_cpu_limit", lambda: 1.5)
+    assert serve.server_options()["workers"] == 2
+
+    monkeypatch.setattr(serve, "cgroup_cpu_limit", lambda: None)
+    assert serve.server_options()["workers"] == 64
@@ -0,0 +1,146 @@
+import asyncio
+import os
+import re
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.static import (
+    STATIC_CHUNK,
+    ZEROCOPY,
+    RangeNotSatisfiable,
+    StaticDirectory,
+    byte_range,
+)
+
+client = TestClient(app)
+
+
+def call(directory, path, headers=(), method="GET", extensions=None):
+    """Run ``directory`` as if mounted at its prefix; returns the sent messages."""
+    scope = {
+        "type": "http",
+        "method": method,
+        "path": f"{directory.prefix}/{path}",
+        "root_path": directory.prefix,
+        "headers": [(k.encode(), v.encode()) for k, v in headers],
+        "extensions": extensions or {},
+    }
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(directory(scope, receive, send))
+    return messages
+
+
+def test_frontend_links_hashed_immutable_assets():
+    page = client.get("/frontend").text
+    urls = re.findall(r'(?:href|src)="(/frontend/[^"]+)"', page)
+    assert [re.sub(r"\.[0-9a-f]{12}\.", ".", url) for url in urls] == ["/frontend/style.css", "/frontend/script.js"]
+
+    for url in urls:
+        r = client.get(url)
+        assert r.status_code == 200
+        assert r.headers["cache-control"] == "public, max-age=31536000, immutable"
+    css = client.get("/frontend/style.css")
+    assert css.headers["content-type"] == "text/css; charset=utf-8"
+    assert css.headers["cache-control"] == "public, max-age=300"
+    assert css.content == client.get(urls[0]).content
+
+
+def test_conditional_and_head():
+    r = client.get("/downloads/COMPLETE_GUIDE.pdf")
+    assert r.status_code == 200
+    assert r.content.startswith(b"%PDF")
+    assert int(r.headers["content-length"]) == len(r.content)
+
+    cached = client.get("/downloads/COMPLETE_GUIDE.pdf", headers={"If-None-Match": r.headers["etag"]})
+    assert cached.status_code == 304
+    assert cached.content == b""
+
+    head = client.head("/downloads/COMPLETE_GUIDE.pdf")
+    assert head.headers["content-length"] == r.headers["content-length"]
+    assert head.content == b""
+
+
+def test_ranges():
+    full = client.get("/downloads/COMPLETE_GUIDE.pdf").content
+    size = len(full)
+
+    r = client.get("/downloads/COMPLETE_GUIDE.pdf", headers={"Range": "bytes=10-19"})
+    assert r.status_code == 206
+    assert r.headers["content-range"] == f"bytes 10-19/{size}"
+    assert r.content == full[10:20]
+
+    r = client.get("/downloads/COMPLETE_GUIDE.pdf", headers={"Range": "bytes=-6"})
+    assert r.content == full[-6:]
+
+    r = client.get("/downloads/COMPLETE_GUIDE.pdf", headers={"Range": f"bytes={size}-"})
+    assert r.status_code == 416
+    assert r.headers["content-range"] == f"bytes */{size}"
+
+    # A stale If-Range gets the whole, current file.
+    r = client.get("/downloads/COMPLETE_GUIDE.pdf", headers={"Range": "bytes=0-9", "If-Range": '"stale"'})
+    assert r.status_code == 200
+    assert r.content == full
+
+
+def test_byte_range():
+    assert byte_range("bytes=0-0", 10) == (0, 1)
+    assert byte_range("bytes=5-", 10) == (5, 10)
+    assert byte_range("bytes=5-100", 10) == (5, 10)
+    assert byte_range("bytes=-3", 10) == (7, 10)
+    assert byte_range("bytes=-30", 10) == (0, 10)
+    for ignored in ("bytes=0-1,4-5", "items=0-1", "bytes=x-1", "bytes=5-2", "bytes=5"):
+        assert byte_range(ignored, 10) is None
+    for unsatisfiable in ("bytes=10-", "bytes=-0"):
+        with pytest.raises(RangeNotSatisfiable):
+            byte_range(unsatisfiable, 10)
+
+
+def test_only_known_files_are_served():
+    assert client.get("/frontend/missing.css").status_code == 404
+    assert client.get("/frontend/%2e%2e/README.md").status_code == 404
+    assert client.get("/downloads/README.md").status_code == 404
+    assert client.post("/frontend/style.css").status_code == 405
+
+
+def test_zerocopysend_when_offered(tmp_path):
+    (tmp_path / "big.bin").write_bytes(os.urandom(3000))
+    (tmp_path / "big.txt").write_text("x" * 3000)
+    directory = StaticDirectory(tmp_path, "/files")
+    extensions = {ZEROCOPY: {}}
+
+    start, body = call(directory, "big.bin", [("range", "bytes=100-")], extensions=extensions)
+    assert start["status"] == 206
+    assert body["type"] == ZEROCOPY
+    assert (body["offset"], body["count"]) == (100, 2900)
+
+    # Text the compression middleware would compress is sent as bytes.
+    body = call(directory, "big.txt", extensions=extensions)[-1]
+    assert body == {"type": "http.response.body", "body": b"x" * 3000, "more_body": False}
+
+
+def test_large_files_are_read_in_chunks(tmp_path):
+    data = os.urandom(STATIC_CHUNK * 2 + 10)
+    (tmp_path / "data.bin").write_bytes(data)
+    messages = call(StaticDirectory(tmp_path, "/files"), "data.bin")
+    assert [len(m["body"]) for m in messages[1:]] == [STATIC_CHUNK, STATIC_CHUNK, 10]
+    assert b"".join(m["body"] for m in messages[1:]) == data
+
+
+def test_dev_reload_links_plain_urls_and_rereads(tmp_path):
+    asset = tmp_path / "app.js"
+    asset.write_text("one")
+    directory = StaticDirectory(tmp_path, "/static", dev_reload=True)
+    assert directory.rewrite(b'<script src="/static/app.js">') == b'<script src="/static/app.js">'
+
+    asset.write_text("two!")
+    os.utime(asset, (0, 12345))
+    assert call(directory, "app.js")[-1]["body"] == b"two!"
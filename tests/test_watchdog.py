@@ -0,0 +1,60 @@
+import asyncio
+import subprocess
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.gitexec import GitRunner
+from app.metrics import LOOP_BLOCKED
+from app.watchdog import LoopWatchdog
+
+# A git that takes a while, like `git status` on a big tree.
+SLOW_GIT = ("-c", "alias.slow=!sleep 0.5", "slow")
+
+
+def _app(repo, watchdog):
+    @asynccontextmanager
+    async def lifespan(app):
+        await watchdog.start()
+        yield
+        await watchdog.stop()
+
+    app = FastAPI(lifespan=lifespan)
+
+    @app.get("/blocking")
+    async def blocking_git_status():
+        # How the git handlers used to call git: on the event loop thread.
+        result = subprocess.run(["git", *SLOW_GIT], capture_output=True, text=True, cwd=repo, check=False)  # noqa: ASYNC221
+        return {"output": result.stdout}
+
+    @app.get("/async")
+    async def async_git_status():
+        result = await GitRunner(cwd=str(repo)).run(*SLOW_GIT)
+        return {"output": result.stdout}
+
+    return app
+
+
+def test_catches_blocking_subprocess_run(git_repo, caplog):
+    watchdog = LoopWatchdog(interval=0.01, threshold=0.2, enabled=True)
+    with TestClient(_app(git_repo, watchdog)) as client:
+        blocked = sum(LOOP_BLOCKED.values.values())
+        assert client.get("/async").status_code == 200
+        assert watchdog.dumps == []
+
+        assert client.get("/blocking").status_code == 200
+        assert len(watchdog.dumps) == 1
+        stack = watchdog.dumps[0]
+        assert "in blocking_git_status" in stack
+        assert 'result = subprocess.run(["git", *SLOW_GIT]' in stack
+        assert "asyncio" not in stack.splitlines()[0]
+    assert sum(LOOP_BLOCKED.values.values()) == blocked + 1
+    assert "event loop blocked for" in caplog.text
+    assert "event loop was blocked for" in caplog.text
+
+
+def test_disabled():
+    watchdog = LoopWatchdog(enabled=False)
+    asyncio.run(watchdog.start())
+    assert watchdog._task is None and watchdog._thread is None